@@ -0,0 +1,173 @@
+"""Per-aide interval index of absences.
+
+Each aide's absences are kept as sorted, non-overlapping ``[start, end]``
+date intervals (stored as ordinals in parallel lists), so "is the aide absent
+on D?" and "which days of R is the aide absent?" are a bisect away instead of
+a range query. Overlapping rows, which the absence endpoints reject but the
+schema allows, are merged into the interval of the earliest one.
+
+The index is loaded with one query on first use. When a session that wrote
+``Absence`` rows commits, only the affected aides are reloaded on their next
+lookup. A session with uncommitted absence writes reads its own view of the
+aides it touched.
+"""
+
+import threading
+from bisect import bisect_right
+from datetime import date, timedelta
+from typing import Dict, Iterator, List, Optional, Set, Tuple
+
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import Session, object_session
+
+from api.models import Absence
+
+# session.info key holding the aide ids whose absences the session changed
+_DIRTY_KEY = 'absence_index_dirty'
+
+# (starts, ends, absence_ids) of one aide's merged intervals, dates as ordinals
+AideIntervals = Tuple[List[int], List[int], List[int]]
+
+_EMPTY: AideIntervals = ([], [], [])
+
+def _merge(rows: List[Tuple[int, date, date]]) -> AideIntervals:
+    """Merge ``(absence_id, start_date, end_date)`` rows into sorted disjoint intervals."""
+    starts: List[int] = []
+    ends: List[int] = []
+    ids: List[int] = []
+    for absence_id, start, end in sorted(rows, key=lambda row: (row[1], row[0])):
+        if starts and start.toordinal() <= ends[-1]:
+            ends[-1] = max(ends[-1], end.toordinal())
+            continue
+        starts.append(start.toordinal())
+        ends.append(end.toordinal())
+        ids.append(absence_id)
+    return starts, ends, ids
+
+class AbsenceIndex:
+    """Sorted absence intervals per aide."""
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._intervals: Dict[int, AideIntervals] = {}
+        self._stale: Set[int] = set()
+        self._loaded = False
+
+    def reset(self) -> None:
+        """Drop all entries; the index is rebuilt on next use."""
+        with self._lock:
+            self._intervals.clear()
+            self._stale.clear()
+            self._loaded = False
+
+    def refresh(self, aide_ids: Set[int]) -> None:
+        """Reload these aides' absences on their next lookup."""
+        with self._lock:
+            self._stale |= aide_ids
+
+    @staticmethod
+    def _query(session: Session, aide_id: Optional[int] = None) -> Dict[int, List[Tuple[int, date, date]]]:
+        query = session.query(Absence.id, Absence.aide_id, Absence.start_date, Absence.end_date)
+        if aide_id is not None:
+            query = query.filter(Absence.aide_id == aide_id)
+        rows: Dict[int, List[Tuple[int, date, date]]] = {}
+        for absence_id, row_aide_id, start, end in query:
+            rows.setdefault(row_aide_id, []).append((absence_id, start, end))
+        return rows
+
+    def intervals(self, session: Session, aide_id: int) -> AideIntervals:
+        """Return the aide's merged intervals, loading them if needed."""
+        if session.autoflush:
+            session.flush()
+        dirty = session.info.get(_DIRTY_KEY, set())
+        if aide_id in dirty:
+            return _merge(self._query(session, aide_id).get(aide_id, []))
+        with self._lock:
+            if not self._loaded:
+                self._intervals = {
+                    row_aide_id: _merge(rows) for row_aide_id, rows in self._query(session).items()
+                }
+                # Never share this session's uncommitted rows
+                self._stale = set(dirty)
+                self._loaded = True
+            elif aide_id in self._stale:
+                rows = self._query(session, aide_id).get(aide_id)
+                if rows:
+                    self._intervals[aide_id] = _merge(rows)
+                else:
+                    self._intervals.pop(aide_id, None)
+                self._stale.discard(aide_id)
+            return self._intervals.get(aide_id, _EMPTY)
+
+    def absence_on(self, session: Session, aide_id: int, day: date) -> Optional[int]:
+        """Return the id of the absence covering ``day``, if any."""
+        starts, ends, ids = self.intervals(session, aide_id)
+        ordinal = day.toordinal()
+        index = bisect_right(starts, ordinal) - 1
+        if index >= 0 and ordinal <= ends[index]:
+            return ids[index]
+        return None
+
+    def is_absent(self, session: Session, aide_id: int, day: date) -> bool:
+        """Check whether the aide is absent on ``day``."""
+        return self.absence_on(session, aide_id, day) is not None
+
+    def absent_ranges(self, session: Session, aide_id: int, start_date: date,
+                      end_date: date) -> List[Tuple[date, date, int]]:
+        """Return the aide's absences within ``[start_date, end_date]``, clipped to it.
+
+        Returns:
+            ``(first_day, last_day, absence_id)`` tuples in date order
+        """
+        starts, ends, ids = self.intervals(session, aide_id)
+        first, last = start_date.toordinal(), end_date.toordinal()
+        index = max(bisect_right(starts, first) - 1, 0)
+        ranges = []
+        while index < len(starts) and starts[index] <= last:
+            if ends[index] >= first:
+                ranges.append((
+                    date.fromordinal(max(starts[index], first)),
+                    date.fromordinal(min(ends[index], last)),
+                    ids[index]
+                ))
+            index += 1
+        return ranges
+
+    def absent_days(self, session: Session, aide_id: int, start_date: date,
+                    end_date: date) -> Iterator[Tuple[date, int]]:
+        """Yield ``(day, absence_id)`` for every absent day in ``[start_date, end_date]``."""
+        for first, last, absence_id in self.absent_ranges(session, aide_id, start_date, end_date):
+            day = first
+            while day <= last:
+                yield day, absence_id
+                day += timedelta(days=1)
+
+# Process-wide index shared by all requests
+absence_index = AbsenceIndex()
+
+def _record(target: Absence, *aide_ids: Optional[int]) -> None:
+    session = object_session(target)
+    if session is not None:
+        session.info.setdefault(_DIRTY_KEY, set()).update(
+            aide_id for aide_id in aide_ids if aide_id is not None
+        )
+
+@event.listens_for(Absence, 'after_insert')
+@event.listens_for(Absence, 'after_delete')
+def _absence_written(mapper, connection, target: Absence) -> None:
+    _record(target, target.aide_id)
+
+@event.listens_for(Absence, 'after_update')
+def _absence_updated(mapper, connection, target: Absence) -> None:
+    # An absence moved to another aide changes both aides
+    _record(target, target.aide_id, *inspect(target).attrs.aide_id.history.deleted)
+
+@event.listens_for(Session, 'after_commit')
+def _refresh_committed(session: Session) -> None:
+    aide_ids = session.info.pop(_DIRTY_KEY, None)
+    if aide_ids:
+        absence_index.refresh(aide_ids)
+
+@event.listens_for(Session, 'after_rollback')
+def _discard_rolled_back(session: Session) -> None:
+    session.info.pop(_DIRTY_KEY, None)
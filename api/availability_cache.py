@@ -0,0 +1,168 @@
+"""Precomputed weekly availability masks per aide.
+
+Availability windows only change through the availability endpoints, yet
+every booking, move and free-aide lookup used to query them again. The cache
+folds each aide's windows into a ``(5, 16)``-slot shape: one 16-bit slot mask
+(see :mod:`api.slots`) per school weekday, plus a flag telling whether the
+aide has a window on that weekday at all. Callers pick what a missing window
+means: the routes treat it as fully available, :meth:`TeacherAide.is_available`
+as unavailable.
+
+The masks are loaded with one query on first use and dropped whenever a
+session that inserted, updated or deleted an ``Availability`` row commits.
+"""
+
+import threading
+from datetime import date, time
+from typing import Dict, Optional, Sequence, Tuple
+
+import numpy as np
+from sqlalchemy import event
+from sqlalchemy.orm import Session, object_session
+
+from api.models import Availability, WEEKDAY_CODES
+from api.slots import DAY_START_MINUTES, FULL_DAY, SLOT_MINUTES, SLOTS_PER_DAY, slot_mask
+
+# Availability rows exist for Monday-Friday only
+SCHOOL_DAYS = WEEKDAY_CODES[:5]
+
+# session.info key set when the session writes availability rows
+_DIRTY_KEY = 'availability_cache_dirty'
+
+# (aide_id -> row, masks[aides, 5] uint16, defined[aides, 5] bool)
+Snapshot = Tuple[Dict[int, int], np.ndarray, np.ndarray]
+
+def window_mask(start: time, end: time) -> int:
+    """Return the slots fully inside an availability window.
+
+    Unlike :func:`api.slots.slot_mask`, edges off the half-hour grid are
+    rounded inwards, so a slot counts as available only if the window covers
+    all of it.
+    """
+    first = -(-(start.hour * 60 + start.minute - DAY_START_MINUTES) // SLOT_MINUTES)
+    last = (end.hour * 60 + end.minute - DAY_START_MINUTES) // SLOT_MINUTES
+    first = max(first, 0)
+    last = min(last, SLOTS_PER_DAY)
+    if last <= first:
+        return 0
+    return ((1 << (last - first)) - 1) << first
+
+class AvailabilityCache:
+    """Weekday availability masks for every aide, built on first use."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._snapshot: Optional[Snapshot] = None
+        self.loads = 0
+
+    def invalidate(self) -> None:
+        """Drop the masks; they are reloaded on next use."""
+        with self._lock:
+            self._snapshot = None
+
+    @staticmethod
+    def _build(session: Session) -> Snapshot:
+        index: Dict[int, int] = {}
+        windows = []
+        for aide_id, weekday, start, end in session.query(
+            Availability.aide_id, Availability.weekday, Availability.start_time, Availability.end_time
+        ):
+            if weekday in SCHOOL_DAYS:
+                windows.append((index.setdefault(aide_id, len(index)), SCHOOL_DAYS.index(weekday), start, end))
+        masks = np.zeros((len(index), len(SCHOOL_DAYS)), dtype=np.uint16)
+        defined = np.zeros((len(index), len(SCHOOL_DAYS)), dtype=bool)
+        for row, column, start, end in windows:
+            masks[row, column] |= window_mask(start, end)
+            defined[row, column] = True
+        return index, masks, defined
+
+    def snapshot(self, session: Session) -> Snapshot:
+        """Return the current masks, loading them if needed.
+
+        Pending changes are flushed first (as a SQL query would autoflush).
+        A session with uncommitted availability writes gets a private
+        snapshot of its own view, which is never shared.
+        """
+        if session.autoflush:
+            session.flush()
+        if session.info.get(_DIRTY_KEY):
+            return self._build(session)
+        snapshot = self._snapshot
+        if snapshot is None:
+            with self._lock:
+                if self._snapshot is None:
+                    self._snapshot = self._build(session)
+                    self.loads += 1
+                snapshot = self._snapshot
+        return snapshot
+
+    def weekday_masks(self, session: Session, aide_id: int, default: int = FULL_DAY) -> Tuple[int, ...]:
+        """Return the aide's mask for each ``date.weekday()`` (Monday-Sunday).
+
+        Args:
+            session: Database session
+            aide_id: Aide to look up
+            default: Mask for weekdays without a window (weekends included)
+        """
+        index, masks, defined = self.snapshot(session)
+        row = index.get(aide_id)
+        if row is None:
+            return (default,) * 7
+        return tuple(
+            int(masks[row, column]) if defined[row, column] else default
+            for column in range(len(SCHOOL_DAYS))
+        ) + (default, default)
+
+    def available(self, session: Session, aide_ids: Sequence[int], dates: Sequence[date],
+                  start_time: time, end_time: time, default: int = FULL_DAY) -> np.ndarray:
+        """Check every aide against every date for the slot ``[start_time, end_time)``.
+
+        Args:
+            session: Database session
+            aide_ids: Aides to check (rows of the result)
+            dates: Days to check (columns of the result)
+            start_time: Slot start
+            end_time: Slot end
+            default: Mask for weekdays without a window (weekends included)
+
+        Returns:
+            Boolean array of shape ``(len(aide_ids), len(dates))``; only weekly
+            windows are considered, not absences or existing assignments
+        """
+        index, masks, defined = self.snapshot(session)
+        needed = slot_mask(start_time, end_time)
+
+        # One column per date.weekday(), weekends always falling back to the default
+        week = np.full((len(aide_ids), 7), default, dtype=np.uint16)
+        rows = np.fromiter((index.get(aide_id, -1) for aide_id in aide_ids), dtype=np.intp, count=len(aide_ids))
+        known = rows >= 0
+        week[known, :len(SCHOOL_DAYS)] = np.where(defined[rows[known]], masks[rows[known]], default)
+
+        weekdays = np.fromiter((day.weekday() for day in dates), dtype=np.intp, count=len(dates))
+        return (week[:, weekdays] & needed) == needed
+
+    def is_available(self, session: Session, aide_id: int, day: date, start_time: time, end_time: time,
+                     default: int = FULL_DAY) -> bool:
+        """Check one aide and day; see :meth:`available`."""
+        needed = slot_mask(start_time, end_time)
+        return self.weekday_masks(session, aide_id, default)[day.weekday()] & needed == needed
+
+# Process-wide cache shared by all requests
+availability_cache = AvailabilityCache()
+
+@event.listens_for(Availability, 'after_insert')
+@event.listens_for(Availability, 'after_update')
+@event.listens_for(Availability, 'after_delete')
+def _availability_written(mapper, connection, target: Availability) -> None:
+    session = object_session(target)
+    if session is not None:
+        session.info[_DIRTY_KEY] = True
+
+@event.listens_for(Session, 'after_commit')
+def _invalidate_committed(session: Session) -> None:
+    if session.info.pop(_DIRTY_KEY, None):
+        availability_cache.invalidate()
+
+@event.listens_for(Session, 'after_rollback')
+def _discard_rolled_back(session: Session) -> None:
+    session.info.pop(_DIRTY_KEY, None)
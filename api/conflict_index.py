@@ -0,0 +1,300 @@
+"""In-memory interval index for aide scheduling conflicts.
+
+Assigned rows are kept as sorted ``(start_time, end_time, assignment_id)``
+lists per ``(aide_id, date)``, so an overlap check is a bisect over a few
+entries instead of a SQL round trip. The index is write-through: ORM inserts,
+updates and deletes of ``Assignment`` rows are recorded on the session and
+applied when it commits (and dropped when it rolls back). Changes flushed but
+not yet committed are overlaid on lookups from the same session.
+
+The index is built from the database on first use and rebuilt whenever a
+cheap fingerprint of the assigned rows no longer matches, which catches
+writes made by other processes or through bulk SQL. A committing session
+reads the fingerprint its own writes produce just before the commit, while
+it holds the SQLite write lock; it becomes the new baseline only if it
+agrees with the index once those writes are applied, and the index is
+rebuilt otherwise. Reads compare the fingerprint at most every few
+seconds; write paths force the comparison before their conflict checks.
+"""
+
+import logging
+import threading
+from bisect import bisect_left
+from datetime import date, time
+from time import monotonic
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import case, event, func
+from sqlalchemy.orm import Session, object_session
+
+from api.models import Assignment
+
+logger = logging.getLogger(__name__)
+
+# How often (seconds) the index is compared against the database fingerprint
+VERIFY_INTERVAL_SECONDS = 5.0
+
+# session.info keys for write-through bookkeeping
+_PENDING_KEY = 'conflict_index_pending'
+_GENERATION_KEY = 'conflict_index_generation'
+_EXPECTED_KEY = 'conflict_index_expected'
+
+Slot = Tuple[int, date, time, time]  # (aide_id, date, start_time, end_time)
+Interval = Tuple[time, time, int]  # (start_time, end_time, assignment_id)
+
+class ConflictIndex:
+    """Sorted interval lists of assigned rows per (aide_id, date)."""
+
+    def __init__(self, verify_interval: float = VERIFY_INTERVAL_SECONDS):
+        self.verify_interval = verify_interval
+        self._lock = threading.RLock()
+        self._intervals: Dict[Tuple[int, date], List[Interval]] = {}
+        self._slots: Dict[int, Slot] = {}
+        self._loaded = False
+        self._fingerprint: Optional[tuple] = None
+        self._verified_at = 0.0
+        self.generation = 0
+
+    def reset(self) -> None:
+        """Drop all entries; the index is rebuilt on next use."""
+        with self._lock:
+            self._intervals.clear()
+            self._slots.clear()
+            self._loaded = False
+            self._fingerprint = None
+
+    @property
+    def loaded(self) -> bool:
+        """Whether the index has been built since the last reset."""
+        return self._loaded
+
+    def _fingerprint_of(self, session: Session) -> tuple:
+        return tuple(session.query(
+            func.count(Assignment.id), func.max(Assignment.id), func.max(Assignment.updated_at)
+        ).filter(Assignment.aide_id.isnot(None)).one())
+
+    def expected_fingerprint(self, session: Session, changed_ids: Iterable[int]) -> tuple:
+        """Read the fingerprint a committing session leaves behind.
+
+        Returns the usual fingerprint plus the latest ``updated_at`` of rows
+        the session did not touch, which shows whether anything else was
+        updated since the last check.
+        """
+        return tuple(session.query(
+            func.count(Assignment.id), func.max(Assignment.id), func.max(Assignment.updated_at),
+            func.max(case((Assignment.id.notin_(list(changed_ids)), Assignment.updated_at)))
+        ).filter(Assignment.aide_id.isnot(None)).one())
+
+    def rebuild(self, session: Session, exclude_ids: Iterable[int] = ()) -> None:
+        """Load every assigned row from the database.
+
+        Args:
+            session: Database session
+            exclude_ids: Rows the session has written but not committed; they
+                are left out and the next check rebuilds again
+        """
+        exclude_ids = list(exclude_ids)
+        query = session.query(
+            Assignment.id, Assignment.aide_id, Assignment.date,
+            Assignment.start_time, Assignment.end_time
+        ).filter(Assignment.aide_id.isnot(None))
+        if exclude_ids:
+            query = query.filter(Assignment.id.notin_(exclude_ids))
+        rows = query.all()
+        fingerprint = None if exclude_ids else self._fingerprint_of(session)
+        with self._lock:
+            self._intervals.clear()
+            self._slots.clear()
+            for assignment_id, aide_id, day, start, end in rows:
+                self._add(assignment_id, (aide_id, day, start, end))
+            self._loaded = True
+            self._fingerprint = fingerprint
+            self._verified_at = monotonic() if fingerprint is not None else 0.0
+            self.generation += 1
+        logger.info(f"Conflict index rebuilt with {len(rows)} assigned rows")
+
+    def ensure_current(self, session: Session, force: bool = False) -> None:
+        """Build the index if needed and rebuild it after an external write.
+
+        Args:
+            session: Database session
+            force: Compare the fingerprint now rather than at most every
+                ``verify_interval`` seconds, as write paths do before their
+                conflict checks
+        """
+        if not self._loaded:
+            self.rebuild(session)
+            return
+        pending = session.info.get(_PENDING_KEY)
+        if pending:
+            # The full fingerprint would include this session's uncommitted writes
+            if force:
+                self._verify_untouched(session, pending)
+            return
+        if not force and monotonic() - self._verified_at < self.verify_interval:
+            return
+        fingerprint = self._fingerprint_of(session)
+        with self._lock:
+            if self._fingerprint is None or fingerprint != self._fingerprint:
+                logger.info("External assignment write detected, rebuilding conflict index")
+                self.rebuild(session)
+                return
+            self._verified_at = monotonic()
+
+    def _verify_untouched(self, session: Session, pending: Dict[int, Optional[Slot]]) -> None:
+        """Compare the rows the session has not written with the index, rebuilding on a mismatch."""
+        with session.no_autoflush:
+            count, max_id, max_updated = session.query(
+                func.count(Assignment.id), func.max(Assignment.id), func.max(Assignment.updated_at)
+            ).filter(Assignment.aide_id.isnot(None), Assignment.id.notin_(list(pending))).one()
+        with self._lock:
+            ids = [assignment_id for assignment_id in self._slots if assignment_id not in pending]
+            baseline = self._fingerprint
+            if (
+                baseline is not None and count == len(ids) and max_id == max(ids, default=None)
+                and (max_updated is None or (baseline[2] is not None and max_updated <= baseline[2]))
+            ):
+                return
+        logger.info("External assignment write detected, rebuilding conflict index")
+        self.rebuild(session, exclude_ids=pending)
+
+    def _add(self, assignment_id: int, slot: Slot) -> None:
+        aide_id, day, start, end = slot
+        intervals = self._intervals.setdefault((aide_id, day), [])
+        intervals.insert(bisect_left(intervals, (start, end, assignment_id)), (start, end, assignment_id))
+        self._slots[assignment_id] = slot
+
+    def _remove(self, assignment_id: int) -> None:
+        slot = self._slots.pop(assignment_id, None)
+        if slot is None:
+            return
+        aide_id, day, start, end = slot
+        intervals = self._intervals.get((aide_id, day), [])
+        index = bisect_left(intervals, (start, end, assignment_id))
+        if index < len(intervals) and intervals[index][2] == assignment_id:
+            intervals.pop(index)
+        if not intervals:
+            self._intervals.pop((aide_id, day), None)
+
+    def apply(self, changes: Dict[int, Optional[Slot]], expected: Optional[tuple] = None) -> None:
+        """Apply committed changes; a None slot removes the row.
+
+        Args:
+            changes: Slots by assignment id
+            expected: :meth:`expected_fingerprint` read before the commit,
+                or None to rebuild on the next check
+        """
+        with self._lock:
+            if not self._loaded:
+                return
+            for assignment_id, slot in changes.items():
+                self._remove(assignment_id)
+                if slot is not None:
+                    self._add(assignment_id, slot)
+            baseline, self._fingerprint = self._fingerprint, None
+            if expected is None or baseline is None:
+                return
+            count, max_id, max_updated, others_updated = expected
+            if count != len(self._slots) or max_id != max(self._slots, default=None):
+                # Rows were inserted, deleted or (un)assigned elsewhere
+                return
+            if others_updated is not None and (baseline[2] is None or others_updated > baseline[2]):
+                # A row this session did not touch was updated elsewhere
+                return
+            self._fingerprint = (count, max_id, max_updated)
+
+    def overlapping(self, session: Session, aide_id: int, day: date, start: time, end: time,
+                    exclude_id: Optional[int] = None, force: bool = False) -> List[int]:
+        """Return ids of the aide's assignments on ``day`` that overlap ``[start, end)``.
+
+        Unflushed changes are flushed first (as a SQL query would autoflush)
+        and the session's uncommitted changes take precedence over the index.
+        ``force`` is passed to :meth:`ensure_current`.
+        """
+        if session.autoflush:
+            session.flush()
+        self.ensure_current(session, force=force)
+        pending: Dict[int, Optional[Slot]] = session.info.get(_PENDING_KEY, {})
+
+        with self._lock:
+            intervals = self._intervals.get((aide_id, day), [])
+            # Only intervals starting before the slot ends can overlap it
+            candidates = intervals[:bisect_left(intervals, (end,))]
+            ids = [
+                assignment_id for _, interval_end, assignment_id in candidates
+                if interval_end > start and assignment_id != exclude_id and assignment_id not in pending
+            ]
+        for assignment_id, slot in pending.items():
+            if slot is None or assignment_id == exclude_id:
+                continue
+            if slot[0] == aide_id and slot[1] == day and slot[2] < end and start < slot[3]:
+                ids.append(assignment_id)
+        return sorted(ids)
+
+# Process-wide index shared by all requests
+conflict_index = ConflictIndex()
+
+def find_conflict(session: Session, aide_id: int, day: date, start: time, end: time,
+                  exclude_id: Optional[int] = None, force: bool = False) -> Optional[Assignment]:
+    """Return the first assignment of ``aide_id`` overlapping the slot, if any.
+
+    Write paths pass ``force=True`` so writes from other processes are seen
+    immediately; read-only callers keep the throttled fingerprint check.
+    """
+    ids = conflict_index.overlapping(session, aide_id, day, start, end, exclude_id, force=force)
+    return session.get(Assignment, ids[0]) if ids else None
+
+def _record(target: Assignment, slot: Optional[Slot]) -> None:
+    session = object_session(target)
+    if session is None:
+        return
+    pending = session.info.setdefault(_PENDING_KEY, {})
+    if not pending:
+        session.info[_GENERATION_KEY] = conflict_index.generation
+    pending[target.id] = slot
+
+def _slot_of(target: Assignment) -> Optional[Slot]:
+    if target.aide_id is None:
+        return None
+    return (target.aide_id, target.date, target.start_time, target.end_time)
+
+def record_bulk_writes(session: Session, assignments: Iterable[Assignment]) -> None:
+    """Track rows written with bulk statements, which skip the ORM mapper events."""
+    for assignment in assignments:
+        _record(assignment, _slot_of(assignment))
+
+@event.listens_for(Assignment, 'after_insert')
+@event.listens_for(Assignment, 'after_update')
+def _assignment_written(mapper, connection, target: Assignment) -> None:
+    _record(target, _slot_of(target))
+
+@event.listens_for(Assignment, 'after_delete')
+def _assignment_deleted(mapper, connection, target: Assignment) -> None:
+    _record(target, None)
+
+@event.listens_for(Session, 'before_commit')
+def _read_expected_fingerprint(session: Session) -> None:
+    if not conflict_index.loaded:
+        return
+    # Flushed now so the read sees every write and runs under the transaction's write lock
+    session.flush()
+    pending = session.info.get(_PENDING_KEY)
+    if pending:
+        session.info[_EXPECTED_KEY] = conflict_index.expected_fingerprint(session, pending)
+
+@event.listens_for(Session, 'after_commit')
+def _apply_committed(session: Session) -> None:
+    pending = session.info.pop(_PENDING_KEY, None)
+    expected = session.info.pop(_EXPECTED_KEY, None)
+    session.info.pop(_GENERATION_KEY, None)
+    if pending:
+        conflict_index.apply(pending, expected)
+
+@event.listens_for(Session, 'after_rollback')
+def _discard_rolled_back(session: Session) -> None:
+    pending = session.info.pop(_PENDING_KEY, None)
+    session.info.pop(_EXPECTED_KEY, None)
+    generation = session.info.pop(_GENERATION_KEY, None)
+    # A rebuild during the transaction may have read rows that were just rolled back
+    if pending and generation != conflict_index.generation:
+        conflict_index.reset()
@@ -0,0 +1,120 @@
+"""Global data version used for conditional GETs of the schedule views.
+
+Every transaction that writes an assignment, absence, availability window,
+task, aide, classroom or school class bumps the single ``data_version`` row
+in the same transaction, so the counter commits and rolls back with the data
+and is shared by every process using the database. ORM flushes are caught by
+``after_flush`` and bulk ``session.execute(insert(...))`` style statements by
+``do_orm_execute``.
+
+Read endpoints build their ETag from the version and answer a matching
+``If-None-Match`` with 304 after that single primary-key lookup, before
+running any of their own queries. In-process caches use
+:func:`transaction_bumps` to tell their own commits from writes they did not
+see.
+"""
+
+from itertools import chain
+from typing import Optional, Tuple
+
+from flask import Response, request
+from sqlalchemy import event, insert, select, update
+from sqlalchemy.orm import Session
+
+from api.models import (
+    Assignment, Absence, Availability, Task, TeacherAide, Classroom, SchoolClass, DataVersion
+)
+
+# Models whose writes change what the schedule views show
+VERSIONED_MODELS = (Assignment, Absence, Availability, Task, TeacherAide, Classroom, SchoolClass)
+
+# session.info keys: bumps made by the current transaction and the version it reached
+_BUMPS_KEY = 'data_version_bumps'
+_REACHED_KEY = 'data_version_reached'
+
+_table = DataVersion.__table__
+
+def current_version(session: Session) -> int:
+    """Return the committed data version (0 before the first write)."""
+    version = session.execute(
+        select(DataVersion.version).where(DataVersion.id == DataVersion.ROW_ID)
+    ).scalar()
+    return version or 0
+
+def bump_version(connection) -> int:
+    """Increment the data version inside the caller's transaction and return the new value."""
+    version = connection.execute(
+        update(_table).where(_table.c.id == DataVersion.ROW_ID)
+        .values(version=_table.c.version + 1).returning(_table.c.version)
+    ).scalar()
+    if version is None:
+        version = 1
+        connection.execute(insert(_table).values(id=DataVersion.ROW_ID, version=version))
+    return version
+
+def begin_write(session: Session) -> None:
+    """Open the session's transaction with a version bump.
+
+    SQLite takes its write lock on a transaction's first write, so rows read
+    after this call cannot be changed by another connection until commit.
+    """
+    _bump(session)
+
+def transaction_bumps(session: Session) -> Tuple[int, Optional[int]]:
+    """Return how often the session's transaction bumped the version, and the version it reached.
+
+    Valid until the transaction ends, so ``after_commit`` listeners can check
+    that the committed version is exactly their last known version plus
+    their own bumps.
+    """
+    return session.info.get(_BUMPS_KEY, 0), session.info.get(_REACHED_KEY)
+
+def _bump(session: Session) -> None:
+    session.info[_REACHED_KEY] = bump_version(session.connection())
+    session.info[_BUMPS_KEY] = session.info.get(_BUMPS_KEY, 0) + 1
+
+def etag_for(version: int, *variant) -> str:
+    """Return the (unquoted) ETag of a view at ``version``.
+
+    Args:
+        version: Data version the view was built from
+        *variant: Request parameters that select a different representation
+    """
+    return '-'.join(str(part) for part in (version, *variant))
+
+def not_modified(etag: str) -> Optional[Response]:
+    """Return a 304 response if the request's ``If-None-Match`` matches ``etag``."""
+    if not request.if_none_match.contains(etag):
+        return None
+    response = Response(status=304)
+    set_etag(response, etag)
+    return response
+
+def set_etag(response: Response, etag: str) -> Response:
+    """Attach ``etag`` and ask clients to revalidate before reusing the body."""
+    response.set_etag(etag)
+    response.headers['Cache-Control'] = 'no-cache'
+    return response
+
+def etag_headers(etag: str) -> dict:
+    """Response headers for Flask-RESTful resources returning ``(data, status, headers)``."""
+    return {'ETag': f'"{etag}"', 'Cache-Control': 'no-cache'}
+
+@event.listens_for(Session, 'after_flush')
+def _bump_on_flush(session: Session, flush_context) -> None:
+    if any(isinstance(obj, VERSIONED_MODELS) for obj in chain(session.new, session.dirty, session.deleted)):
+        _bump(session)
+
+@event.listens_for(Session, 'do_orm_execute')
+def _bump_on_bulk_statement(orm_execute_state) -> None:
+    if not (orm_execute_state.is_insert or orm_execute_state.is_update or orm_execute_state.is_delete):
+        return
+    if any(issubclass(mapper.class_, VERSIONED_MODELS) for mapper in orm_execute_state.all_mappers):
+        _bump(orm_execute_state.session)
+
+@event.listens_for(Session, 'after_transaction_end')
+def _forget_bumps(session: Session, transaction) -> None:
+    # after_commit listeners have run by now; savepoints belong to the outer transaction
+    if transaction.parent is None:
+        session.info.pop(_BUMPS_KEY, None)
+        session.info.pop(_REACHED_KEY, None)
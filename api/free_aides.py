@@ -0,0 +1,152 @@
+"""Find which aides are free for slots across many dates in one pass.
+
+The aides × school-days grid is evaluated as NumPy boolean matrices:
+availability from :mod:`api.availability_cache`, absences from
+:mod:`api.absence_index`, and existing assignments overlapping the slot.
+Free ``(aide, date)`` pairs are ranked by the aide's assigned minutes in that
+date's week, so the least loaded aide comes first.
+
+:func:`check_slot_matrix` answers the drag-and-drop hover question for many
+aides and many candidate slots with a fixed number of queries.
+"""
+
+from datetime import date, time, timedelta
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+from sqlalchemy.orm import Session
+
+from api.models import Assignment, TeacherAide
+from api.absence_index import absence_index
+from api.availability_cache import availability_cache
+from api.slots import slot_mask
+
+# Status codes of check_slot_matrix cells, in the order the validators apply them
+SLOT_FREE = 0
+SLOT_CONFLICT = 1
+SLOT_ABSENT = 2
+SLOT_UNAVAILABLE = 3
+
+SLOT_STATUSES = ('FREE', 'CONFLICT', 'ABSENT', 'OUTSIDE_AVAILABILITY')
+
+def _minutes(value: time) -> int:
+    return value.hour * 60 + value.minute
+
+def find_free_aides(session: Session, start_date: date, end_date: date,
+                    start_time: time, end_time: time) -> List[Dict[str, Any]]:
+    """List the aides free for ``[start_time, end_time)`` on each school day of the range.
+
+    Args:
+        session: Database session
+        start_date: First date (inclusive)
+        end_date: Last date (inclusive)
+        start_time: Slot start
+        end_time: Slot end
+
+    Returns:
+        ``{'aide_id', 'aide_name', 'date', 'weekly_load_minutes'}`` dicts
+        ordered by weekly load, then date, then aide id
+    """
+    dates = [
+        start_date + timedelta(days=offset)
+        for offset in range((end_date - start_date).days + 1)
+        if (start_date + timedelta(days=offset)).weekday() < 5
+    ]
+    aides = session.query(TeacherAide.id, TeacherAide.name).order_by(TeacherAide.id).all()
+    if not dates or not aides:
+        return []
+    aide_ids = [aide_id for aide_id, _ in aides]
+    rows = {aide_id: row for row, aide_id in enumerate(aide_ids)}
+    columns = {day: column for column, day in enumerate(dates)}
+
+    available = availability_cache.available(session, aide_ids, dates, start_time, end_time)
+
+    absent = np.zeros((len(aide_ids), len(dates)), dtype=bool)
+    date_index = np.array([day.toordinal() for day in dates])
+    for row, aide_id in enumerate(aide_ids):
+        for absent_from, absent_to, _ in absence_index.absent_ranges(session, aide_id, start_date, end_date):
+            absent[row] |= (date_index >= absent_from.toordinal()) & (date_index <= absent_to.toordinal())
+
+    # Loads cover whole weeks, so read Monday of the first week to Sunday of the last
+    week_start = start_date - timedelta(days=start_date.weekday())
+    week_end = end_date + timedelta(days=6 - end_date.weekday())
+    week_of_column = (date_index - week_start.toordinal()) // 7
+    load = np.zeros((len(aide_ids), (week_end - week_start).days // 7 + 1), dtype=np.int64)
+    busy = np.zeros((len(aide_ids), len(dates)), dtype=bool)
+    for aide_id, day, start, end in session.query(
+        Assignment.aide_id, Assignment.date, Assignment.start_time, Assignment.end_time
+    ).filter(
+        Assignment.aide_id.isnot(None),
+        Assignment.date.between(week_start, week_end)
+    ):
+        row = rows.get(aide_id)
+        if row is None:
+            # Left pointing at an aide that no longer exists
+            continue
+        load[row, (day - week_start).days // 7] += _minutes(end) - _minutes(start)
+        column = columns.get(day)
+        if column is not None and start < end_time and start_time < end:
+            busy[row, column] = True
+
+    free = available & ~absent & ~busy
+    aide_rows, date_columns = np.nonzero(free)
+    loads = load[aide_rows, week_of_column[date_columns]]
+    order = np.lexsort((aide_rows, date_columns, loads))
+    return [
+        {
+            'aide_id': aide_ids[aide_rows[i]],
+            'aide_name': aides[aide_rows[i]][1],
+            'date': dates[date_columns[i]].isoformat(),
+            'weekly_load_minutes': int(loads[i])
+        }
+        for i in order
+    ]
+
+def check_slot_matrix(session: Session, aide_ids: Sequence[int],
+                      slots: Sequence[Tuple[date, time, time]]) -> Tuple[List[List[int]], List[List[Optional[int]]]]:
+    """Check every aide against every candidate ``(date, start_time, end_time)`` slot.
+
+    A cell is a conflict if the aide already has an overlapping assignment,
+    then absent, then outside availability, as in the single-slot validators.
+    Assignments are read with one query; absences and availability come from
+    the shared indexes.
+
+    Returns:
+        ``(statuses, conflicts)`` matrices with a row per aide and a column per
+        slot: ``SLOT_*`` codes and the id of the first conflicting assignment
+    """
+    booked: Dict[Tuple[int, date], List[Tuple[time, time, int]]] = {}
+    for assignment_id, aide_id, day, start, end in session.query(
+        Assignment.id, Assignment.aide_id, Assignment.date, Assignment.start_time, Assignment.end_time
+    ).filter(
+        Assignment.aide_id.in_(aide_ids),
+        Assignment.date.in_({day for day, _, _ in slots})
+    ).order_by(Assignment.start_time, Assignment.id):
+        booked.setdefault((aide_id, day), []).append((start, end, assignment_id))
+
+    masks = [slot_mask(start, end) for _, start, end in slots]
+    statuses: List[List[int]] = []
+    conflicts: List[List[Optional[int]]] = []
+    for aide_id in aide_ids:
+        week_masks = availability_cache.weekday_masks(session, aide_id)
+        status_row: List[int] = []
+        conflict_row: List[Optional[int]] = []
+        for (day, start, end), mask in zip(slots, masks):
+            conflict = next(
+                (assignment_id for other_start, other_end, assignment_id in booked.get((aide_id, day), ())
+                 if other_start < end and start < other_end),
+                None
+            )
+            if conflict is not None:
+                status = SLOT_CONFLICT
+            elif absence_index.is_absent(session, aide_id, day):
+                status = SLOT_ABSENT
+            elif week_masks[day.weekday()] & mask != mask:
+                status = SLOT_UNAVAILABLE
+            else:
+                status = SLOT_FREE
+            status_row.append(status)
+            conflict_row.append(conflict)
+        statuses.append(status_row)
+        conflicts.append(conflict_row)
+    return statuses, conflicts
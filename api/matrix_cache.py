@@ -0,0 +1,409 @@
+"""Materialized weekly matrices, patched in place as the schedule changes.
+
+Built matrices (:func:`api.weekly_matrix.build_weekly_matrix`) are kept per
+ISO week in a size-bounded LRU and can be mirrored to JSON files on disk.
+Writes do not throw weeks away: mapper events record which assignments,
+absences and aides changed, ``after_commit`` queues each change on the
+cached weeks it touches, and the next read of a week applies its queue by
+re-reading only the changed rows.
+
+Entries are tied to the global data version (:mod:`api.data_version`). A
+commit whose own bumps account for the whole version change is patched in.
+Anything else empties the cache, because a rebuild is always correct. That
+covers writes by another process, bulk statements the cache was not told
+about, and task, classroom or school class edits.
+"""
+
+import json
+import logging
+import os
+import tempfile
+import threading
+from collections import OrderedDict
+from datetime import date
+from time import perf_counter
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import Session, object_session
+
+from api.models import Assignment, Absence, Task, TeacherAide, Classroom, SchoolClass
+from api.data_version import transaction_bumps
+from api.weekly_matrix import (
+    DAY_NAMES, parse_week, aide_entry, assignment_entry, assignment_cells,
+    add_absences, build_weekly_matrix, week_assignments_query
+)
+
+logger = logging.getLogger(__name__)
+
+# Weeks kept in memory before the least recently used one is evicted
+DEFAULT_MAX_WEEKS = 64
+
+# Changed assignments above which a week is rebuilt rather than patched
+PATCH_MAX_ASSIGNMENTS = 1000
+
+# session.info key for the changes of the current transaction
+_CHANGES_KEY = 'matrix_cache_changes'
+
+def _copy(matrix: Dict[str, Any]) -> Dict[str, Any]:
+    # Cell payloads are replaced, never mutated, so the two dicts are all a patch touches
+    return dict(matrix, assignments=dict(matrix['assignments']), absences=dict(matrix['absences']))
+
+class _Week:
+    """A cached matrix with its cell ownership and the changes not yet applied to it."""
+
+    def __init__(self, week: str, matrix: Dict[str, Any]):
+        self.week = week
+        self.start_date, self.end_date = parse_week(week)
+        self.matrix = matrix
+        self.cells_of: Dict[int, List[str]] = {}
+        for key, entry in matrix['assignments'].items():
+            self.cells_of.setdefault(entry['assignment_id'], []).append(key)
+        self.assignment_ids: Set[int] = set()
+        self.absence_aides: Set[int] = set()
+        self.deleted_aides: Set[int] = set()
+        self.aides_changed = False
+
+    @property
+    def pending(self) -> bool:
+        return bool(self.assignment_ids or self.absence_aides or self.deleted_aides or self.aides_changed)
+
+    def overlaps(self, first: date, last: date) -> bool:
+        return first <= self.end_date and self.start_date <= last
+
+class _Changes:
+    """Matrix-relevant writes recorded during one transaction."""
+
+    def __init__(self):
+        self.assignments: Dict[int, Set[date]] = {}
+        self.absences: Dict[int, List[Tuple[date, date]]] = {}
+        self.deleted_aides: Set[int] = set()
+        self.aides_changed = False
+        # Set by writes the cache cannot patch; the commit then empties it
+        self.untracked = 0
+        self.clear = False
+
+class WeeklyMatrixCache:
+    """LRU of built weekly matrices kept current by incremental patches.
+
+    Args:
+        max_weeks: Weeks kept in memory
+        disk_dir: Directory mirroring entries as ``<week>.json``, or None
+    """
+
+    def __init__(self, max_weeks: int = DEFAULT_MAX_WEEKS, disk_dir: Optional[str] = None):
+        self._lock = threading.Lock()
+        self._weeks: 'OrderedDict[str, _Week]' = OrderedDict()
+        self.configure(max_weeks, disk_dir)
+
+    def configure(self, max_weeks: int = DEFAULT_MAX_WEEKS, disk_dir: Optional[str] = None) -> None:
+        """Set the size bound and disk directory and drop every entry."""
+        if disk_dir:
+            os.makedirs(disk_dir, exist_ok=True)
+        self.max_weeks = max_weeks
+        self.disk_dir = disk_dir
+        self.reset()
+
+    def reset(self) -> None:
+        """Drop all entries and zero the counters."""
+        with self._lock:
+            self._weeks.clear()
+            # Data version every entry reflects once its queue is applied
+            self._version: Optional[int] = None
+            self.hits = self.misses = self.disk_hits = self.evictions = 0
+            self.patches = self.patch_fallbacks = 0
+            self._patch_seconds_total = self._patch_seconds_max = self._patch_seconds_last = 0.0
+
+    def matrix(self, session: Session, week: str, version: int) -> Dict[str, Any]:
+        """Return the week's matrix at ``version``, building and caching it on a miss."""
+        matrix = self.get(session, week, version)
+        if matrix is None:
+            matrix = build_weekly_matrix(session, week)
+            self.put(week, matrix, version)
+        return matrix
+
+    def get(self, session: Session, week: str, version: int) -> Optional[Dict[str, Any]]:
+        """Return a copy of the cached week, patched up to date, or None on a miss.
+
+        Args:
+            session: Session used to read the rows a patch needs
+            week: ISO week (``YYYY-Www``)
+            version: Current data version
+        """
+        with self._lock:
+            if version != self._version:
+                # Another process wrote, or the cache was emptied
+                self._weeks.clear()
+                self._version = version
+            # Taken out while patching; commits meanwhile move the version and block the put back
+            entry = self._weeks.pop(week, None)
+        write_disk = False
+        if entry is None:
+            entry = self._read_disk(week, version)
+            if entry is None:
+                with self._lock:
+                    self.misses += 1
+                return None
+            with self._lock:
+                self.disk_hits += 1
+        elif entry.pending:
+            started = perf_counter()
+            patched = self._patch(session, entry)
+            self._record_patch(perf_counter() - started, patched)
+            if not patched:
+                with self._lock:
+                    self.misses += 1
+                return None
+            write_disk = True
+        with self._lock:
+            self.hits += 1
+        self._store(entry, version, write_disk)
+        return _copy(entry.matrix)
+
+    def put(self, week: str, matrix: Dict[str, Any], version: int) -> None:
+        """Cache a matrix built at ``version``; ignored if the version has moved on."""
+        self._store(_Week(week, _copy(matrix)), version, write_disk=True)
+
+    def committed(self, changes: Optional[_Changes], bumps: int, reached: int) -> None:
+        """Queue a committed transaction's changes, or empty the cache if they cannot be patched."""
+        with self._lock:
+            if self._version is None:
+                return
+            if self._version != reached - bumps or (changes and (changes.untracked or changes.clear)):
+                self._weeks.clear()
+                self._version = None
+                return
+            self._version = reached
+            if changes is None:
+                return
+            for week in self._weeks.values():
+                for assignment_id, days in changes.assignments.items():
+                    if any(week.start_date <= day <= week.end_date for day in days):
+                        week.assignment_ids.add(assignment_id)
+                for aide_id, ranges in changes.absences.items():
+                    if any(week.overlaps(first, last) for first, last in ranges):
+                        week.absence_aides.add(aide_id)
+                week.deleted_aides |= changes.deleted_aides
+                week.aides_changed |= changes.aides_changed
+
+    def stats(self) -> Dict[str, Any]:
+        """Return size, hit ratio and patch latency counters."""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'size': len(self._weeks),
+                'max_weeks': self.max_weeks,
+                'disk_dir': self.disk_dir,
+                'hits': self.hits,
+                'misses': self.misses,
+                'disk_hits': self.disk_hits,
+                'evictions': self.evictions,
+                'hit_ratio': round(self.hits / lookups, 4) if lookups else None,
+                'patches': self.patches,
+                'patch_fallbacks': self.patch_fallbacks,
+                'patch_latency_ms': {
+                    'last': round(self._patch_seconds_last * 1000, 3),
+                    'mean': round(self._patch_seconds_total * 1000 / self.patches, 3) if self.patches else None,
+                    'max': round(self._patch_seconds_max * 1000, 3)
+                }
+            }
+
+    def _record_patch(self, seconds: float, patched: bool) -> None:
+        with self._lock:
+            if not patched:
+                self.patch_fallbacks += 1
+                return
+            self.patches += 1
+            self._patch_seconds_last = seconds
+            self._patch_seconds_total += seconds
+            self._patch_seconds_max = max(self._patch_seconds_max, seconds)
+
+    def _patch(self, session: Session, week: _Week) -> bool:
+        """Apply a week's queued changes; False if the week must be rebuilt instead."""
+        if len(week.assignment_ids) > PATCH_MAX_ASSIGNMENTS:
+            return False
+        matrix = week.matrix
+        cells = matrix['assignments']
+        absences = matrix['absences']
+
+        if week.aides_changed:
+            matrix['aides'] = [aide_entry(aide) for aide in session.query(TeacherAide).order_by(TeacherAide.name)]
+        for aide_id in week.deleted_aides:
+            # The aide's rows were unassigned and absences cascaded away, possibly without events
+            prefix = f'{aide_id}_'
+            for key in [key for key in cells if key.startswith(prefix)]:
+                week.cells_of.pop(cells.pop(key)['assignment_id'], None)
+            for day_name in DAY_NAMES:
+                absences.pop(prefix + day_name, None)
+
+        if week.assignment_ids:
+            known_aides = {aide['id'] for aide in matrix['aides']}
+            for assignment_id in week.assignment_ids:
+                for key in week.cells_of.pop(assignment_id, ()):
+                    del cells[key]
+            for assignment in week_assignments_query(session, week.start_date, week.end_date).filter(
+                Assignment.id.in_(week.assignment_ids)
+            ):
+                keys = assignment_cells(week.start_date, assignment) if assignment.aide_id in known_aides else []
+                if any(key in cells for key in keys):
+                    # Double booking: which row shows depends on the full build order
+                    return False
+                entry = assignment_entry(assignment)
+                for key in keys:
+                    cells[key] = entry
+                if keys:
+                    week.cells_of[assignment.id] = keys
+
+        if week.absence_aides:
+            for aide_id in week.absence_aides:
+                for day_name in DAY_NAMES:
+                    absences.pop(f'{aide_id}_{day_name}', None)
+            add_absences(session, matrix, week.start_date, sorted(week.absence_aides))
+
+        week.assignment_ids = set()
+        week.absence_aides = set()
+        week.deleted_aides = set()
+        week.aides_changed = False
+        return True
+
+    def _store(self, entry: _Week, version: int, write_disk: bool) -> None:
+        with self._lock:
+            if version != self._version:
+                return
+            self._weeks[entry.week] = entry
+            self._weeks.move_to_end(entry.week)
+            while len(self._weeks) > self.max_weeks:
+                self._weeks.popitem(last=False)
+                self.evictions += 1
+        if write_disk and self.disk_dir:
+            self._write_disk(entry, version)
+
+    def _disk_path(self, week: str) -> str:
+        return os.path.join(self.disk_dir, f'{week}.json')
+
+    def _read_disk(self, week: str, version: int) -> Optional[_Week]:
+        if not self.disk_dir:
+            return None
+        try:
+            with open(self._disk_path(week)) as f:
+                stored = json.load(f)
+        except (OSError, ValueError):
+            return None
+        # Files from an older version are stale; they are overwritten on the next build
+        if stored.get('version') != version:
+            return None
+        return _Week(week, stored['matrix'])
+
+    def _write_disk(self, entry: _Week, version: int) -> None:
+        try:
+            with tempfile.NamedTemporaryFile('w', dir=self.disk_dir, suffix='.tmp', delete=False) as f:
+                json.dump({'version': version, 'matrix': entry.matrix}, f)
+            os.replace(f.name, self._disk_path(entry.week))
+        except OSError as e:
+            logger.warning(f"Could not write weekly matrix {entry.week} to disk: {e}")
+
+# Process-wide cache shared by all requests
+weekly_matrix_cache = WeeklyMatrixCache()
+
+def _changes(target) -> Optional[_Changes]:
+    session = object_session(target)
+    if session is None:
+        return None
+    return session.info.setdefault(_CHANGES_KEY, _Changes())
+
+def _record_assignment(changes: _Changes, assignment_id: int, *days: date) -> None:
+    changes.assignments.setdefault(assignment_id, set()).update(day for day in days if day is not None)
+
+def record_bulk_assignments(session: Session, assignments: Iterable[Assignment]) -> None:
+    """Track the rows of one bulk statement, which skips the ORM mapper events.
+
+    Call once per bulk INSERT of assignments, with every row it wrote, so the
+    statement no longer counts as an untracked write.
+    """
+    assignments = list(assignments)
+    changes = session.info.setdefault(_CHANGES_KEY, _Changes())
+    for assignment in assignments:
+        _record_assignment(changes, assignment.id, assignment.date)
+    # Mirrors the exemption of unassigned-only inserts in _bulk_statement
+    if any(assignment.aide_id is not None for assignment in assignments):
+        changes.untracked = max(changes.untracked - 1, 0)
+
+@event.listens_for(Assignment, 'after_insert')
+@event.listens_for(Assignment, 'after_delete')
+def _assignment_written(mapper, connection, target: Assignment) -> None:
+    changes = _changes(target)
+    if changes is not None:
+        _record_assignment(changes, target.id, target.date)
+
+@event.listens_for(Assignment, 'after_update')
+def _assignment_updated(mapper, connection, target: Assignment) -> None:
+    changes = _changes(target)
+    if changes is not None:
+        # A moved assignment leaves cells in its old week too
+        _record_assignment(changes, target.id, target.date, *inspect(target).attrs.date.history.deleted)
+
+@event.listens_for(Absence, 'after_insert')
+@event.listens_for(Absence, 'after_delete')
+@event.listens_for(Absence, 'after_update')
+def _absence_written(mapper, connection, target: Absence) -> None:
+    changes = _changes(target)
+    if changes is None:
+        return
+    attrs = inspect(target).attrs
+    first = min([target.start_date, *attrs.start_date.history.deleted])
+    last = max([target.end_date, *attrs.end_date.history.deleted])
+    for aide_id in {target.aide_id, *attrs.aide_id.history.deleted}:
+        if aide_id is not None:
+            changes.absences.setdefault(aide_id, []).append((first, last))
+
+@event.listens_for(TeacherAide, 'after_insert')
+@event.listens_for(TeacherAide, 'after_update')
+def _aide_written(mapper, connection, target: TeacherAide) -> None:
+    changes = _changes(target)
+    if changes is not None:
+        changes.aides_changed = True
+
+@event.listens_for(TeacherAide, 'after_delete')
+def _aide_deleted(mapper, connection, target: TeacherAide) -> None:
+    changes = _changes(target)
+    if changes is not None:
+        changes.aides_changed = True
+        changes.deleted_aides.add(target.id)
+
+@event.listens_for(Task, 'after_update')
+@event.listens_for(Task, 'after_delete')
+@event.listens_for(Classroom, 'after_update')
+@event.listens_for(Classroom, 'after_delete')
+@event.listens_for(SchoolClass, 'after_update')
+@event.listens_for(SchoolClass, 'after_delete')
+def _task_details_written(mapper, connection, target) -> None:
+    # Shown in every cell of the task; rare enough to rebuild for
+    changes = _changes(target)
+    if changes is not None:
+        changes.clear = True
+
+@event.listens_for(Session, 'do_orm_execute')
+def _bulk_statement(orm_execute_state) -> None:
+    if not (orm_execute_state.is_insert or orm_execute_state.is_update or orm_execute_state.is_delete):
+        return
+    classes = {mapper.class_ for mapper in orm_execute_state.all_mappers}
+    if not classes & {Assignment, Absence, Task, TeacherAide, Classroom, SchoolClass}:
+        return
+    if orm_execute_state.is_insert and classes == {Assignment}:
+        rows = orm_execute_state.parameters
+        rows = rows if isinstance(rows, list) else [rows] if rows else []
+        # Unassigned rows (e.g. generated occurrences) never show in the matrix
+        if rows and all(row.get('aide_id') is None for row in rows):
+            return
+    orm_execute_state.session.info.setdefault(_CHANGES_KEY, _Changes()).untracked += 1
+
+@event.listens_for(Session, 'after_commit')
+def _apply_committed(session: Session) -> None:
+    changes = session.info.pop(_CHANGES_KEY, None)
+    bumps, reached = transaction_bumps(session)
+    if bumps:
+        weekly_matrix_cache.committed(changes, bumps, reached)
+
+@event.listens_for(Session, 'after_rollback')
+def _discard_rolled_back(session: Session) -> None:
+    session.info.pop(_CHANGES_KEY, None)
@@ -1,8 +1,12 @@
-from .base import Base, WEEKDAY_MAP, absence_assignments
+from .base import Base, WEEKDAY_MAP, WEEKDAY_CODES, absence_assignments
 from .teacher_aide import TeacherAide
 from .availability import Availability
 from .classroom import Classroom
 from .task import Task
 from .assignment import Assignment
+from .assignment_slot import AssignmentSlot, SlotConflictError, claim_slots
 from .absence import Absence
 from .school_class import SchoolClass
+from .horizon_job import HorizonJob
+from .data_version import DataVersion
+from .occurrence_exception import OccurrenceException
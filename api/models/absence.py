@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, DateTime, Date, ForeignKey, func
+from sqlalchemy import Column, Integer, String, DateTime, Date, ForeignKey, Index, func
 from sqlalchemy.orm import relationship
 from typing import List
 from .base import Base, absence_assignments
@@ -18,6 +18,12 @@ class Absence(Base):
     aide = relationship("TeacherAide", back_populates="absences")
     assignments = relationship("Assignment", secondary=absence_assignments)
 
+    # Indexes for per-aide and per-week absence overlap lookups
+    __table_args__ = (
+        Index('absences_aide_dates_idx', 'aide_id', 'start_date', 'end_date'),
+        Index('absences_dates_idx', 'start_date', 'end_date'),
+    )
+
     def release_assignments(self, session) -> List['Assignment']:
         """Release assignments associated with this absence."""
         assignments = session.query(Assignment).filter(
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, DateTime, Date, Time, ForeignKey, Enum, func
+from sqlalchemy import Column, Integer, DateTime, Date, Time, ForeignKey, Enum, Index, func
 from sqlalchemy.orm import relationship
 from typing import List
 from .base import Base
@@ -26,20 +26,23 @@ class Assignment(Base):
     task = relationship("Task", back_populates="assignments")
     aide = relationship("TeacherAide", back_populates="assignments")
 
+    # Indexes for the conflict, duplicate and weekly-view lookups
+    __table_args__ = (
+        Index('assignments_aide_date_start_idx', 'aide_id', 'date', 'start_time'),
+        Index('assignments_task_date_idx', 'task_id', 'date'),
+        Index('assignments_date_status_idx', 'date', 'status'),
+    )
+
     def check_conflicts(self, session) -> List['Assignment']:
         """Check for scheduling conflicts with other assignments."""
         if not self.aide_id:
             return []
-        return session.query(Assignment).filter(
-            Assignment.aide_id == self.aide_id,
-            Assignment.date == self.date,
-            Assignment.id != self.id,
-            (
-                (Assignment.start_time <= self.start_time) & (self.start_time < Assignment.end_time) |
-                (Assignment.start_time < self.end_time) & (self.end_time <= Assignment.end_time) |
-                (self.start_time <= Assignment.start_time) & (Assignment.start_time < self.end_time)
-            )
-        ).all()
+        # Imported here because the index module registers events on this model
+        from api.conflict_index import conflict_index
+        ids = conflict_index.overlapping(
+            session, self.aide_id, self.date, self.start_time, self.end_time, exclude_id=self.id
+        )
+        return [session.get(Assignment, assignment_id) for assignment_id in ids]
 
     def to_dict(self):
         """Convert assignment to dictionary."""
@@ -0,0 +1,71 @@
+from sqlalchemy import Column, Integer, SmallInteger, Date, ForeignKey, CheckConstraint, UniqueConstraint, delete, event, insert, inspect
+from sqlalchemy.exc import IntegrityError
+from typing import Dict, Iterable, List
+from .base import Base
+from .assignment import Assignment
+
+class SlotConflictError(Exception):
+    """Raised when an assignment would take a half-hour slot its aide already holds."""
+
+class AssignmentSlot(Base):
+    """Half-hour slot (0 = 08:00-08:30 ... 15 = 15:30-16:00) held by an assigned assignment.
+
+    The unique (aide_id, date, slot) constraint makes double-booking an aide
+    impossible even when concurrent requests both pass the conflict check:
+    the second INSERT fails atomically. Rows are kept in sync by the
+    Assignment mapper events below and by :func:`claim_slots` for bulk inserts.
+    """
+
+    __tablename__ = 'assignment_slots'
+
+    assignment_id = Column(Integer, ForeignKey('assignments.id', ondelete='CASCADE'), primary_key=True)
+    slot = Column(SmallInteger, primary_key=True)
+    aide_id = Column(Integer, ForeignKey('teacher_aide.id', ondelete='CASCADE'), nullable=False)
+    date = Column(Date, nullable=False)
+
+    __table_args__ = (
+        UniqueConstraint('aide_id', 'date', 'slot', name='uq_assignment_slots_aide_date_slot'),
+        CheckConstraint('slot >= 0 AND slot < 16', name='ck_assignment_slots_slot'),
+    )
+
+def slot_rows(assignment: Assignment) -> List[Dict]:
+    """Return the assignment_slots rows an assignment holds (none while unassigned)."""
+    if assignment.aide_id is None:
+        return []
+    # Imported here because api.slots imports the models package
+    from api.slots import slot_mask, SLOTS_PER_DAY
+    mask = slot_mask(assignment.start_time, assignment.end_time)
+    return [
+        {'assignment_id': assignment.id, 'aide_id': assignment.aide_id, 'date': assignment.date, 'slot': slot}
+        for slot in range(SLOTS_PER_DAY) if mask >> slot & 1
+    ]
+
+def claim_slots(connection, assignments: Iterable[Assignment]) -> None:
+    """Insert the slots of new assignments, e.g. after a bulk INSERT that skips mapper events.
+
+    Raises:
+        SlotConflictError: If an aide already holds one of the slots
+    """
+    rows = [row for assignment in assignments for row in slot_rows(assignment)]
+    if not rows:
+        return
+    try:
+        connection.execute(insert(AssignmentSlot), rows)
+    except IntegrityError as e:
+        raise SlotConflictError('Teacher aide has a scheduling conflict') from e
+
+@event.listens_for(Assignment, 'after_insert')
+def _assignment_inserted(mapper, connection, target: Assignment) -> None:
+    claim_slots(connection, [target])
+
+@event.listens_for(Assignment, 'after_update')
+def _assignment_updated(mapper, connection, target: Assignment) -> None:
+    state = inspect(target)
+    if not any(state.attrs[name].history.has_changes() for name in ('aide_id', 'date', 'start_time', 'end_time')):
+        return
+    connection.execute(delete(AssignmentSlot).where(AssignmentSlot.assignment_id == target.id))
+    claim_slots(connection, [target])
+
+@event.listens_for(Assignment, 'before_delete')
+def _assignment_deleted(mapper, connection, target: Assignment) -> None:
+    connection.execute(delete(AssignmentSlot).where(AssignmentSlot.assignment_id == target.id))
@@ -13,6 +13,9 @@ WEEKDAY_MAP = {
     'SUNDAY': 'SU',
 }
 
+# Availability and RRULE weekday codes indexed by date.weekday()
+WEEKDAY_CODES = tuple(WEEKDAY_MAP.values())
+
 absence_assignments = Table(
     'absence_assignments',
     Base.metadata,
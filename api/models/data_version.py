@@ -0,0 +1,16 @@
+from sqlalchemy import Column, Integer
+from .base import Base
+
+class DataVersion(Base):
+    """Single-row counter bumped by every transaction that writes schedule data.
+
+    Read endpoints derive their ETag from it, so a client revalidating an
+    unchanged view costs one primary-key lookup. See :mod:`api.data_version`.
+    """
+
+    __tablename__ = 'data_version'
+
+    ROW_ID = 1
+
+    id = Column(Integer, primary_key=True)
+    version = Column(Integer, nullable=False, default=0)
@@ -0,0 +1,42 @@
+from sqlalchemy import Column, Integer, String, DateTime, Date, Boolean, func
+from .base import Base
+
+class HorizonJob(Base):
+    """Progress and resume cursor of a chunked horizon extension run."""
+
+    __tablename__ = 'horizon_jobs'
+
+    RUNNING = 'RUNNING'
+    COMPLETE = 'COMPLETE'
+    FAILED = 'FAILED'
+    SUPERSEDED = 'SUPERSEDED'  # Left RUNNING by an interrupted run and replaced by a newer job
+
+    id = Column(Integer, primary_key=True)
+    horizon_end = Column(Date, nullable=False)
+    full_rescan = Column(Boolean, nullable=False, default=False)
+    status = Column(String(20), nullable=False, default=RUNNING)
+    cursor_task_id = Column(Integer, nullable=False, default=0)  # Last task id committed
+    tasks_processed = Column(Integer, nullable=False, default=0)
+    assignments_created = Column(Integer, nullable=False, default=0)
+    chunks = Column(Integer, nullable=False, default=0)
+    error = Column(String(500))
+    started_at = Column(DateTime, server_default=func.now())
+    updated_at = Column(DateTime, server_default=func.now(), onupdate=func.now())
+    finished_at = Column(DateTime)
+
+    def to_dict(self):
+        """Convert job progress to dictionary."""
+        return {
+            'id': self.id,
+            'horizon_end': self.horizon_end.isoformat(),
+            'full_rescan': self.full_rescan,
+            'status': self.status,
+            'cursor_task_id': self.cursor_task_id,
+            'tasks_processed': self.tasks_processed,
+            'assignments_created': self.assignments_created,
+            'chunks': self.chunks,
+            'error': self.error,
+            'started_at': self.started_at.isoformat() if self.started_at else None,
+            'updated_at': self.updated_at.isoformat() if self.updated_at else None,
+            'finished_at': self.finished_at.isoformat() if self.finished_at else None
+        }
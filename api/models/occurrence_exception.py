@@ -0,0 +1,22 @@
+from sqlalchemy import Column, Integer, Date, DateTime, ForeignKey, UniqueConstraint, func
+from .base import Base
+
+class OccurrenceException(Base):
+    """Occurrence of a recurring task that was moved to another date or deleted.
+
+    Virtual occurrences (:mod:`api.occurrences`) are hidden by a stored row on
+    the same date; this tombstone hides them once that row is gone from the
+    date, so a moved occurrence does not show twice and a deleted one stays
+    deleted.
+    """
+
+    __tablename__ = 'occurrence_exceptions'
+
+    id = Column(Integer, primary_key=True)
+    task_id = Column(Integer, ForeignKey('tasks.id', ondelete='CASCADE'), nullable=False)
+    date = Column(Date, nullable=False)
+    created_at = Column(DateTime, server_default=func.now())
+
+    __table_args__ = (
+        UniqueConstraint('task_id', 'date', name='uq_occurrence_exceptions_task_date'),
+    )
@@ -2,7 +2,6 @@ from sqlalchemy import Column, Integer, String, DateTime, Time, Date, ForeignKey
 from sqlalchemy.orm import relationship
 from datetime import datetime, date, timedelta, time
 from typing import List, Optional
-from dateutil.rrule import rrulestr
 from .base import Base
 from .assignment import Assignment
 
@@ -12,6 +11,7 @@ class Task(Base):
     Attributes:
         ...
         is_flexible (bool): Whether the task is flexible (no set time or location)
+        generated_through (date): Last date recurring assignments have been generated up to
     """
     __tablename__ = 'tasks'
     
@@ -29,6 +29,7 @@ class Task(Base):
     created_at = Column(DateTime, server_default=func.now())
     updated_at = Column(DateTime, onupdate=func.now())
     is_flexible = Column(Boolean, default=False)
+    generated_through = Column(Date)
     
     # Relationships
     classroom = relationship('Classroom', back_populates='tasks')
@@ -49,32 +50,24 @@ class Task(Base):
         if not self.recurrence_rule:
             return []
             
-        try:
-            # Parse the recurrence rule
-            dt_start = datetime.combine(start_date, self.start_time)
-            rule = rrulestr(self.recurrence_rule, dtstart=dt_start)
+        # Import here to avoid circular import
+        from api.recurrence import expand_rrule
             
-            # Generate dates
-            dates = list(rule.between(
-                datetime.combine(start_date, self.start_time),
-                datetime.combine(end_date, self.end_time),
-                inc=True
-            ))
+        try:
+            # Expand the recurrence rule (shared with other tasks using the same rule)
+            dates = expand_rrule(self.recurrence_rule, self.start_time, start_date, end_date)
             
             # Create assignments
             assignments = []
-            for dt in dates:
-                # Skip if before task's start date
-                if dt.date() < start_date:
-                    continue
+            for occurrence in dates:
                 # Skip if after task's end date
-                if self.expires_on and dt.date() > self.expires_on:
+                if self.expires_on and occurrence > self.expires_on:
                     continue
                 # Check if assignment already exists for this date
                 if session:
                     existing = session.query(Assignment).filter_by(
                         task_id=self.id,
-                        date=dt.date(),
+                        date=occurrence,
                         start_time=self.start_time,
                         end_time=self.end_time
                     ).first()
@@ -83,7 +76,7 @@ class Task(Base):
                 # Create assignment
                 assignment = Assignment(
                     task_id=self.id,
-                    date=dt.date(),
+                    date=occurrence,
                     start_time=self.start_time,
                     end_time=self.end_time,
                     status='UNASSIGNED'
@@ -113,24 +106,8 @@ class Task(Base):
         Returns:
             Number of assignments updated
         """
-        # Get current date and calculate end date
-        start_date = date.today()
-        end_date = start_date + timedelta(weeks=4)
-        
-        # Get existing assignments in the date range
-        existing_assignments = session.query(Assignment).filter(
-            Assignment.task_id == self.id,
-            Assignment.date >= start_date,
-            Assignment.date <= end_date
-        ).all()
-        
-        # Delete existing assignments
-        for assignment in existing_assignments:
-            session.delete(assignment)
-        
-        # Generate new assignments if recurring
-        if self.recurrence_rule:
-            new_assignments = self.generate_assignments(start_date, end_date, session)
-            return len(new_assignments)
-        
-        return 0
+        # Import here to avoid circular import
+        from api.recurrence import diff_future_assignments
+
+        counts = diff_future_assignments(self, session, horizon_weeks=4)
+        return counts['inserted'] + counts['updated'] + counts['deleted']
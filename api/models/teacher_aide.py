@@ -1,7 +1,7 @@
 from sqlalchemy import Column, Integer, String, DateTime, Text, func
-from sqlalchemy.orm import relationship
+from sqlalchemy.orm import relationship, object_session
 from datetime import date, time
-from .base import Base, WEEKDAY_MAP
+from .base import Base, WEEKDAY_CODES
 
 class TeacherAide(Base):
     __tablename__ = 'teacher_aide'
@@ -19,13 +19,25 @@ class TeacherAide(Base):
     absences = relationship("Absence", back_populates="aide", cascade="all, delete-orphan")
 
     def is_available(self, date_: date, start_time: time, end_time: time) -> bool:
-        """Check if aide is available for given time slot."""
-        if any(absence.start_date <= date_ <= absence.end_date for absence in self.absences):
+        """Check if aide is available for given time slot.
+
+        Absences and weekly windows come from the shared absence index and
+        availability cache; a weekday without a window counts as unavailable.
+        """
+        from api.absence_index import absence_index
+        from api.availability_cache import availability_cache
+
+        session = object_session(self)
+        if session is None or self.id is None:
+            if any(absence.start_date <= date_ <= absence.end_date for absence in self.absences):
+                return False
+            weekday = WEEKDAY_CODES[date_.weekday()]
+            return any(
+                availability.weekday == weekday and
+                availability.start_time <= start_time and
+                availability.end_time >= end_time
+                for availability in self.availabilities
+            )
+        if absence_index.is_absent(session, self.id, date_):
             return False
-        weekday = WEEKDAY_MAP[date_.strftime('%A').upper()]
-        return any(
-            availability.weekday == weekday and
-            availability.start_time <= start_time and
-            availability.end_time >= end_time
-            for availability in self.availabilities
-        ) 
\ No newline at end of file
+        return availability_cache.is_available(session, self.id, date_, start_time, end_time, default=0)
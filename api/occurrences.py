@@ -0,0 +1,190 @@
+"""Virtual (non-materialized) recurring occurrences.
+
+When virtual mode is enabled, unassigned occurrences of recurring tasks are
+not stored as ``Assignment`` rows. They are computed from
+``Task.recurrence_rule`` whenever assignments are read, and a row is only
+written once an occurrence is assigned, edited or completed. Moving a stored
+occurrence to another date or deleting it leaves an ``OccurrenceException``
+so the original date is not expanded again.
+"""
+
+import logging
+from datetime import date, time
+from itertools import islice
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from sqlalchemy.orm import Session
+
+from api.models import Task, Assignment, OccurrenceException, WEEKDAY_CODES
+from api.constants import Status
+from api.recurrence import expand_rrules, iter_rrule, occurrence_anchor, task_occurrence_dates
+from api.slots import SlotBitmaps, slot_mask
+
+logger = logging.getLogger(__name__)
+
+_virtual_enabled = False
+
+def set_virtual_occurrences(enabled: bool) -> None:
+    """Enable or disable virtual occurrence mode."""
+    global _virtual_enabled
+    _virtual_enabled = bool(enabled)
+    logger.info(f"Virtual occurrences {'enabled' if _virtual_enabled else 'disabled'}")
+
+def virtual_occurrences_enabled() -> bool:
+    """Return whether unassigned occurrences are computed instead of stored."""
+    return _virtual_enabled
+
+def virtual_assignments(
+    session: Session,
+    start_date: date,
+    end_date: date,
+    task_id: Optional[int] = None
+) -> List[Tuple[Assignment, Task]]:
+    """Compute unassigned occurrences in ``[start_date, end_date]`` with no stored row or exception.
+
+    Args:
+        session: Database session
+        start_date: First date of the window (inclusive)
+        end_date: Last date of the window (inclusive)
+        task_id: Restrict to a single task
+
+    Returns:
+        ``(assignment, task)`` pairs where each assignment is a transient,
+        unsaved ``Assignment`` with ``id`` set to None
+    """
+    query = session.query(Task).filter(
+        Task.recurrence_rule.isnot(None),
+        Task.expires_on.is_(None) | (Task.expires_on >= start_date)
+    )
+    if task_id is not None:
+        query = query.filter(Task.id == task_id)
+    tasks = query.all()
+    if not tasks:
+        return []
+
+    rules_by_anchor: Dict[date, List[Tuple[str, time]]] = {}
+    for task in tasks:
+        rules_by_anchor.setdefault(occurrence_anchor(task, start_date), []).append(
+            (task.recurrence_rule, task.start_time)
+        )
+    expanded = {
+        anchor: expand_rrules(rules, anchor, end_date)
+        for anchor, rules in rules_by_anchor.items()
+    }
+
+    task_ids = [task.id for task in tasks]
+    stored = set(
+        session.query(Assignment.task_id, Assignment.date).filter(
+            Assignment.task_id.in_(task_ids),
+            Assignment.date >= start_date,
+            Assignment.date <= end_date
+        ).all()
+    )
+    stored.update(
+        session.query(OccurrenceException.task_id, OccurrenceException.date).filter(
+            OccurrenceException.task_id.in_(task_ids),
+            OccurrenceException.date >= start_date,
+            OccurrenceException.date <= end_date
+        ).all()
+    )
+
+    occurrences = []
+    for task in tasks:
+        dates = expanded[occurrence_anchor(task, start_date)][(task.recurrence_rule, task.start_time)]
+        for occurrence in dates:
+            if occurrence < start_date:
+                continue
+            if task.expires_on and occurrence > task.expires_on:
+                break
+            if (task.id, occurrence) in stored:
+                continue
+            occurrences.append((
+                Assignment(
+                    task_id=task.id,
+                    aide_id=None,
+                    date=occurrence,
+                    start_time=task.start_time,
+                    end_time=task.end_time,
+                    status=Status.UNASSIGNED.value
+                ),
+                task
+            ))
+    occurrences.sort(key=lambda pair: (pair[0].date, pair[0].start_time, pair[0].task_id))
+    return occurrences
+
+def occurs_on(task: Task, occurrence: date) -> bool:
+    """Check whether a task's recurrence rule produces ``occurrence``."""
+    if not task.recurrence_rule:
+        return False
+    anchor = occurrence_anchor(task, occurrence)
+    return occurrence in task_occurrence_dates(task, anchor, occurrence)
+
+def materialize_occurrence(session: Session, task: Task, occurrence: date) -> Assignment:
+    """Return the stored assignment for a task occurrence, creating it if it is virtual.
+
+    Raises:
+        ValueError: If the task's rule does not produce ``occurrence``
+    """
+    assignment = session.query(Assignment).filter_by(task_id=task.id, date=occurrence).first()
+    if assignment:
+        return assignment
+    if not occurs_on(task, occurrence):
+        raise ValueError(f"Task {task.id} does not occur on {occurrence.isoformat()}")
+    assignment = Assignment(
+        task_id=task.id,
+        date=occurrence,
+        start_time=task.start_time,
+        end_time=task.end_time,
+        status=Status.UNASSIGNED.value
+    )
+    session.add(assignment)
+    session.flush()
+    return assignment
+
+def skip_occurrence(session: Session, task: Task, occurrence: date) -> None:
+    """Record that a recurring task's occurrence was moved off ``occurrence`` or deleted.
+
+    Does nothing for non-recurring tasks or when the date is already recorded.
+    """
+    if not task or not task.recurrence_rule:
+        return
+    recorded = session.query(OccurrenceException.id).filter_by(task_id=task.id, date=occurrence).first()
+    if recorded is None:
+        session.add(OccurrenceException(task_id=task.id, date=occurrence))
+
+def preview_occurrences(
+    session: Session,
+    rrule_str: str,
+    start_time: time,
+    end_time: time,
+    start_date: date,
+    end_date: date,
+    limit: int
+) -> Iterator[Dict[str, Any]]:
+    """Expand a rule without persisting it and count the aides free in each slot.
+
+    At most ``limit`` occurrences up to ``end_date`` are expanded. Slot
+    bitmaps covering just the occurrence days are loaded before the first
+    item is yielded, so each count is a bitwise check per aide; nothing is
+    written.
+
+    Raises:
+        ValueError: If the rule cannot be parsed
+    """
+    dates = list(islice(iter_rrule(rrule_str, start_time, start_date, end_date), limit))
+    if not dates:
+        return iter(())
+
+    bitmaps = SlotBitmaps.load(session, dates[0], dates[-1], dates=dates)
+    mask = slot_mask(start_time, end_time)
+
+    return (
+        {
+            'date': occurrence.isoformat(),
+            'weekday': WEEKDAY_CODES[occurrence.weekday()],
+            'start_time': start_time.strftime('%H:%M'),
+            'end_time': end_time.strftime('%H:%M'),
+            'free_aides': len(bitmaps.free_aides(occurrence, mask))
+        }
+        for occurrence in dates
+    )
@@ -1,17 +1,309 @@
 """Recurrence engine for handling recurring tasks and assignments."""
 
+import logging
+import os
+import threading
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
 from datetime import date, datetime, time, timedelta
-from typing import List, Optional, Tuple, TYPE_CHECKING
+from time import perf_counter, sleep
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple, TYPE_CHECKING
+import numpy as np
 from dateutil.rrule import rrulestr
+from sqlalchemy import func, insert, update
 from sqlalchemy.orm import Session
 
-from api.models import Task, Assignment
+from api.models import Task, Assignment, HorizonJob, WEEKDAY_CODES
 from api.constants import Status
+from api.absence_index import absence_index
+from api.availability_cache import availability_cache
+from api.data_version import begin_write
+from api.slots import slot_mask
+
+logger = logging.getLogger(__name__)
 
 # Default horizon is 4 weeks, but can be configured up to 10 weeks
 DEFAULT_HORIZON_WEEKS = 4
 MAX_HORIZON_WEEKS = 10
 
+# Upper bound for process-pool horizon extension
+MAX_HORIZON_WORKERS = os.cpu_count() or 1
+
+# Chunked horizon job defaults: tasks/rows per transaction and pause between chunks
+DEFAULT_CHUNK_TASKS = 50
+DEFAULT_CHUNK_ROWS = 2000
+DEFAULT_CHUNK_PAUSE_SECONDS = 0.05
+
+# Maximum number of entries kept by each recurrence cache
+RECURRENCE_CACHE_SIZE = 512
+
+_MISSING = object()
+
+class LRUCache:
+    """Small thread-safe LRU cache with hit/miss/eviction counters."""
+
+    def __init__(self, maxsize: int = RECURRENCE_CACHE_SIZE):
+        self.maxsize = maxsize
+        self._entries: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key, default=_MISSING):
+        """Return the cached value for ``key``, or ``default`` on a miss."""
+        with self._lock:
+            value = self._entries.get(key, _MISSING)
+            if value is _MISSING:
+                self.misses += 1
+                return default
+            else:
+                self.hits += 1
+                self._entries.move_to_end(key)
+            return value
+
+    def put(self, key, value) -> None:
+        """Store ``value`` under ``key``, evicting the least recently used entry if full."""
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self) -> None:
+        """Drop all entries and reset the counters."""
+        with self._lock:
+            self._entries.clear()
+            self.hits = self.misses = self.evictions = 0
+
+    def stats(self) -> Dict[str, int]:
+        """Return the current size and counters."""
+        with self._lock:
+            return {
+                'size': len(self._entries),
+                'maxsize': self.maxsize,
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions
+            }
+
+# Parsed rules keyed by (normalized rule, dtstart)
+_rule_cache = LRUCache()
+# Expanded occurrence dates keyed by (normalized rule, start time, window start, window end)
+_occurrence_cache = LRUCache()
+# Windows materialized on demand: (start_date, end_date) -> signatures of the tasks expanded
+_materialized_windows = LRUCache()
+_materialize_lock = threading.Lock()
+
+def normalize_rrule(rrule_str: str) -> str:
+    """Normalize an RRULE string so equivalent rules share cache entries.
+
+    Whitespace and case are ignored and parts are sorted, so
+    ``byday=MO,WE;FREQ=WEEKLY`` and ``FREQ=WEEKLY;BYDAY=MO,WE`` are the same key.
+    """
+    rule = rrule_str.strip().upper()
+    if rule.startswith('RRULE:'):
+        rule = rule[len('RRULE:'):]
+    return ';'.join(sorted(part.strip() for part in rule.split(';')))
+
+def _cached_rule(normalized_rule: str, dt_start: datetime):
+    """Return the parsed rule for a normalized RRULE string, or None if it is invalid."""
+    key = (normalized_rule, dt_start)
+    rule = _rule_cache.get(key)
+    if rule is _MISSING:
+        try:
+            rule = rrulestr(normalized_rule, dtstart=dt_start)
+        except (ValueError, TypeError):
+            rule = None
+        _rule_cache.put(key, rule)
+    return rule
+
+def _simple_rule_spec(normalized_rule: str) -> Optional[Dict[str, Any]]:
+    """Decompose a DAILY/WEEKLY rule the vectorized expander can handle.
+
+    Returns None for anything else (other frequencies, BYMONTH, BYSETPOS,
+    ordinal BYDAY values, non-Monday WKST, timezone-aware UNTIL, malformed
+    parts...), in which case the caller falls back to dateutil.
+    """
+    spec: Dict[str, Any] = {'interval': 1, 'byday': None, 'count': None, 'until': None}
+    for part in normalized_rule.split(';'):
+        name, sep, value = part.partition('=')
+        if not sep or not value:
+            return None
+        if name == 'FREQ':
+            if value not in ('DAILY', 'WEEKLY'):
+                return None
+            spec['freq'] = value
+        elif name == 'INTERVAL':
+            if not value.isdigit() or int(value) < 1:
+                return None
+            spec['interval'] = int(value)
+        elif name == 'COUNT':
+            if not value.isdigit():
+                return None
+            spec['count'] = int(value)
+        elif name == 'BYDAY':
+            codes = value.split(',')
+            if not all(code in WEEKDAY_CODES for code in codes):
+                return None
+            spec['byday'] = [WEEKDAY_CODES.index(code) for code in codes]
+        elif name == 'UNTIL':
+            try:
+                if len(value) == 8:
+                    spec['until'] = datetime.strptime(value, '%Y%m%d')
+                elif len(value) == 15:
+                    spec['until'] = datetime.strptime(value, '%Y%m%dT%H%M%S')
+                else:
+                    return None
+            except ValueError:
+                return None
+        elif name == 'WKST' and value == 'MO':
+            continue
+        else:
+            return None
+    if 'freq' not in spec:
+        return None
+    return spec
+
+def _vectorized_dates(spec: Dict[str, Any], start_time: time, start_date: date,
+                      day_offsets: np.ndarray, weekdays: np.ndarray,
+                      week_index: np.ndarray, days: np.ndarray) -> Tuple[date, ...]:
+    """Mask a precomputed day range down to one simple rule's occurrences."""
+    interval = spec['interval']
+    if spec['freq'] == 'DAILY':
+        mask = day_offsets % interval == 0
+        if spec['byday'] is not None:
+            mask &= np.isin(weekdays, spec['byday'])
+    else:
+        byday = spec['byday'] if spec['byday'] is not None else [start_date.weekday()]
+        mask = np.isin(weekdays, byday)
+        if interval > 1:
+            mask &= week_index % interval == 0
+    if spec['until'] is not None:
+        # Occurrences carry the task's start time, so a date-only UNTIL excludes that day
+        until = spec['until']
+        last_day = until.date() if start_time <= until.time() else until.date() - timedelta(days=1)
+        mask &= days <= np.datetime64(last_day, 'D')
+    selected = days[mask]
+    if spec['count'] is not None:
+        selected = selected[:spec['count']]
+    return tuple(selected.tolist())
+
+def _dateutil_dates(normalized_rule: str, start_time: time, start_date: date,
+                    end_date: date) -> Tuple[date, ...]:
+    """Expand a rule with dateutil, returning an empty tuple if it is invalid."""
+    dt_start = datetime.combine(start_date, start_time)
+    rule = _cached_rule(normalized_rule, dt_start)
+    if rule is None:
+        return ()
+    return tuple(
+        dt.date() for dt in rule.between(
+            dt_start, datetime.combine(end_date, time.max), inc=True
+        )
+    )
+
+def expand_rrules(
+    rules: Iterable[Tuple[str, time]],
+    start_date: date,
+    end_date: date
+) -> Dict[Tuple[str, time], Tuple[date, ...]]:
+    """Expand many ``(rule, start_time)`` pairs over the same window at once.
+
+    Simple DAILY/WEEKLY rules (with optional BYDAY, INTERVAL, COUNT and
+    UNTIL) are expanded by masking a single NumPy ``datetime64`` day range
+    that is built once for the whole batch; everything else goes through
+    dateutil. Results are stored in the occurrence cache.
+
+    Returns:
+        A dict mapping each input ``(rule, start_time)`` pair to its sorted dates.
+    """
+    results: Dict[Tuple[str, time], Tuple[date, ...]] = {}
+    pending = []
+    for rrule_str, start_time in rules:
+        if (rrule_str, start_time) in results:
+            continue
+        normalized = normalize_rrule(rrule_str)
+        dates = _occurrence_cache.get((normalized, start_time, start_date, end_date))
+        if dates is _MISSING:
+            pending.append((rrule_str, start_time, normalized))
+        else:
+            results[(rrule_str, start_time)] = dates
+    if not pending:
+        return results
+
+    days = np.arange(
+        np.datetime64(start_date, 'D'),
+        np.datetime64(end_date, 'D') + 1,
+        dtype='datetime64[D]'
+    )
+    day_offsets = np.arange(len(days))
+    weekdays = (day_offsets + start_date.weekday()) % 7
+    week_index = (day_offsets + start_date.weekday()) // 7
+
+    for rrule_str, start_time, normalized in pending:
+        spec = _simple_rule_spec(normalized) if len(days) else None
+        if spec is None:
+            dates = _dateutil_dates(normalized, start_time, start_date, end_date)
+        else:
+            dates = _vectorized_dates(spec, start_time, start_date, day_offsets, weekdays, week_index, days)
+        _occurrence_cache.put((normalized, start_time, start_date, end_date), dates)
+        results[(rrule_str, start_time)] = dates
+    return results
+
+def expand_rrule(
+    rrule_str: str,
+    start_time: time,
+    start_date: date,
+    end_date: date
+) -> Tuple[date, ...]:
+    """Expand an RRULE string into occurrence dates within ``[start_date, end_date]``.
+
+    The rule is anchored at ``start_date`` + ``start_time`` like
+    :py:meth:`Task.generate_assignments`. Results are shared between all
+    tasks with the same rule, start time and window.
+
+    Returns:
+        A sorted tuple of dates, empty if the rule cannot be parsed.
+    """
+    return expand_rrules([(rrule_str, start_time)], start_date, end_date)[(rrule_str, start_time)]
+
+def iter_rrule(
+    rrule_str: str,
+    start_time: time,
+    start_date: date,
+    end_date: date
+) -> Iterator[date]:
+    """Lazily yield occurrence dates from ``start_date`` up to ``end_date``.
+
+    Unlike :func:`expand_rrule` nothing is materialized up front, so callers
+    that only need the first few occurrences of a long range can stop early.
+
+    Raises:
+        ValueError: If the rule cannot be parsed
+    """
+    rule = _cached_rule(normalize_rrule(rrule_str), datetime.combine(start_date, start_time))
+    if rule is None:
+        raise ValueError(f"Invalid recurrence rule: {rrule_str}")
+    for occurrence in rule:
+        if occurrence.date() > end_date:
+            return
+        yield occurrence.date()
+
+def recurrence_cache_stats() -> Dict[str, Dict[str, int]]:
+    """Return hit/miss/eviction counters for the rule and occurrence caches."""
+    return {
+        'rules': _rule_cache.stats(),
+        'occurrences': _occurrence_cache.stats()
+    }
+
+def clear_recurrence_caches() -> None:
+    """Empty the rule, occurrence and materialized-window caches."""
+    _rule_cache.clear()
+    _occurrence_cache.clear()
+    _materialized_windows.clear()
+
 def parse_rrule(rrule_str: str, start_date: date) -> Optional[rrulestr]:
     """Parse an iCal RRULE string into a dateutil rrule object.
     
@@ -22,11 +314,8 @@ def parse_rrule(rrule_str: str, start_date: date) -> Optional[rrulestr]:
     Returns:
         An rrule object if parsing succeeds, None otherwise
     """
-    try:
-        dt_start = datetime.combine(start_date, datetime.min.time())
-        return rrulestr(rrule_str, dtstart=dt_start)
-    except ValueError:
-        return None
+    dt_start = datetime.combine(start_date, datetime.min.time())
+    return _cached_rule(normalize_rrule(rrule_str), dt_start)
 
 def generate_assignments(
     task: Task,
@@ -52,39 +341,626 @@ def generate_assignments(
 
     return task.generate_assignments(start_date, end_date, session)
 
+def task_occurrence_dates(task: Task, start_date: date, end_date: date) -> List[date]:
+    """Expand a task's recurrence rule into occurrence dates without touching the database.
+
+    Mirrors the window and expiry handling of :py:meth:`Task.generate_assignments`.
+
+    Args:
+        task: The recurring task to expand.
+        start_date: First date of the window (inclusive).
+        end_date: Last date of the window (inclusive).
+
+    Returns:
+        Sorted occurrence dates, or an empty list if the rule cannot be parsed.
+    """
+    if not task.recurrence_rule:
+        return []
+    dates = expand_rrule(task.recurrence_rule, task.start_time, start_date, end_date)
+    if not dates:
+        dt_start = datetime.combine(start_date, task.start_time)
+        if _cached_rule(normalize_rrule(task.recurrence_rule), dt_start) is None:
+            logger.warning(f"Skipping task {task.id} with invalid recurrence rule '{task.recurrence_rule}'")
+        return []
+    if task.expires_on:
+        return [d for d in dates if d <= task.expires_on]
+    return list(dates)
+
+def occurrence_anchor(task: Task, start_date: date) -> date:
+    """Date a task's rule is anchored at, so INTERVAL/COUNT stay stable across windows."""
+    if task.created_at:
+        return min(task.created_at.date(), start_date)
+    return start_date
+
+@contextmanager
+def _timed_phase(phases: Dict[str, Dict[str, Any]], name: str) -> Iterator[Dict[str, Any]]:
+    """Record the wall-clock duration of a horizon extension phase.
+
+    The yielded dict can be used to attach a ``rows`` count to the phase.
+    """
+    phase = {'rows': 0}
+    started = perf_counter()
+    try:
+        yield phase
+    finally:
+        phase['seconds'] = round(perf_counter() - started, 6)
+        phases[name] = phase
+
+# Work item for occurrence expansion: (task_id, rule, start_time, expires_on, anchor, window_start)
+ExpansionItem = Tuple[int, str, time, Optional[date], date, date]
+
+def expand_occurrence_shard(items: List[ExpansionItem], end_date: date) -> List[Tuple[int, date]]:
+    """Expand a shard of tasks into ``(task_id, date)`` occurrence pairs.
+
+    Only plain values go in and out so the shard can be expanded in a worker
+    process; nothing here touches the database. Rules are expanded from
+    their anchor and dates before ``window_start`` are dropped.
+    """
+    rules_by_anchor: Dict[date, List[Tuple[str, time]]] = {}
+    for _, rule, start_time, _, anchor, _ in items:
+        rules_by_anchor.setdefault(anchor, []).append((rule, start_time))
+    expanded = {
+        anchor: expand_rrules(rules, anchor, end_date)
+        for anchor, rules in rules_by_anchor.items()
+    }
+
+    occurrences = []
+    for task_id, rule, start_time, expires_on, anchor, window_start in items:
+        for occurrence in expanded[anchor][(rule, start_time)]:
+            if occurrence < window_start:
+                continue
+            if expires_on and occurrence > expires_on:
+                break
+            occurrences.append((task_id, occurrence))
+    return occurrences
+
+def _shard_by_id(items: List[ExpansionItem], shards: int) -> List[List[ExpansionItem]]:
+    """Split work items into contiguous task-id ranges of roughly equal size."""
+    items = sorted(items, key=lambda item: item[0])
+    size = -(-len(items) // shards)
+    return [items[i:i + size] for i in range(0, len(items), size)]
+
+def _expand_items(items: List[ExpansionItem], end_date: date, workers: int,
+                  executor: Optional[ProcessPoolExecutor] = None) -> Tuple[List[Tuple[int, date]], int]:
+    """Expand work items serially or across a process pool.
+
+    Args:
+        items: Work items to expand
+        end_date: Last date to expand to (inclusive)
+        workers: Number of shards to split the items into
+        executor: Pool to reuse across calls; a pool is created for this call if omitted
+
+    Returns:
+        The ``(task_id, date)`` pairs and the number of shards used
+    """
+    if workers <= 1 or len(items) < 2:
+        return expand_occurrence_shard(items, end_date), 1
+    shards = _shard_by_id(items, workers)
+    if executor is None:
+        with ProcessPoolExecutor(max_workers=len(shards)) as executor:
+            return _expand_shards(executor, shards, end_date), len(shards)
+    return _expand_shards(executor, shards, end_date), len(shards)
+
+def _expand_shards(executor: ProcessPoolExecutor, shards: List[List[ExpansionItem]],
+                   end_date: date) -> List[Tuple[int, date]]:
+    futures = [executor.submit(expand_occurrence_shard, shard, end_date) for shard in shards]
+    occurrences = []
+    for future in futures:
+        occurrences.extend(future.result())
+    return occurrences
+
+def _recurring_tasks_query(session: Session, today: date, end_date: date, full_rescan: bool):
+    """Query active recurring tasks that still need expanding up to ``end_date``."""
+    query = session.query(Task).filter(
+        Task.recurrence_rule.isnot(None),
+        Task.expires_on.is_(None) | (Task.expires_on >= today)
+    )
+    if not full_rescan:
+        query = query.filter(
+            Task.generated_through.is_(None) | (Task.generated_through < end_date)
+        )
+    return query
+
+def _expansion_items(tasks: List[Task], today: date, full_rescan: bool) -> List[ExpansionItem]:
+    """Build expansion work items, keeping only dates after each task's watermark.
+
+    Rules stay anchored at :func:`occurrence_anchor`, so INTERVAL and COUNT
+    rules produce the same dates as virtual occurrences whatever the watermark.
+    """
+    items = []
+    for task in tasks:
+        window_start = today
+        if not full_rescan and task.generated_through and task.generated_through >= today:
+            window_start = task.generated_through + timedelta(days=1)
+        items.append((task.id, task.recurrence_rule, task.start_time, task.expires_on,
+                      occurrence_anchor(task, today), window_start))
+    return items
+
+def _load_existing_keys(session: Session, items: List[ExpansionItem], end_date: date,
+                        task_ids: Optional[List[int]] = None) -> set:
+    """Load ``(task_id, date, start_time)`` keys already stored for the expansion window."""
+    if not items:
+        return set()
+    query = session.query(Assignment.task_id, Assignment.date, Assignment.start_time).filter(
+        Assignment.date >= min(item[5] for item in items),
+        Assignment.date <= end_date
+    )
+    if task_ids is not None:
+        query = query.filter(Assignment.task_id.in_(task_ids))
+    return set(query.all())
+
+def _new_assignment_rows(occurrences: List[Tuple[int, date]], tasks_by_id: Dict[int, Task],
+                         existing_keys: set) -> List[Dict[str, Any]]:
+    """Turn expanded occurrences into insert rows, skipping keys that already exist."""
+    new_rows = []
+    for task_id, occurrence in occurrences:
+        task = tasks_by_id[task_id]
+        key = (task_id, occurrence, task.start_time)
+        if key in existing_keys:
+            continue
+        existing_keys.add(key)
+        new_rows.append({
+            'task_id': task_id,
+            'date': occurrence,
+            'start_time': task.start_time,
+            'end_time': task.end_time,
+            'status': Status.UNASSIGNED.value
+        })
+    return new_rows
+
+def _write_expansion(session: Session, new_rows: List[Dict[str, Any]], task_ids: List[int],
+                     end_date: date) -> None:
+    """Bulk-insert new rows and advance the watermark of the expanded tasks."""
+    if new_rows:
+        session.execute(insert(Assignment), new_rows)
+    if task_ids:
+        session.execute(
+            update(Task).where(Task.id.in_(task_ids)).values(generated_through=end_date)
+        )
+
+def bulk_extend_assignment_horizon(
+    session: Session,
+    horizon_weeks: int = DEFAULT_HORIZON_WEEKS,
+    full_rescan: bool = False,
+    workers: int = 1
+) -> Dict[str, Any]:
+    """Extend the assignment horizon for all recurring tasks using set-based operations.
+
+    Each task is only expanded from the day after its ``generated_through``
+    watermark (or today, whichever is later) to the new horizon end, so a
+    daily run appends a few days instead of rescanning the whole horizon.
+    Existing ``(task_id, date, start_time)`` keys for that window are loaded
+    in a single query, missing occurrences are computed in memory and the new
+    rows are written with one executemany insert.
+
+    With ``workers > 1`` the tasks are split into task-id range shards that
+    are expanded in a :class:`~concurrent.futures.ProcessPoolExecutor`; the
+    calling process remains the only writer.
+
+    Args:
+        session: The database session
+        horizon_weeks: Number of weeks to extend the horizon (default: 4)
+        full_rescan: Ignore the watermarks and re-expand every task from today
+        workers: Number of worker processes used for expansion (1 = in process)
+
+    Returns:
+        A report dict with ``tasks_processed``, ``assignments_created`` and
+        per-phase ``seconds``/``rows`` under ``phases``.
+    """
+    if not 1 <= horizon_weeks <= MAX_HORIZON_WEEKS:
+        raise ValueError(f"Horizon must be between 1 and {MAX_HORIZON_WEEKS} weeks")
+    if workers < 1:
+        raise ValueError("Workers must be at least 1")
+    workers = min(workers, MAX_HORIZON_WORKERS)
+
+    today = date.today()
+    end_date = today + timedelta(weeks=horizon_weeks)
+    phases: Dict[str, Dict[str, Any]] = {}
+
+    with _timed_phase(phases, 'load_tasks') as phase:
+        recurring_tasks = _recurring_tasks_query(session, today, end_date, full_rescan).all()
+        phase['rows'] = len(recurring_tasks)
+
+    tasks_by_id = {task.id: task for task in recurring_tasks}
+    items = _expansion_items(recurring_tasks, today, full_rescan)
+
+    with _timed_phase(phases, 'load_existing') as phase:
+        existing_keys = _load_existing_keys(session, items, end_date)
+        phase['rows'] = len(existing_keys)
+
+    with _timed_phase(phases, 'expand') as phase:
+        occurrences, phase['shards'] = _expand_items(items, end_date, workers)
+        new_rows = _new_assignment_rows(occurrences, tasks_by_id, existing_keys)
+        phase['rows'] = len(new_rows)
+
+    with _timed_phase(phases, 'insert') as phase:
+        _write_expansion(session, new_rows, list(tasks_by_id), end_date)
+        phase['rows'] = len(new_rows)
+
+    logger.info(
+        "Horizon extension: %d tasks, %d assignments created (%s)",
+        len(recurring_tasks), len(new_rows),
+        ', '.join(f"{name}={p['seconds']:.3f}s/{p['rows']} rows" for name, p in phases.items())
+    )
+
+    return {
+        'tasks_processed': len(recurring_tasks),
+        'assignments_created': len(new_rows),
+        'horizon_weeks': horizon_weeks,
+        'workers': workers,
+        'phases': phases
+    }
+
+def run_chunked_horizon_extension(
+    session: Session,
+    horizon_weeks: int = DEFAULT_HORIZON_WEEKS,
+    chunk_tasks: int = DEFAULT_CHUNK_TASKS,
+    chunk_rows: int = DEFAULT_CHUNK_ROWS,
+    pause_seconds: float = DEFAULT_CHUNK_PAUSE_SECONDS,
+    full_rescan: bool = False,
+    workers: int = 1,
+    should_stop: Optional[Callable[[], bool]] = None
+) -> HorizonJob:
+    """Extend the horizon as a resumable job that commits in bounded chunks.
+
+    Tasks are processed in id order, at most ``chunk_tasks`` tasks or roughly
+    ``chunk_rows`` new assignments per transaction. After every chunk the job
+    row's cursor is advanced and committed, and the job sleeps for
+    ``pause_seconds`` so interactive writers can take the SQLite write lock.
+    With ``workers > 1`` one process pool expands every chunk of the job, and
+    tasks the row budget cuts from a chunk keep their expansion for the next.
+    The latest unfinished job is resumed from its cursor if it has the same
+    horizon end and rescan mode. Otherwise it, and any older unfinished job,
+    is closed out as ``SUPERSEDED`` and a new job starts; tasks it already
+    processed only need the days past their watermark.
+
+    Args:
+        session: Database session; it is committed after every chunk
+        horizon_weeks: Number of weeks to extend the horizon (default: 4)
+        chunk_tasks: Maximum tasks per transaction
+        chunk_rows: Soft maximum of new assignments per transaction
+        pause_seconds: Sleep between chunks
+        full_rescan: Ignore the watermarks and re-expand every task from today
+        workers: Number of worker processes used to expand each chunk
+        should_stop: Optional callable checked between chunks to interrupt the job
+
+    Returns:
+        The ``HorizonJob`` row describing the run
+    """
+    if not 1 <= horizon_weeks <= MAX_HORIZON_WEEKS:
+        raise ValueError(f"Horizon must be between 1 and {MAX_HORIZON_WEEKS} weeks")
+    if chunk_tasks < 1 or chunk_rows < 1:
+        raise ValueError("Chunk sizes must be at least 1")
+    if workers < 1:
+        raise ValueError("Workers must be at least 1")
+
+    today = date.today()
+    end_date = today + timedelta(weeks=horizon_weeks)
+
+    unfinished = session.query(HorizonJob).filter(
+        HorizonJob.status == HorizonJob.RUNNING
+    ).order_by(HorizonJob.id.desc()).all()
+    if unfinished and unfinished[0].horizon_end == end_date and unfinished[0].full_rescan == full_rescan:
+        job = unfinished.pop(0)
+        logger.info(f"Resuming horizon job {job.id} after task {job.cursor_task_id}")
+    else:
+        job = HorizonJob(horizon_end=end_date, full_rescan=full_rescan)
+        session.add(job)
+        session.flush()
+    for stale in unfinished:
+        stale.status = HorizonJob.SUPERSEDED
+        stale.error = f"Superseded by horizon job {job.id}"
+        stale.finished_at = datetime.now()
+        logger.info(f"Closed out horizon job {stale.id} (horizon end {stale.horizon_end}), superseded by job {job.id}")
+    session.commit()
+
+    workers = min(workers, MAX_HORIZON_WORKERS)
+    executor = ProcessPoolExecutor(max_workers=workers) if workers > 1 else None
+    # Expansions of tasks cut from the previous chunk, by work item so edited tasks are expanded again
+    carried: Dict[ExpansionItem, List[Tuple[int, date]]] = {}
+    try:
+        while True:
+            if should_stop and should_stop():
+                logger.info(f"Horizon job {job.id} interrupted at task {job.cursor_task_id}")
+                return job
+
+            tasks = _recurring_tasks_query(session, today, end_date, full_rescan).filter(
+                Task.id > job.cursor_task_id
+            ).order_by(Task.id).limit(chunk_tasks).all()
+            if not tasks:
+                break
+
+            items = _expansion_items(tasks, today, full_rescan)
+            expanded, _ = _expand_items(
+                [item for item in items if item not in carried], end_date, workers, executor
+            )
+            occurrences = [occ for item in items if item in carried for occ in carried[item]] + expanded
+
+            # Cut the chunk at a task boundary once the row budget is reached
+            rows_per_task: Dict[int, int] = {}
+            for task_id, _ in occurrences:
+                rows_per_task[task_id] = rows_per_task.get(task_id, 0) + 1
+            chunk, budget = [], 0
+            for task in tasks:
+                chunk.append(task)
+                budget += rows_per_task.get(task.id, 0)
+                if budget >= chunk_rows:
+                    break
+            chunk_ids = [task.id for task in chunk]
+            carried = {}
+            if len(chunk) < len(tasks):
+                included = set(chunk_ids)
+                by_task: Dict[int, List[Tuple[int, date]]] = {}
+                for occurrence in occurrences:
+                    by_task.setdefault(occurrence[0], []).append(occurrence)
+                carried = {item: by_task.get(item[0], []) for item in items if item[0] not in included}
+                items = [item for item in items if item[0] in included]
+                occurrences = [occ for occ in occurrences if occ[0] in included]
+
+            existing_keys = _load_existing_keys(session, items, end_date, task_ids=chunk_ids)
+            new_rows = _new_assignment_rows(occurrences, {task.id: task for task in chunk}, existing_keys)
+            _write_expansion(session, new_rows, chunk_ids, end_date)
+
+            job.cursor_task_id = chunk_ids[-1]
+            job.tasks_processed += len(chunk)
+            job.assignments_created += len(new_rows)
+            job.chunks += 1
+            session.commit()
+
+            if pause_seconds:
+                sleep(pause_seconds)
+
+        job.status = HorizonJob.COMPLETE
+        job.finished_at = datetime.now()
+        session.commit()
+    except Exception as e:
+        session.rollback()
+        job.status = HorizonJob.FAILED
+        job.error = str(e)[:500]
+        job.finished_at = datetime.now()
+        session.commit()
+        raise
+    finally:
+        if executor is not None:
+            executor.shutdown()
+
+    logger.info(
+        f"Horizon job {job.id} complete: {job.tasks_processed} tasks, "
+        f"{job.assignments_created} assignments in {job.chunks} chunks"
+    )
+    return job
+
+def latest_horizon_job(session: Session) -> Optional[HorizonJob]:
+    """Return the most recently started horizon job, if any."""
+    return session.query(HorizonJob).order_by(HorizonJob.id.desc()).first()
+
 def extend_assignment_horizon(
     session: Session,
-    horizon_weeks: int = DEFAULT_HORIZON_WEEKS
+    horizon_weeks: int = DEFAULT_HORIZON_WEEKS,
+    workers: int = 1
 ) -> Tuple[int, int]:
     """Extend the assignment horizon for all recurring tasks.
     
     Args:
         session: The database session
         horizon_weeks: Number of weeks to extend the horizon (default: 4)
+        workers: Number of worker processes used for expansion (default: 1)
         
     Returns:
         A tuple of (tasks_processed, assignments_created)
     """
-    # Import here to avoid circular import
-    from api.models import Task
-    if not 1 <= horizon_weeks <= MAX_HORIZON_WEEKS:
-        raise ValueError(f"Horizon must be between 1 and {MAX_HORIZON_WEEKS} weeks")
-        
+    report = bulk_extend_assignment_horizon(session, horizon_weeks, workers=workers)
+    return report['tasks_processed'], report['assignments_created']
+
+def _task_signature(task: Task) -> Tuple:
+    """Identify a task's expansion inputs so edited tasks are expanded again."""
+    return (task.id, task.recurrence_rule, task.start_time, task.end_time, task.expires_on)
+
+def _window_tasks(session: Session, start_date: date, end_date: date, done: frozenset) -> List[Task]:
+    """Return recurring tasks not yet generated through ``end_date`` and not memoized as done."""
+    return [
+        task for task in session.query(Task).filter(
+            Task.recurrence_rule.isnot(None),
+            Task.expires_on.is_(None) | (Task.expires_on >= start_date),
+            Task.generated_through.is_(None) | (Task.generated_through < end_date)
+        ).populate_existing()
+        if _task_signature(task) not in done
+    ]
+
+def materialize_window(session: Session, start_date: date, end_date: date) -> int:
+    """Generate missing assignments for ``[start_date, end_date]`` on demand.
+
+    Used by read paths when a week past the generated horizon is requested.
+    All active recurring tasks whose ``generated_through`` watermark ends
+    before ``end_date`` are expanded for just that window in one bulk insert.
+    The watermark is only advanced for tasks whose watermark already reaches
+    the window, so a skipped gap is still filled by the horizon job later.
+
+    A process-wide lock serializes concurrent requests and the rows are
+    committed before it is released; windows already expanded for the same
+    task definitions are remembered and skipped without querying. The
+    stored keys are read after the database write lock is taken, so another
+    process materializing the same window waits and then skips its rows.
+
+    Args:
+        session: Database session; it is committed when rows are written
+        start_date: First date of the window (inclusive)
+        end_date: Last date of the window (inclusive)
+
+    Returns:
+        The number of assignments created
+    """
     today = date.today()
-    end_date = today + timedelta(weeks=horizon_weeks)
-    
-    # Get all recurring tasks
-    recurring_tasks = session.query(Task).filter(
-        Task.recurrence_rule.isnot(None),
-        Task.expires_on.is_(None) | (Task.expires_on >= today)
-    ).all()
-    
-    total_assignments = 0
-    for task in recurring_tasks:
-        assignments = generate_assignments(task, today, end_date, session)
-        total_assignments += len(assignments)
-    
-    return len(recurring_tasks), total_assignments
+    start_date = max(start_date, today)
+    if end_date < start_date:
+        return 0
+
+    window = (start_date, end_date)
+    with _materialize_lock:
+        done = _materialized_windows.get(window, frozenset())
+        if not _window_tasks(session, start_date, end_date, done):
+            return 0
+        begin_write(session)
+        # Re-read under the write lock: another process may have filled the window meanwhile
+        tasks = _window_tasks(session, start_date, end_date, done)
+        if not tasks:
+            session.rollback()
+            return 0
+
+        items = []
+        contiguous_ids = []
+        for task in tasks:
+            window_start = start_date
+            watermark = task.generated_through or today - timedelta(days=1)
+            if watermark + timedelta(days=1) >= start_date:
+                window_start = max(start_date, watermark + timedelta(days=1))
+                contiguous_ids.append(task.id)
+            items.append((task.id, task.recurrence_rule, task.start_time, task.expires_on,
+                          occurrence_anchor(task, start_date), window_start))
+
+        tasks_by_id = {task.id: task for task in tasks}
+        existing_keys = _load_existing_keys(session, items, end_date, task_ids=list(tasks_by_id))
+        occurrences, _ = _expand_items(items, end_date, workers=1)
+        new_rows = _new_assignment_rows(occurrences, tasks_by_id, existing_keys)
+        _write_expansion(session, new_rows, contiguous_ids, end_date)
+        session.commit()
+
+        _materialized_windows.put(window, done | {_task_signature(task) for task in tasks})
+
+    logger.info(
+        "Materialized %s..%s on demand: %d tasks, %d assignments created",
+        start_date, end_date, len(tasks), len(new_rows)
+    )
+    return len(new_rows)
+
+def _aide_fits(assignment: Assignment, others: List[Assignment], absent: bool,
+               week_masks: Tuple[int, ...]) -> bool:
+    """Check whether an assignment's aide can still cover its (new) time slot."""
+    for other in others:
+        if other.date == assignment.date and (
+            other.start_time < assignment.end_time and assignment.start_time < other.end_time
+        ):
+            return False
+    if absent:
+        return False
+    needed = slot_mask(assignment.start_time, assignment.end_time)
+    return week_masks[assignment.date.weekday()] & needed == needed
+
+def diff_future_assignments(task: Task, session: Session,
+                            horizon_weeks: int = DEFAULT_HORIZON_WEEKS,
+                            insert_new: bool = True,
+                            generated_through: Optional[date] = None) -> Dict[str, int]:
+    """Reconcile a task's future assignments with its current rule and times.
+
+    Only dates that disappeared from the rule are deleted and only new dates
+    are inserted. Surviving rows have their times updated in place and keep
+    their aide as long as the aide is still free, present and available for
+    the new slot; otherwise the row is released back to UNASSIGNED.
+
+    Every future row of the task is reconciled: the window runs to the
+    latest of ``horizon_weeks`` from today, the previous watermark and the
+    task's last stored assignment, so rows from a longer horizon or from
+    on-demand weeks do not keep the old rule or times.
+
+    Args:
+        task: The task whose assignments need reconciling
+        session: Database session
+        horizon_weeks: Minimum number of weeks to look ahead for assignments
+        insert_new: Insert rows for new dates. False when occurrences are
+            virtual; dates are then expanded from :func:`occurrence_anchor`
+            like the virtual ones, so INTERVAL rules agree on the dates
+        generated_through: Watermark before the edit (defaults to the task's own)
+
+    Returns:
+        A dict with ``inserted``, ``updated``, ``deleted`` and ``released`` counts
+    """
+    start_date = date.today()
+    if generated_through is None:
+        generated_through = task.generated_through
+    latest_stored = session.query(func.max(Assignment.date)).filter(
+        Assignment.task_id == task.id
+    ).scalar()
+    end_date = max(
+        day for day in (start_date + timedelta(weeks=horizon_weeks), generated_through, latest_stored)
+        if day is not None
+    )
+
+    existing_by_date: Dict[date, List[Assignment]] = {}
+    for assignment in session.query(Assignment).filter(
+        Assignment.task_id == task.id,
+        Assignment.date >= start_date,
+        Assignment.date <= end_date
+    ).order_by(Assignment.date, Assignment.id):
+        existing_by_date.setdefault(assignment.date, []).append(assignment)
+
+    anchor = start_date if insert_new else occurrence_anchor(task, start_date)
+    new_dates = {day for day in task_occurrence_dates(task, anchor, end_date) if day >= start_date}
+
+    counts = {'inserted': 0, 'updated': 0, 'deleted': 0, 'released': 0}
+
+    # Dates that are no longer produced by the rule, plus duplicate rows per date
+    surviving = []
+    for occurrence, rows in existing_by_date.items():
+        keep = rows[:1] if occurrence in new_dates else []
+        for row in rows[len(keep):]:
+            session.delete(row)
+            counts['deleted'] += 1
+        surviving.extend(keep)
+
+    moved = [
+        a for a in surviving
+        if a.start_time != task.start_time or a.end_time != task.end_time
+    ]
+    if moved:
+        aide_ids = {a.aide_id for a in moved if a.aide_id}
+        others_by_aide: Dict[int, List[Assignment]] = {}
+        # Looked up before the loop below dirties the rows, so nothing is flushed per row
+        absent = {
+            (a.aide_id, a.date): absence_index.is_absent(session, a.aide_id, a.date)
+            for a in moved if a.aide_id
+        }
+        week_masks = {aide_id: availability_cache.weekday_masks(session, aide_id) for aide_id in aide_ids}
+        if aide_ids:
+            for other in session.query(Assignment).filter(
+                Assignment.aide_id.in_(aide_ids),
+                Assignment.task_id != task.id,
+                Assignment.date >= start_date,
+                Assignment.date <= end_date
+            ):
+                others_by_aide.setdefault(other.aide_id, []).append(other)
+
+        for assignment in moved:
+            assignment.start_time = task.start_time
+            assignment.end_time = task.end_time
+            if assignment.aide_id and not _aide_fits(
+                assignment,
+                others_by_aide.get(assignment.aide_id, []),
+                absent[(assignment.aide_id, assignment.date)],
+                week_masks[assignment.aide_id]
+            ):
+                assignment.aide_id = None
+                assignment.status = Status.UNASSIGNED.value
+                counts['released'] += 1
+            counts['updated'] += 1
+
+    new_rows = []
+    if insert_new:
+        new_rows = [
+            {
+                'task_id': task.id,
+                'date': occurrence,
+                'start_time': task.start_time,
+                'end_time': task.end_time,
+                'status': Status.UNASSIGNED.value
+            }
+            for occurrence in sorted(new_dates - set(existing_by_date))
+        ]
+    if new_rows:
+        session.flush()
+        session.execute(insert(Assignment), new_rows)
+    counts['inserted'] = len(new_rows)
+
+    return counts
 
 def update_future_assignments(task: Task, session, old_recurrence: Optional[str] = None,
                             old_start_time: Optional[time] = None,
@@ -98,10 +974,10 @@ def update_future_assignments(task: Task, session, old_recurrence: Optional[str]
         old_recurrence: Previous recurrence rule (if changed)
         old_start_time: Previous start time (if changed)
         old_end_time: Previous end time (if changed)
-        horizon_weeks: Number of weeks to look ahead for assignments
+        horizon_weeks: Minimum number of weeks to look ahead for assignments
         
     Returns:
-        Number of assignments updated
+        Number of assignments inserted, updated or deleted
     """
     # Check if any changes were made
     if (old_recurrence == task.recurrence_rule and
@@ -109,25 +985,6 @@ def update_future_assignments(task: Task, session, old_recurrence: Optional[str]
         old_end_time == task.end_time):
         return 0
 
-    # Get current date and calculate end date
-    start_date = date.today()
-    end_date = start_date + timedelta(weeks=horizon_weeks)
-    
-    # Get existing assignments in the date range
-    existing_assignments = session.query(Assignment).filter(
-        Assignment.task_id == task.id,
-        Assignment.date >= start_date,
-        Assignment.date <= end_date
-    ).all()
-    
-    # Delete existing assignments
-    for assignment in existing_assignments:
-        session.delete(assignment)
-    
-    # Generate new assignments
-    new_assignments = task.generate_assignments(start_date, end_date, session)
-    
-    # Note: Commit is now handled by the calling function
-    # This maintains transaction isolation and allows for proper error handling
-    
-    return len(new_assignments)
+    # Note: Commit is handled by the calling function
+    counts = diff_future_assignments(task, session, horizon_weeks)
+    return counts['inserted'] + counts['updated'] + counts['deleted']
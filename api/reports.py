@@ -0,0 +1,96 @@
+"""Term-wide scheduling audits."""
+
+import heapq
+from datetime import date, time, timedelta
+from typing import Any, Dict, Iterator, List, Tuple
+
+from sqlalchemy.orm import Session
+
+from api.models import Assignment, Absence
+from api.availability_cache import availability_cache
+from api.slots import slot_mask
+
+# Rows fetched per round trip while sweeping
+SWEEP_BATCH_SIZE = 1000
+
+DOUBLE_BOOKING = 'DOUBLE_BOOKING'
+ON_ABSENCE = 'ON_ABSENCE'
+OUTSIDE_AVAILABILITY = 'OUTSIDE_AVAILABILITY'
+
+def _absence_days(session: Session, start_date: date, end_date: date) -> Dict[Tuple[int, date], int]:
+    """Map every (aide_id, day) covered by an absence in the range to the absence id."""
+    days = {}
+    for absence_id, aide_id, absent_from, absent_to in session.query(
+        Absence.id, Absence.aide_id, Absence.start_date, Absence.end_date
+    ).filter(Absence.start_date <= end_date, Absence.end_date >= start_date):
+        day = max(absent_from, start_date)
+        while day <= min(absent_to, end_date):
+            days.setdefault((aide_id, day), absence_id)
+            day += timedelta(days=1)
+    return days
+
+def _day_violations(rows: List[Tuple[int, time, time]], absence_id, available_mask: int) -> List[Dict[str, Any]]:
+    """Sweep one aide's day (rows sorted by start) and list its violations."""
+    violations = []
+    active: List[Tuple[time, int]] = []  # min-heap of (end_time, assignment_id)
+    for assignment_id, start, end in rows:
+        while active and active[0][0] <= start:
+            heapq.heappop(active)
+        for _, other_id in sorted(active, key=lambda item: item[1]):
+            violations.append({'type': DOUBLE_BOOKING, 'assignment_ids': [other_id, assignment_id]})
+        heapq.heappush(active, (end, assignment_id))
+
+        if absence_id is not None:
+            violations.append({'type': ON_ABSENCE, 'assignment_id': assignment_id, 'absence_id': absence_id})
+        needed = slot_mask(start, end)
+        if available_mask & needed != needed:
+            violations.append({'type': OUTSIDE_AVAILABILITY, 'assignment_id': assignment_id})
+    return violations
+
+def sweep_conflicts(session: Session, start_date: date, end_date: date) -> Iterator[Dict[str, Any]]:
+    """Yield scheduling violations in ``[start_date, end_date]`` grouped by aide and day.
+
+    Assigned rows are streamed in ``(aide_id, date, start_time)`` order and
+    each aide's day is checked with a sweep line, so the whole range is read
+    once. Absences are loaded up front and availability masks come from the
+    shared cache, both joined in memory. A group is yielded as soon as its day
+    is complete.
+
+    Yields:
+        ``{'aide_id', 'date', 'violations'}`` dicts; days without violations are skipped
+    """
+    absences = _absence_days(session, start_date, end_date)
+    # Load the masks before the stream opens its cursor
+    availability_cache.snapshot(session)
+
+    rows = session.query(
+        Assignment.aide_id, Assignment.date, Assignment.id,
+        Assignment.start_time, Assignment.end_time
+    ).filter(
+        Assignment.aide_id.isnot(None),
+        Assignment.date.between(start_date, end_date)
+    ).order_by(
+        Assignment.aide_id, Assignment.date, Assignment.start_time, Assignment.id
+    ).yield_per(SWEEP_BATCH_SIZE)
+
+    def flush(key, day_rows):
+        aide_id, day = key
+        violations = _day_violations(
+            day_rows, absences.get(key), availability_cache.weekday_masks(session, aide_id)[day.weekday()]
+        )
+        if violations:
+            return {'aide_id': aide_id, 'date': day.isoformat(), 'violations': violations}
+        return None
+
+    current = None
+    day_rows: List[Tuple[int, time, time]] = []
+    for aide_id, day, assignment_id, start, end in rows:
+        if (aide_id, day) != current:
+            group = flush(current, day_rows) if current else None
+            if group:
+                yield group
+            current, day_rows = (aide_id, day), []
+        day_rows.append((assignment_id, start, end))
+    group = flush(current, day_rows) if current else None
+    if group:
+        yield group
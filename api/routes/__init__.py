@@ -5,25 +5,30 @@ import logging
 # Import all route resources
 from .aide_routes import (
     TeacherAideListResource,
-    TeacherAideResource
+    TeacherAideResource,
+    FreeAidesResource
 )
 from .availability_routes import (
     AvailabilityListResource,
     AvailabilityResource
 )
-from .task_routes import TaskListResource, TaskResource
+from .task_routes import TaskListResource, TaskResource, TaskPreviewOccurrencesResource
 from .assignment_routes import (
     AssignmentListResource, 
     AssignmentResource,
     AssignmentBatchResource,
     AssignmentCheckResource,
+    AssignmentBulkCheckResource,
     AssignmentWeeklyMatrixResource,
+    AssignmentMatrixRangeResource,
+    AssignmentOccurrenceResource,
     HorizonExtensionResource
 )
 from .absence_routes import AbsenceListResource, AbsenceResource
 from .classroom_routes import ClassroomListResource, ClassroomResource
 from .school_class_routes import SchoolClassListResource, SchoolClassBulkUploadResource, SchoolClassResource
 from .scheduler_routes import SchedulerStatusResource, SchedulerControlResource, ManualHorizonExtensionResource
+from .report_routes import ConflictReportResource
 
 # Create blueprint
 api_bp = Blueprint('api', __name__, url_prefix='/api')
@@ -38,18 +43,23 @@ def error_response(code: str, message: str, status: int) -> tuple[dict, int]:
 # Register all resources
 api.add_resource(TeacherAideListResource, '/teacher-aides')
 api.add_resource(TeacherAideResource, '/teacher-aides/<int:aide_id>')
+api.add_resource(FreeAidesResource, '/aides/free', '/teacher-aides/free')
 api.add_resource(AvailabilityListResource, '/teacher-aides/<int:aide_id>/availability')
 api.add_resource(AvailabilityResource, '/teacher-aides/<int:aide_id>/availability/<int:avail_id>')
 
 api.add_resource(TaskListResource, '/tasks')
 api.add_resource(TaskResource, '/tasks/<int:task_id>')
+api.add_resource(TaskPreviewOccurrencesResource, '/tasks/preview-occurrences')
 
 api.add_resource(AssignmentListResource, '/assignments')
 api.add_resource(AssignmentResource, '/assignments/<int:assignment_id>')
 api.add_resource(AssignmentBatchResource, '/assignments/batch')
 api.add_resource(AssignmentCheckResource, '/assignments/check')
+api.add_resource(AssignmentBulkCheckResource, '/assignments/check/bulk')
 api.add_resource(AssignmentWeeklyMatrixResource, '/assignments/weekly-matrix')
+api.add_resource(AssignmentMatrixRangeResource, '/assignments/matrix')
 api.add_resource(HorizonExtensionResource, '/assignments/extend-horizon')
+api.add_resource(AssignmentOccurrenceResource, '/assignments/occurrences/<int:task_id>/<string:occurrence_date>')
 
 api.add_resource(AbsenceListResource, '/absences')
 api.add_resource(AbsenceResource, '/absences/<int:absence_id>')
@@ -66,6 +76,9 @@ api.add_resource(SchedulerStatusResource, '/scheduler/status')
 api.add_resource(SchedulerControlResource, '/scheduler/control')
 api.add_resource(ManualHorizonExtensionResource, '/scheduler/extend-horizon')
 
+# Reports
+api.add_resource(ConflictReportResource, '/reports/conflicts')
+
 @api_bp.route('/health')
 def health_check():
     """Health check endpoint."""
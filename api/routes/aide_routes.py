@@ -2,8 +2,13 @@ from flask_restful import Resource
 from flask import request
 from api.models import TeacherAide
 from api.db import get_db
+from api.free_aides import find_free_aides
+from datetime import date, time
 from .utils import error_response, serialize_aide
 
+# Longest range a single free-aide search may cover
+FREE_AIDES_MAX_DAYS = 366
+
 class TeacherAideListResource(Resource):
     def get(self):
         try:
@@ -118,4 +123,47 @@ class TeacherAideResource(Resource):
             finally:
                 session.close()
         except Exception as e:
-            return error_response('INTERNAL_ERROR', str(e), 500) 
\ No newline at end of file
+            return error_response('INTERNAL_ERROR', str(e), 500)
+
+class FreeAidesResource(Resource):
+    def get(self):
+        """List free (aide, date) pairs for a slot across a date range, least loaded first."""
+        args = {name: request.args.get(name) for name in ('start_date', 'end_date', 'start_time', 'end_time')}
+        missing = [name for name, value in args.items() if not value]
+        if missing:
+            return error_response('VALIDATION_ERROR', f'Missing required parameter: {missing[0]}', 422)
+        try:
+            start_date = date.fromisoformat(args['start_date'])
+            end_date = date.fromisoformat(args['end_date'])
+        except ValueError:
+            return error_response('VALIDATION_ERROR', 'Invalid date format. Use YYYY-MM-DD', 422)
+        try:
+            start_time = time.fromisoformat(args['start_time'])
+            end_time = time.fromisoformat(args['end_time'])
+        except ValueError:
+            return error_response('VALIDATION_ERROR', 'Invalid time format. Use HH:MM', 422)
+        if start_date > end_date:
+            return error_response('VALIDATION_ERROR', 'start_date must be on or before end_date', 422)
+        if (end_date - start_date).days >= FREE_AIDES_MAX_DAYS:
+            return error_response('VALIDATION_ERROR', f'Date range cannot exceed {FREE_AIDES_MAX_DAYS} days', 422)
+        if start_time >= end_time:
+            return error_response('VALIDATION_ERROR', 'start_time must be before end_time', 422)
+        if start_time < time(8, 0) or end_time > time(16, 0):
+            return error_response('VALIDATION_ERROR', 'Times must be within business hours (08:00-16:00)', 422)
+
+        try:
+            session = next(get_db())
+            try:
+                items = find_free_aides(session, start_date, end_date, start_time, end_time)
+                return {
+                    'start_date': start_date.isoformat(),
+                    'end_date': end_date.isoformat(),
+                    'start_time': start_time.strftime('%H:%M'),
+                    'end_time': end_time.strftime('%H:%M'),
+                    'count': len(items),
+                    'items': items
+                }, 200
+            finally:
+                session.close()
+        except Exception as e:
+            return error_response('INTERNAL_ERROR', str(e), 500)
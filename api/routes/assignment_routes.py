@@ -1,14 +1,32 @@
+import json
 from flask_restful import Resource
-from flask import request
-from api.models import Assignment, Task, TeacherAide, Absence, Availability
+from flask import request, Response, stream_with_context
+from api.models import Assignment, Task, TeacherAide, Absence, Availability, SlotConflictError, claim_slots
 from api.db import get_db
-from datetime import datetime, timedelta, date, time
-from .utils import error_response, serialize_assignment, serialize_absence, serialize_availability
-from api.recurrence import extend_assignment_horizon, DEFAULT_HORIZON_WEEKS
-from sqlalchemy import and_, or_
-import calendar
+from datetime import timedelta, date, time
+from .utils import error_response, serialize_assignment, serialize_virtual_assignment, serialize_absence, serialize_availability
+from api.recurrence import bulk_extend_assignment_horizon, materialize_window, DEFAULT_HORIZON_WEEKS, MAX_HORIZON_WEEKS
+from api.occurrences import virtual_occurrences_enabled, virtual_assignments, materialize_occurrence, skip_occurrence
+from api.conflict_index import find_conflict, record_bulk_writes
+from api.slots import SlotBitmaps, slot_mask
+from api.availability_cache import availability_cache
+from api.absence_index import absence_index
+from api.free_aides import check_slot_matrix, SLOT_STATUSES
+from api.weekly_matrix import parse_week, build_weekly_matrix, build_columnar_matrix, iter_week_matrices
+from api.data_version import current_version, etag_for, etag_headers, not_modified
+from api.matrix_cache import weekly_matrix_cache, record_bulk_assignments
+from sqlalchemy import insert
 from sqlalchemy.orm import joinedload
 
+# Largest aide x slot matrix a bulk availability check may request
+BULK_CHECK_MAX_CELLS = 20000
+
+# Weekly matrix encodings selectable with ?format=
+MATRIX_FORMATS = {'cells': build_weekly_matrix, 'columnar': build_columnar_matrix}
+
+# Longest week range the streamed multi-week matrix may request
+MATRIX_RANGE_MAX_WEEKS = 53
+
 def _is_half_hour_increment(t: time) -> bool:
     return t.minute in (0, 30)
 
@@ -17,6 +35,25 @@ def _within_business_hours(start: time, end: time) -> bool:
     close_time = time(16, 0)
     return open_time <= start and end <= close_time
 
+def _parse_id(value):
+    """Return ``value`` as an int id, accepting numeric strings, or None if it is not one."""
+    if isinstance(value, bool):
+        return None
+    if isinstance(value, int):
+        return value
+    if isinstance(value, str) and value.strip().isdigit():
+        return int(value)
+    return None
+
+def _ensure_materialized(session, start: date, end: date) -> None:
+    """Generate a requested window past the horizon instead of returning it empty."""
+    if virtual_occurrences_enabled():
+        return
+    # Bound on-demand work to what the horizon job itself may generate
+    if (end - start).days > MAX_HORIZON_WEEKS * 7:
+        return
+    materialize_window(session, start, end)
+
 class AssignmentListResource(Resource):
     def get(self):
         session = next(get_db())
@@ -38,6 +75,7 @@ class AssignmentListResource(Resource):
                 except (ValueError, IndexError):
                     return error_response('VALIDATION_ERROR', 'Invalid week format. Use YYYY-WW', 422)
 
+                _ensure_materialized(session, week_start, week_end)
                 assignments = session.query(Assignment).options(
                     joinedload(Assignment.task),
                     joinedload(Assignment.aide)
@@ -46,11 +84,25 @@ class AssignmentListResource(Resource):
                 ).order_by(Assignment.date.asc()).all()
 
                 tasks_map = {t.id: t for t in session.query(Task).all()}
+                items = [serialize_assignment(a, tasks_map.get(a.task_id)) for a in assignments]
+                if virtual_occurrences_enabled():
+                    items.extend(
+                        serialize_virtual_assignment(a, task)
+                        for a, task in virtual_assignments(session, week_start, week_end)
+                    )
+                    items.sort(key=lambda item: item['date'])
                 return {
-                    'assignments': [serialize_assignment(a, tasks_map.get(a.task_id)) for a in assignments],
-                    'total': len(assignments)
+                    'assignments': items,
+                    'total': len(items)
                 }, 200
             
+            if end_date:
+                _ensure_materialized(
+                    session,
+                    date.fromisoformat(start_date) if start_date else date.today(),
+                    date.fromisoformat(end_date)
+                )
+            
             # Build query
             query = session.query(Assignment)
             
@@ -73,17 +125,40 @@ class AssignmentListResource(Resource):
             # Get total count
             total = query.count()
             
-            # Get paginated results
-            assignments = query.order_by(Assignment.date.desc())\
-                .offset((page - 1) * per_page)\
-                .limit(per_page)\
-                .all()
+            # Virtual occurrences are always unassigned, so they only match aide-less, unassigned filters
+            virtual = []
+            if virtual_occurrences_enabled() and not aide_id and status in (None, 'UNASSIGNED'):
+                window_start = date.fromisoformat(start_date) if start_date else date.today()
+                window_end = date.fromisoformat(end_date) if end_date else window_start + timedelta(weeks=DEFAULT_HORIZON_WEEKS)
+                virtual = virtual_assignments(
+                    session, window_start, window_end,
+                    task_id=int(task_id) if task_id else None
+                )
+                total += len(virtual)
             
             # Get task titles for serialization
             tasks_map = {t.id: t for t in session.query(Task).all()}
             
+            if virtual:
+                # Merge stored and virtual rows by date (descending) before slicing the page
+                stored = query.order_by(Assignment.date.desc()).limit(page * per_page).all()
+                merged = [(a, tasks_map.get(a.task_id), False) for a in stored]
+                merged.extend((a, task, True) for a, task in virtual)
+                merged.sort(key=lambda row: row[0].date, reverse=True)
+                items = [
+                    serialize_virtual_assignment(a, task) if is_virtual else serialize_assignment(a, task)
+                    for a, task, is_virtual in merged[(page - 1) * per_page:page * per_page]
+                ]
+            else:
+                # Get paginated results
+                assignments = query.order_by(Assignment.date.desc())\
+                    .offset((page - 1) * per_page)\
+                    .limit(per_page)\
+                    .all()
+                items = [serialize_assignment(a, tasks_map.get(a.task_id)) for a in assignments]
+            
             return {
-                'items': [serialize_assignment(a, tasks_map.get(a.task_id)) for a in assignments],
+                'items': items,
                 'total': total,
                 'page': page,
                 'per_page': per_page,
@@ -156,18 +231,7 @@ class AssignmentListResource(Resource):
                 }, 409
 
             # Check for scheduling conflicts with the same aide on the same date (overlapping times)
-            conflict = session.query(Assignment).options(
-                joinedload(Assignment.task),
-                joinedload(Assignment.aide)
-            ).filter(
-                Assignment.aide_id == aide.id,
-                Assignment.date == date_value,
-                or_(
-                    and_(Assignment.start_time <= start_time, start_time < Assignment.end_time),
-                    and_(Assignment.start_time < end_time, end_time <= Assignment.end_time),
-                    and_(start_time <= Assignment.start_time, Assignment.start_time < end_time)
-                )
-            ).first()
+            conflict = find_conflict(session, aide.id, date_value, start_time, end_time, force=True)
             if conflict:
                 conflict_payload = serialize_assignment(conflict, conflict.task)
                 return {
@@ -179,19 +243,9 @@ class AssignmentListResource(Resource):
                 }, 409
 
             # Optional: Validate aide availability if availability model is used
-            # If Availability records exist for the aide/day, ensure requested time fits in at least one window
-            weekday = calendar.day_name[date_value.weekday()][:2].upper()  # e.g., 'MO'
-            availability_windows = session.query(Availability).filter_by(
-                aide_id=aide.id,
-                weekday=weekday
-            ).all()
-            if availability_windows:
-                fits_any = any(
-                    (window.start_time <= start_time and end_time <= window.end_time)
-                    for window in availability_windows
-                )
-                if not fits_any:
-                    return error_response('VALIDATION_ERROR', 'Requested time is outside aide availability', 422)
+            # If the aide has a window for the weekday, the requested time must fit in it
+            if not availability_cache.is_available(session, aide.id, date_value, start_time, end_time):
+                return error_response('VALIDATION_ERROR', 'Requested time is outside aide availability', 422)
             
             # Create assignment
             assignment = Assignment(
@@ -207,6 +261,10 @@ class AssignmentListResource(Resource):
             session.commit()
             
             return serialize_assignment(assignment, task), 201
+        except SlotConflictError as e:
+            # Another request took the slot after the conflict check passed
+            session.rollback()
+            return error_response('CONFLICT', str(e), 409)
         except Exception as e:
             session.rollback()
             return error_response('INTERNAL_ERROR', str(e), 500)
@@ -249,11 +307,15 @@ class AssignmentResource(Resource):
                     assignment.aide_id = data['aide_id']
             
             if 'date' in data:
+                original_date = assignment.date
                 try:
                     # Expect YYYY-MM-DD; store as date
                     assignment.date = date.fromisoformat(data['date'])
                 except ValueError:
                     return error_response('VALIDATION_ERROR', 'Invalid date format. Use YYYY-MM-DD', 422)
+                if assignment.date != original_date:
+                    # Keep the occurrence from reappearing virtually on the date it left
+                    skip_occurrence(session, session.get(Task, assignment.task_id), original_date)
             
             if 'start_time' in data:
                 try:
@@ -286,16 +348,10 @@ class AssignmentResource(Resource):
 
             # Check for conflicts if aide, date, or times changed
             if assignment.aide_id:
-                conflict = session.query(Assignment).filter(
-                    Assignment.id != assignment_id,
-                    Assignment.aide_id == assignment.aide_id,
-                    Assignment.date == assignment.date,
-                    or_(
-                        and_(Assignment.start_time <= assignment.start_time, assignment.start_time < Assignment.end_time),
-                        and_(Assignment.start_time < assignment.end_time, assignment.end_time <= Assignment.end_time),
-                        and_(assignment.start_time <= Assignment.start_time, Assignment.start_time < assignment.end_time)
-                    )
-                ).first()
+                conflict = find_conflict(
+                    session, assignment.aide_id, assignment.date,
+                    assignment.start_time, assignment.end_time, exclude_id=assignment_id, force=True
+                )
                 if conflict:
                     # Include conflicting assignment details to help client resolve
                     task = session.query(Task).get(conflict.task_id)
@@ -309,27 +365,14 @@ class AssignmentResource(Resource):
                     }, 409
 
                 # Validate absence overlap (treat absence as full-day)
-                absence = session.query(Absence).filter(
-                    Absence.aide_id == assignment.aide_id,
-                    Absence.start_date <= assignment.date,
-                    Absence.end_date >= assignment.date
-                ).first()
-                if absence:
+                if absence_index.is_absent(session, assignment.aide_id, assignment.date):
                     return error_response('VALIDATION_ERROR', 'Aide is absent on the selected date', 422)
 
                 # Optional: Validate availability window (if exists, ensure time fits a window)
-                weekday = assignment.date.strftime('%a').upper()[:2]
-                availability_windows = session.query(Availability).filter_by(
-                    aide_id=assignment.aide_id,
-                    weekday=weekday
-                ).all()
-                if availability_windows:
-                    fits_any = any(
-                        (window.start_time <= assignment.start_time and assignment.end_time <= window.end_time)
-                        for window in availability_windows
-                    )
-                    if not fits_any:
-                        return error_response('VALIDATION_ERROR', 'Requested time is outside aide availability', 422)
+                if not availability_cache.is_available(
+                    session, assignment.aide_id, assignment.date, assignment.start_time, assignment.end_time
+                ):
+                    return error_response('VALIDATION_ERROR', 'Requested time is outside aide availability', 422)
             
             session.commit()
             
@@ -337,6 +380,10 @@ class AssignmentResource(Resource):
             task = session.query(Task).get(assignment.task_id)
             
             return serialize_assignment(assignment, task), 200
+        except SlotConflictError as e:
+            # Another request took the slot after the conflict check passed
+            session.rollback()
+            return error_response('CONFLICT', str(e), 409)
         except Exception as e:
             session.rollback()
             return error_response('INTERNAL_ERROR', str(e), 500)
@@ -349,6 +396,7 @@ class AssignmentResource(Resource):
             if not assignment:
                 return error_response('NOT_FOUND', f'Assignment {assignment_id} not found', 404)
             
+            skip_occurrence(session, session.get(Task, assignment.task_id), assignment.date)
             session.delete(assignment)
             session.commit()
             return '', 204
@@ -356,6 +404,28 @@ class AssignmentResource(Resource):
             session.rollback()
             return error_response('INTERNAL_ERROR', str(e), 500)
 
+class AssignmentOccurrenceResource(Resource):
+    def put(self, task_id, occurrence_date):
+        """Materialize a (possibly virtual) task occurrence and apply an update to it."""
+        session = next(get_db())
+        try:
+            task = session.get(Task, task_id)
+            if not task:
+                return error_response('NOT_FOUND', f'Task {task_id} not found', 404)
+            try:
+                occurrence = date.fromisoformat(occurrence_date)
+            except ValueError:
+                return error_response('VALIDATION_ERROR', 'Invalid date format. Use YYYY-MM-DD', 422)
+            try:
+                assignment = materialize_occurrence(session, task, occurrence)
+            except ValueError as e:
+                return error_response('NOT_FOUND', str(e), 404)
+            session.commit()
+        except Exception as e:
+            session.rollback()
+            return error_response('INTERNAL_ERROR', str(e), 500)
+        return AssignmentResource().put(assignment.id)
+
 class AssignmentBatchResource(Resource):
     def post(self):
         session = next(get_db())
@@ -363,12 +433,11 @@ class AssignmentBatchResource(Resource):
             data = request.get_json(force=True)
             
             # Support both expanded and condensed payloads
-            created_assignments = []
             errors = []
             if 'assignments' in data:
                 if not isinstance(data['assignments'], list):
                     return error_response('VALIDATION_ERROR', 'assignments must be an array', 422)
-                iterable = enumerate(data['assignments'])
+                items = data['assignments']
                 condensed = False
             else:
                 condensed_required = ['task_id', 'dates', 'start_time', 'end_time']
@@ -377,7 +446,7 @@ class AssignmentBatchResource(Resource):
                         return error_response('VALIDATION_ERROR', f'Missing required field: {field}', 422)
                 if not isinstance(data['dates'], list):
                     return error_response('VALIDATION_ERROR', 'dates must be an array', 422)
-                iterable = enumerate([
+                items = [
                     {
                         'task_id': data['task_id'],
                         'aide_id': data.get('aide_id'),
@@ -385,176 +454,156 @@ class AssignmentBatchResource(Resource):
                         'start_time': data['start_time'],
                         'end_time': data['end_time'],
                     } for d in data['dates']
-                ])
+                ]
                 condensed = True
 
-            for idx, assignment_data in iterable:
+            # Collect ids and dates up front so validation needs a fixed number of queries
+            task_ids, aide_ids, dates = set(), set(), set()
+            for assignment_data in items:
+                if not isinstance(assignment_data, dict):
+                    continue
+                task_id = _parse_id(assignment_data.get('task_id'))
+                if task_id is not None:
+                    task_ids.add(task_id)
+                aide_id = _parse_id(assignment_data.get('aide_id'))
+                if aide_id is not None:
+                    aide_ids.add(aide_id)
                 try:
-                    # Validate required fields
-                    required_fields = ['task_id', 'date', 'start_time', 'end_time']
-                    for field in required_fields:
-                        if field not in assignment_data:
-                            errors.append({
-                                'index': idx,
-                                'error': f'Missing required field: {field}'
-                            })
-                            continue
-                    
-                    # Validate task exists
-                    task = session.query(Task).get(assignment_data['task_id'])
-                    if not task:
-                        errors.append({
-                            'index': idx,
-                            'error': f'Task {assignment_data["task_id"]} not found'
-                        })
-                        continue
-                    
-                    # Validate aide exists
-                    aide = None
-                    if 'aide_id' in assignment_data and assignment_data['aide_id'] is not None:
-                        aide = session.query(TeacherAide).get(assignment_data['aide_id'])
-                        if not aide:
-                            errors.append({
-                                'index': idx,
-                                'error': f'Teacher aide {assignment_data["aide_id"]} not found'
-                            })
-                            continue
-                    
-                    # Validate date format
-                    try:
-                        date_value = date.fromisoformat(assignment_data['date'])
-                    except ValueError:
-                        errors.append({
-                            'index': idx,
-                            'error': 'Invalid date format. Use YYYY-MM-DD'
-                        })
+                    dates.add(date.fromisoformat(assignment_data['date']))
+                except (KeyError, TypeError, ValueError):
+                    pass
+
+            tasks_map = {
+                t.id: t for t in session.query(Task).filter(Task.id.in_(task_ids))
+            } if task_ids else {}
+            known_aides = {
+                aide_id for aide_id, in session.query(TeacherAide.id).filter(TeacherAide.id.in_(aide_ids))
+            } if aide_ids else set()
+            existing_keys = set(
+                session.query(Assignment.task_id, Assignment.date).filter(
+                    Assignment.task_id.in_(tasks_map),
+                    Assignment.date.in_(dates)
+                )
+            ) if tasks_map and dates else set()
+            bitmaps = SlotBitmaps.load(
+                session, min(dates), max(dates), aide_ids=sorted(known_aides), dates=dates
+            ) if known_aides and dates else None
+
+            rows = []
+            for idx, assignment_data in enumerate(items):
+                def reject(message):
+                    errors.append({'index': idx, 'error': message})
+
+                if not isinstance(assignment_data, dict):
+                    reject('Assignment must be an object')
+                    continue
+
+                # Validate required fields
+                missing = [
+                    field for field in ['task_id', 'date', 'start_time', 'end_time']
+                    if field not in assignment_data
+                ]
+                if missing:
+                    reject(f'Missing required field: {missing[0]}')
+                    continue
+                
+                # Validate task exists
+                task_id = _parse_id(assignment_data['task_id'])
+                if task_id is None:
+                    reject('task_id must be an integer')
+                    continue
+                task = tasks_map.get(task_id)
+                if not task:
+                    reject(f'Task {task_id} not found')
+                    continue
+                
+                # Validate aide exists
+                aide_id = assignment_data.get('aide_id')
+                if aide_id is not None:
+                    aide_id = _parse_id(aide_id)
+                    if aide_id is None:
+                        reject('aide_id must be an integer')
                         continue
+                if aide_id is not None and aide_id not in known_aides:
+                    reject(f'Teacher aide {aide_id} not found')
+                    continue
+                
+                # Validate date format
+                try:
+                    date_value = date.fromisoformat(assignment_data['date'])
+                except (TypeError, ValueError):
+                    reject('Invalid date format. Use YYYY-MM-DD')
+                    continue
 
-                    # Validate time format and ordering
-                    try:
-                        start_time = time.fromisoformat(assignment_data['start_time'])
-                        end_time = time.fromisoformat(assignment_data['end_time'])
-                    except ValueError:
-                        errors.append({
-                            'index': idx,
-                            'error': 'Invalid time format. Use HH:MM'
-                        })
-                        continue
-                    if start_time >= end_time:
-                        errors.append({
-                            'index': idx,
-                            'error': 'start_time must be before end_time'
-                        })
-                        continue
-                    if not (_is_half_hour_increment(start_time) and _is_half_hour_increment(end_time)):
-                        errors.append({
-                            'index': idx,
-                            'error': 'Times must be in 30-minute increments (HH:00 or HH:30)'
-                        })
+                # Validate time format and ordering
+                try:
+                    start_time = time.fromisoformat(assignment_data['start_time'])
+                    end_time = time.fromisoformat(assignment_data['end_time'])
+                except (TypeError, ValueError):
+                    reject('Invalid time format. Use HH:MM')
+                    continue
+                if start_time >= end_time:
+                    reject('start_time must be before end_time')
+                    continue
+                if not (_is_half_hour_increment(start_time) and _is_half_hour_increment(end_time)):
+                    reject('Times must be in 30-minute increments (HH:00 or HH:30)')
+                    continue
+                if not _within_business_hours(start_time, end_time):
+                    reject('Times must be within business hours (08:00-16:00)')
+                    continue
+                
+                # Check for existing assignment for same task/date, including earlier batch items
+                if (task.id, date_value) in existing_keys:
+                    reject('Assignment already exists for this task and date')
+                    continue
+
+                if aide_id is not None:
+                    mask = slot_mask(start_time, end_time)
+                    # Overlapping times for the aide, including earlier batch items
+                    if bitmaps.has_conflict(aide_id, date_value, mask):
+                        reject('Teacher aide has a scheduling conflict')
                         continue
-                    if not _within_business_hours(start_time, end_time):
-                        errors.append({
-                            'index': idx,
-                            'error': 'Times must be within business hours (08:00-16:00)'
-                        })
+                    # Absences are full-day
+                    if bitmaps.is_absent(aide_id, date_value):
+                        reject('Aide is absent on the selected date')
                         continue
-                    
-                    # Check for existing assignment for same task/date
-                    existing = session.query(Assignment).filter_by(
-                        task_id=assignment_data['task_id'],
-                        date=date_value
-                    ).first()
-                    
-                    if existing:
-                        errors.append({
-                            'index': idx,
-                            'error': 'Assignment already exists for this task and date'
-                        })
+                    # Availability window, if the aide has one for that weekday
+                    if not bitmaps.is_available(aide_id, date_value, mask):
+                        reject('Requested time is outside aide availability')
                         continue
-
-                    # Check for scheduling conflicts for the aide on the same date (overlapping times)
-                    if aide is not None:
-                        conflict = session.query(Assignment).options(
-                            joinedload(Assignment.task),
-                            joinedload(Assignment.aide)
-                        ).filter(
-                            Assignment.aide_id == aide.id,
-                            Assignment.date == date_value,
-                            or_(
-                                and_(Assignment.start_time <= start_time, start_time < Assignment.end_time),
-                                and_(Assignment.start_time < end_time, end_time <= Assignment.end_time),
-                                and_(start_time <= Assignment.start_time, Assignment.start_time < end_time)
-                            )
-                        ).first()
-                        if conflict:
-                            errors.append({
-                                'index': idx,
-                                'error': 'Teacher aide has a scheduling conflict'
-                            })
-                            continue
-
-                    # Validate absence overlap (treat absence as full-day)
-                    if aide is not None:
-                        absence = session.query(Absence).filter(
-                            Absence.aide_id == aide.id,
-                            Absence.start_date <= date_value,
-                            Absence.end_date >= date_value
-                        ).first()
-                        if absence:
-                            errors.append({
-                                'index': idx,
-                                'error': 'Aide is absent on the selected date'
-                            })
-                            continue
-
-                    # Validate availability window if records exist for that weekday
-                    if aide is not None:
-                        weekday = calendar.day_name[date_value.weekday()][:2].upper()
-                        availability_windows = session.query(Availability).filter_by(
-                            aide_id=aide.id,
-                            weekday=weekday
-                        ).all()
-                        if availability_windows:
-                            fits_any = any(
-                                (window.start_time <= start_time and end_time <= window.end_time)
-                                for window in availability_windows
-                            )
-                            if not fits_any:
-                                errors.append({
-                                    'index': idx,
-                                    'error': 'Requested time is outside aide availability'
-                                })
-                                continue
-                    
-                    # Create assignment
-                    assignment = Assignment(
-                        task_id=assignment_data['task_id'],
-                        aide_id=assignment_data.get('aide_id'),
-                        date=date_value,
-                        start_time=start_time,
-                        end_time=end_time,
-                        status='ASSIGNED' if assignment_data.get('aide_id') is not None else 'UNASSIGNED'
-                    )
-                    
-                    session.add(assignment)
-                    created_assignments.append(assignment)
-                    
-                except Exception as e:
-                    errors.append({
-                        'index': idx,
-                        'error': str(e)
-                    })
-            
-            if created_assignments:
+                    bitmaps.occupy(aide_id, date_value, mask)
+
+                existing_keys.add((task.id, date_value))
+                rows.append({
+                    'task_id': task.id,
+                    'aide_id': aide_id,
+                    'date': date_value,
+                    'start_time': start_time,
+                    'end_time': end_time,
+                    'status': 'ASSIGNED' if aide_id is not None else 'UNASSIGNED'
+                })
+            
+            if rows:
+                # One batched INSERT ... RETURNING; (task_id, date) is unique within the batch
+                by_key = {
+                    (a.task_id, a.date): a
+                    for a in session.scalars(insert(Assignment).returning(Assignment), rows)
+                }
+                created_assignments = [by_key[(row['task_id'], row['date'])] for row in rows]
+                # Bulk INSERTs skip the mapper events that claim assignment slots
+                claim_slots(session.connection(), created_assignments)
+                record_bulk_writes(session, created_assignments)
+                record_bulk_assignments(session, created_assignments)
+                # Serialize before commit expires the new objects
+                created = [serialize_assignment(a, tasks_map.get(a.task_id)) for a in created_assignments]
                 session.commit()
-                tasks_map = {t.id: t for t in session.query(Task).all()}
                 if condensed:
                     return {
-                        'assignments': [serialize_assignment(a, tasks_map.get(a.task_id)) for a in created_assignments]
+                        'assignments': created
                     }, 201
                 else:
                     return {
-                        'created': [serialize_assignment(a, tasks_map.get(a.task_id)) for a in created_assignments],
+                        'created': created,
                         'errors': errors
                     }, 201
             else:
@@ -562,6 +611,10 @@ class AssignmentBatchResource(Resource):
                     return { 'assignments': [] }, 422
                 return { 'created': [], 'errors': errors }, 422
                 
+        except SlotConflictError as e:
+            # Another request took the slot after the conflict check passed
+            session.rollback()
+            return error_response('CONFLICT', str(e), 409)
         except Exception as e:
             session.rollback()
             return error_response('INTERNAL_ERROR', str(e), 500)
@@ -606,20 +659,13 @@ class AssignmentCheckResource(Resource):
             assignments = assignments_query.all()
             overlapping_assignment = None
             if start_time and end_time:
-                overlapping_assignment = assignments_query.filter(
-                    or_(
-                        and_(Assignment.start_time <= start_time, start_time < Assignment.end_time),
-                        and_(Assignment.start_time < end_time, end_time <= Assignment.end_time),
-                        and_(start_time <= Assignment.start_time, Assignment.start_time < end_time)
-                    )
-                ).first()
+                overlapping_assignment = find_conflict(
+                    session, int(data['aide_id']), check_date, start_time, end_time
+                )
             
             # Check for absences
-            absences = session.query(Absence).filter(
-                Absence.aide_id == data['aide_id'],
-                Absence.start_date <= check_date,
-                Absence.end_date >= check_date
-            ).all()
+            absence_id = absence_index.absence_on(session, int(data['aide_id']), check_date)
+            absences = [session.get(Absence, absence_id)] if absence_id is not None else []
             
             # Get aide's availability for the day
             weekday = check_date.strftime('%a').upper()[:2]  # Convert to MO, TU, etc.
@@ -649,22 +695,83 @@ class AssignmentCheckResource(Resource):
         except Exception as e:
             return error_response('INTERNAL_ERROR', str(e), 500)
 
-class HorizonExtensionResource(Resource):
+class AssignmentBulkCheckResource(Resource):
     def post(self):
+        """Check many aides against many candidate slots and return a status matrix."""
         session = next(get_db())
         try:
             data = request.get_json(force=True)
             
+            # Validate required fields
+            for field in ['aide_ids', 'slots']:
+                if field not in data:
+                    return error_response('VALIDATION_ERROR', f'Missing required field: {field}', 422)
+            aide_ids = data['aide_ids']
+            if not isinstance(aide_ids, list) or not aide_ids or not all(
+                isinstance(aide_id, int) and not isinstance(aide_id, bool) for aide_id in aide_ids
+            ):
+                return error_response('VALIDATION_ERROR', 'aide_ids must be a non-empty array of integers', 422)
+            if not isinstance(data['slots'], list) or not data['slots']:
+                return error_response('VALIDATION_ERROR', 'slots must be a non-empty array', 422)
+            if len(aide_ids) * len(data['slots']) > BULK_CHECK_MAX_CELLS:
+                return error_response('VALIDATION_ERROR', f'Cannot check more than {BULK_CHECK_MAX_CELLS} aide/slot pairs', 422)
+            
+            # Validate slots
+            slots = []
+            for index, slot in enumerate(data['slots']):
+                try:
+                    slot_date = date.fromisoformat(slot['date'])
+                    start_time = time.fromisoformat(slot['start_time'])
+                    end_time = time.fromisoformat(slot['end_time'])
+                except (KeyError, TypeError, ValueError):
+                    return error_response('VALIDATION_ERROR', f'slots[{index}] needs date (YYYY-MM-DD), start_time and end_time (HH:MM)', 422)
+                if start_time >= end_time:
+                    return error_response('VALIDATION_ERROR', f'slots[{index}]: start_time must be before end_time', 422)
+                slots.append((slot_date, start_time, end_time))
+            
+            known_aides = {aide_id for aide_id, in session.query(TeacherAide.id).filter(TeacherAide.id.in_(aide_ids))}
+            missing = [aide_id for aide_id in aide_ids if aide_id not in known_aides]
+            if missing:
+                return error_response('NOT_FOUND', f'Teacher aide {missing[0]} not found', 404)
+            
+            statuses, conflicts = check_slot_matrix(session, aide_ids, slots)
+            return {
+                'aide_ids': aide_ids,
+                'slots': [
+                    {'date': d.isoformat(), 'start_time': s.strftime('%H:%M'), 'end_time': e.strftime('%H:%M')}
+                    for d, s, e in slots
+                ],
+                'status_codes': list(SLOT_STATUSES),
+                'statuses': statuses,
+                'conflicts': conflicts
+            }, 200
+        except Exception as e:
+            return error_response('INTERNAL_ERROR', str(e), 500)
+
+class HorizonExtensionResource(Resource):
+    def post(self):
+        session = next(get_db())
+        try:
+            data = request.get_json(force=True, silent=True) or {}
+            
             # Get horizon weeks from request or use default
             horizon_weeks = data.get('horizon_weeks', DEFAULT_HORIZON_WEEKS)
+            if not isinstance(horizon_weeks, int) or not 1 <= horizon_weeks <= MAX_HORIZON_WEEKS:
+                return error_response('VALIDATION_ERROR', f'horizon_weeks must be an integer between 1 and {MAX_HORIZON_WEEKS}', 422)
+            
+            workers = data.get('workers', 1)
+            if not isinstance(workers, int) or workers < 1:
+                return error_response('VALIDATION_ERROR', 'workers must be a positive integer', 422)
             
             # Extend horizon
-            extended = extend_assignment_horizon(session, horizon_weeks)
+            report = bulk_extend_assignment_horizon(
+                session, horizon_weeks,
+                full_rescan=bool(data.get('full_rescan', False)),
+                workers=workers
+            )
+            session.commit()
             
-            return {
-                'extended': extended,
-                'horizon_weeks': horizon_weeks
-            }, 200
+            return report, 200
             
         except Exception as e:
             session.rollback()
@@ -682,130 +789,68 @@ class AssignmentWeeklyMatrixResource(Resource):
             
             # Parse week format (YYYY-WW)
             try:
-                year, week_num = map(int, week.split('-W'))
-                start_date = date.fromisocalendar(year, week_num, 1)  # Monday
-                end_date = date.fromisocalendar(year, week_num, 7)    # Sunday
-            except (ValueError, IndexError):
+                start_date, end_date = parse_week(week)
+            except ValueError:
                 return error_response('VALIDATION_ERROR', 'Invalid week format. Use YYYY-WW', 422)
             
-            # Get all teacher aides
-            aides = session.query(TeacherAide).order_by(TeacherAide.name).all()
+            # Opt-in compact encoding; the per-slot cell layout stays the default
+            matrix_format = request.args.get('format', 'cells')
+            if matrix_format not in MATRIX_FORMATS:
+                return error_response('VALIDATION_ERROR', f"format must be one of: {', '.join(MATRIX_FORMATS)}", 422)
             
-            # Get all assignments for the week
-            assignments = session.query(Assignment).options(
-                joinedload(Assignment.task),
-                joinedload(Assignment.aide)
-            ).filter(
-                Assignment.date.between(start_date, end_date)
-            ).all()
-            
-            # Get all absences for the week
-            absences = session.query(Absence).options(
-                joinedload(Absence.aide)
-            ).filter(
-                or_(
-                    and_(Absence.start_date <= end_date, Absence.end_date >= start_date)
-                )
-            ).all()
-            
-            # Create time slots (30-minute intervals from 08:00 to 16:00)
-            time_slots = []
-            current_time = time(8, 0)  # 08:00
-            end_time = time(16, 0)     # 16:00
-            
-            while current_time < end_time:
-                time_slots.append(current_time.strftime('%H:%M'))
-                # Add 30 minutes
-                current_minutes = current_time.hour * 60 + current_time.minute + 30
-                current_time = time(current_minutes // 60, current_minutes % 60)
-            
-            # Create day names
-            day_names = ['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday']
-            
-            # Build the matrix structure
-            matrix = {
-                'week': week,
-                'start_date': start_date.isoformat(),
-                'end_date': end_date.isoformat(),
-                'time_slots': time_slots,
-                'days': day_names,
-                'aides': [],
-                'assignments': {},
-                'absences': {}
-            }
+            # Revalidation of an unchanged week costs only the version lookup
+            cached = not_modified(etag_for(current_version(session), week, matrix_format))
+            if cached is not None:
+                return cached
             
-            # Add aide information
-            for aide in aides:
-                matrix['aides'].append({
-                    'id': aide.id,
-                    'name': aide.name,
-                    'colour_hex': aide.colour_hex,
-                    'qualifications': aide.qualifications
-                })
+            _ensure_materialized(session, start_date, end_date)
             
-            # Organize assignments by aide, day, and time slot
-            for assignment in assignments:
-                if not assignment.aide_id:
-                    continue  # Skip unassigned tasks
-                
-                aide_id = assignment.aide_id
-                day_index = (assignment.date - start_date).days
-                
-                if day_index >= len(day_names):
-                    continue  # Skip weekends
-                
-                day_name = day_names[day_index]
-                
-                # Find time slots that this assignment covers
-                assignment_start = assignment.start_time
-                assignment_end = assignment.end_time
-                
-                for i, slot_time_str in enumerate(time_slots):
-                    slot_time = datetime.strptime(slot_time_str, '%H:%M').time()
-                    slot_end_time = datetime.strptime(time_slots[i + 1], '%H:%M').time() if i + 1 < len(time_slots) else time(16, 0)
-                    
-                    # Check if assignment overlaps with this time slot
-                    if (assignment_start < slot_end_time and assignment_end > slot_time):
-                        key = f"{aide_id}_{day_name}_{slot_time_str}"
-                        matrix['assignments'][key] = {
-                            'assignment_id': assignment.id,
-                            'task_id': assignment.task_id,
-                            'task_title': assignment.task.title if assignment.task else 'Unknown Task',
-                            'task_category': assignment.task.category if assignment.task else 'UNKNOWN',
-                            'start_time': assignment.start_time.strftime('%H:%M'),
-                            'end_time': assignment.end_time.strftime('%H:%M'),
-                            'status': assignment.status,
-                            'is_flexible': assignment.task.is_flexible if assignment.task else False,
-                            'classroom': assignment.task.classroom.name if assignment.task and assignment.task.classroom else None,
-                            'school_class': assignment.task.school_class.name if assignment.task and assignment.task.school_class else None,
-                            'notes': assignment.task.notes if assignment.task else None
-                        }
-            
-            # Organize absences by aide and day
-            for absence in absences:
-                aide_id = absence.aide_id
-                # For date range absences, we need to handle multiple days
-                current_date = max(absence.start_date, start_date)
-                end_absence_date = min(absence.end_date, end_date)
-                
-                while current_date <= end_absence_date:
-                    day_index = (current_date - start_date).days
-                    
-                    if day_index >= len(day_names):
-                        break  # Skip weekends
-                    
-                    day_name = day_names[day_index]
-                    key = f"{aide_id}_{day_name}"
-                    matrix['absences'][key] = {
-                        'absence_id': absence.id,
-                        'reason': absence.reason,
-                        'start_date': absence.start_date.isoformat(),
-                        'end_date': absence.end_date.isoformat()
-                    }
-                    
-                    current_date += timedelta(days=1)
-            
-            return matrix, 200
+            # Read after materializing, which may have bumped the version
+            version = current_version(session)
+            if matrix_format == 'cells':
+                # Served from the materialized cache, patched with any writes since it was built
+                matrix = weekly_matrix_cache.matrix(session, week, version)
+            else:
+                matrix = MATRIX_FORMATS[matrix_format](session, week)
+            return matrix, 200, etag_headers(etag_for(version, week, matrix_format))
             
         except Exception as e:
             return error_response('INTERNAL_ERROR', str(e), 500)
+
+class AssignmentMatrixRangeResource(Resource):
+    def get(self):
+        """Stream the weekly matrix of every week in a range as NDJSON, one line per week."""
+        start_week = request.args.get('start_week')
+        end_week = request.args.get('end_week')
+        if not start_week or not end_week:
+            return error_response('VALIDATION_ERROR', 'start_week and end_week are required', 422)
+        try:
+            start_date, _ = parse_week(start_week)
+            _, end_date = parse_week(end_week)
+        except ValueError:
+            return error_response('VALIDATION_ERROR', 'Invalid week format. Use YYYY-WW', 422)
+        if start_date > end_date:
+            return error_response('VALIDATION_ERROR', 'start_week must be on or before end_week', 422)
+        if (end_date - start_date).days // 7 + 1 > MATRIX_RANGE_MAX_WEEKS:
+            return error_response('VALIDATION_ERROR', f'Range cannot exceed {MATRIX_RANGE_MAX_WEEKS} weeks', 422)
+        matrix_format = request.args.get('format', 'cells')
+        if matrix_format not in MATRIX_FORMATS:
+            return error_response('VALIDATION_ERROR', f"format must be one of: {', '.join(MATRIX_FORMATS)}", 422)
+
+        # Keep the session open until the stream is exhausted
+        db = get_db()
+        session = next(db)
+        try:
+            _ensure_materialized(session, start_date, end_date)
+        except Exception as e:
+            db.close()
+            return error_response('INTERNAL_ERROR', str(e), 500)
+
+        def generate():
+            try:
+                for matrix in iter_week_matrices(session, start_week, end_week, MATRIX_FORMATS[matrix_format]):
+                    yield json.dumps(matrix) + '\n'
+            finally:
+                db.close()
+
+        return Response(stream_with_context(generate()), mimetype='application/x-ndjson')
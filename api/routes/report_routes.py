@@ -0,0 +1,37 @@
+"""Reporting routes."""
+
+import json
+from datetime import date
+from flask_restful import Resource
+from flask import request, Response, stream_with_context
+from api.db import get_db
+from api.reports import sweep_conflicts
+from .utils import error_response
+
+class ConflictReportResource(Resource):
+    def get(self):
+        """Stream every double booking, absence clash and availability breach in a range as NDJSON."""
+        start_date = request.args.get('start_date')
+        end_date = request.args.get('end_date')
+        if not start_date or not end_date:
+            return error_response('VALIDATION_ERROR', 'start_date and end_date are required', 422)
+        try:
+            start_date = date.fromisoformat(start_date)
+            end_date = date.fromisoformat(end_date)
+        except ValueError:
+            return error_response('VALIDATION_ERROR', 'Invalid date format. Use YYYY-MM-DD', 422)
+        if start_date > end_date:
+            return error_response('VALIDATION_ERROR', 'start_date must be on or before end_date', 422)
+
+        # Keep the session open until the stream is exhausted
+        db = get_db()
+        session = next(db)
+
+        def generate():
+            try:
+                for group in sweep_conflicts(session, start_date, end_date):
+                    yield json.dumps(group) + '\n'
+            finally:
+                db.close()
+
+        return Response(stream_with_context(generate()), mimetype='application/x-ndjson')
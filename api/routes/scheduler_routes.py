@@ -3,7 +3,7 @@
 from flask_restful import Resource
 from flask import request
 from api.scheduler import start_scheduler, stop_scheduler, get_scheduler_status, scheduler
-from api.recurrence import extend_assignment_horizon, DEFAULT_HORIZON_WEEKS
+from api.recurrence import bulk_extend_assignment_horizon, DEFAULT_HORIZON_WEEKS
 from api.db import get_db
 from .utils import error_response
 
@@ -23,6 +23,12 @@ class SchedulerControlResource(Resource):
             data = request.get_json(force=True) if request.is_json else {}
             action = data.get('action', 'status')
             
+            if 'workers' in data:
+                workers = data['workers']
+                if not isinstance(workers, int) or workers < 1:
+                    return error_response('VALIDATION_ERROR', 'workers must be a positive integer', 422)
+                scheduler.horizon_extension_workers = workers
+            
             if action == 'start':
                 start_scheduler()
                 return {'message': 'Scheduler started'}, 200
@@ -44,16 +50,24 @@ class ManualHorizonExtensionResource(Resource):
         try:
             data = request.get_json(force=True) if request.is_json else {}
             horizon_weeks = data.get('horizon_weeks', DEFAULT_HORIZON_WEEKS)
+            workers = data.get('workers', scheduler.horizon_extension_workers)
+            if not isinstance(workers, int) or workers < 1:
+                return error_response('VALIDATION_ERROR', 'workers must be a positive integer', 422)
             
             session = next(get_db())
-            tasks_processed, assignments_created = extend_assignment_horizon(session, horizon_weeks)
+            report = bulk_extend_assignment_horizon(
+                session, horizon_weeks,
+                full_rescan=bool(data.get('full_rescan', False)),
+                workers=workers
+            )
+            session.commit()
             
             return {
                 'message': 'Horizon extension completed',
-                'tasks_processed': tasks_processed,
-                'assignments_created': assignments_created,
-                'horizon_weeks': horizon_weeks
+                **report
             }, 200
             
+        except ValueError as e:
+            return error_response('VALIDATION_ERROR', str(e), 422)
         except Exception as e:
             return error_response('INTERNAL_ERROR', str(e), 500)
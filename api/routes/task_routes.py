@@ -1,15 +1,22 @@
+import json
 from flask_restful import Resource
-from flask import request
+from flask import request, Response
 from api.models import Task, SchoolClass
 from api.db import get_db
-from datetime import datetime, date, time
+from datetime import datetime, date, time, timedelta
 from sqlalchemy.orm import joinedload
 from .utils import error_response, serialize_task, serialize_assignment
-from api.recurrence import update_future_assignments
+from api.recurrence import diff_future_assignments
+from api.occurrences import virtual_occurrences_enabled, preview_occurrences
 import logging
 
 logger = logging.getLogger(__name__)
 
+# Recurrence preview limits
+PREVIEW_DEFAULT_COUNT = 100
+PREVIEW_MAX_COUNT = 1000
+PREVIEW_MAX_DAYS = 5 * 366
+
 class TaskListResource(Resource):
     def get(self):
         session = next(get_db())
@@ -117,7 +124,7 @@ class TaskListResource(Resource):
             
             # Generate assignments if task has recurrence
             assignments = []
-            if recurrence_rule:
+            if recurrence_rule and not virtual_occurrences_enabled():
                 from api.scheduler import generate_assignments_for_task
                 try:
                     assignments = generate_assignments_for_task(task, session)
@@ -161,6 +168,8 @@ class TaskResource(Resource):
             old_recurrence = task.recurrence_rule
             old_start_time = task.start_time
             old_end_time = task.end_time
+            old_expires_on = task.expires_on
+            old_generated_through = task.generated_through
             
             # Update fields
             if 'title' in data:
@@ -202,25 +211,38 @@ class TaskResource(Resource):
             if 'is_flexible' in data:
                 task.is_flexible = bool(data['is_flexible'])
             
+            # Reset the generation watermark so the next horizon run re-expands the task
+            if (old_recurrence != task.recurrence_rule or
+                old_start_time != task.start_time or
+                old_end_time != task.end_time or
+                old_expires_on != task.expires_on):
+                task.generated_through = None
+
             # Update future assignments if this is a recurring task and relevant fields changed
-            assignments_updated = 0
+            assignment_changes = None
             if task.recurrence_rule and (
                 old_recurrence != task.recurrence_rule or
                 old_start_time != task.start_time or
                 old_end_time != task.end_time
             ):
-                assignments_updated = update_future_assignments(
-                    task, session, 
-                    old_recurrence=old_recurrence,
-                    old_start_time=old_start_time,
-                    old_end_time=old_end_time
+                # In virtual mode only already materialized rows are reconciled
+                assignment_changes = diff_future_assignments(
+                    task, session, insert_new=not virtual_occurrences_enabled(),
+                    generated_through=old_generated_through
                 )
             
             session.commit()
 
             response = {'task': serialize_task(task)}
-            if assignments_updated > 0:
-                response['assignments_updated'] = assignments_updated
+            if assignment_changes:
+                assignments_updated = (
+                    assignment_changes['inserted'] +
+                    assignment_changes['updated'] +
+                    assignment_changes['deleted']
+                )
+                if assignments_updated > 0:
+                    response['assignments_updated'] = assignments_updated
+                    response['assignment_changes'] = assignment_changes
 
             return response, 200
         except Exception as e:
@@ -240,3 +262,52 @@ class TaskResource(Resource):
         except Exception as e:
             session.rollback()
             return error_response('INTERNAL_ERROR', str(e), 500)
+
+
+class TaskPreviewOccurrencesResource(Resource):
+    def post(self):
+        """Stream the dates a recurrence rule produces as NDJSON without saving anything."""
+        session = next(get_db())
+        try:
+            data = request.get_json(force=True)
+            
+            # Validate required fields
+            for field in ['recurrence_rule', 'start_time', 'end_time']:
+                if field not in data:
+                    return error_response('VALIDATION_ERROR', f'Missing required field: {field}', 422)
+            
+            try:
+                start_time = time.fromisoformat(data['start_time'])
+                end_time = time.fromisoformat(data['end_time'])
+            except ValueError:
+                return error_response('VALIDATION_ERROR', 'Invalid time format. Use HH:MM', 422)
+            if start_time >= end_time:
+                return error_response('VALIDATION_ERROR', 'start_time must be before end_time', 422)
+            
+            try:
+                start_date = date.fromisoformat(data['start_date']) if data.get('start_date') else date.today()
+                end_date = date.fromisoformat(data['until']) if data.get('until') else start_date + timedelta(days=PREVIEW_MAX_DAYS)
+                if data.get('expires_on'):
+                    end_date = min(end_date, date.fromisoformat(data['expires_on']))
+            except ValueError:
+                return error_response('VALIDATION_ERROR', 'Invalid date format. Use YYYY-MM-DD', 422)
+            end_date = min(end_date, start_date + timedelta(days=PREVIEW_MAX_DAYS))
+            
+            count = data.get('count', PREVIEW_DEFAULT_COUNT)
+            if not isinstance(count, int) or not 1 <= count <= PREVIEW_MAX_COUNT:
+                return error_response('VALIDATION_ERROR', f'count must be between 1 and {PREVIEW_MAX_COUNT}', 422)
+            
+            try:
+                items = preview_occurrences(
+                    session, data['recurrence_rule'], start_time, end_time,
+                    start_date, end_date, count
+                )
+            except ValueError as e:
+                return error_response('VALIDATION_ERROR', str(e), 422)
+            
+            return Response(
+                (json.dumps(item) + '\n' for item in items),
+                mimetype='application/x-ndjson'
+            )
+        except Exception as e:
+            return error_response('INTERNAL_ERROR', str(e), 500)
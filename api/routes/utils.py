@@ -89,6 +89,12 @@ def serialize_assignment(assignment, task=None):
         'updated_at': updated_at
     }
 
+def serialize_virtual_assignment(assignment, task):
+    """Serialize a computed, not yet stored occurrence like a regular assignment."""
+    data = serialize_assignment(assignment, task)
+    data['virtual'] = True
+    return data
+
 def serialize_aide(aide):
     """Serialize a TeacherAide instance to a dictionary."""
     return {
@@ -7,7 +7,18 @@ from typing import Optional
 from sqlalchemy.orm import Session
 
 from api.db import get_db
-from api.recurrence import extend_assignment_horizon, DEFAULT_HORIZON_WEEKS
+from api.recurrence import (
+    extend_assignment_horizon,
+    run_chunked_horizon_extension,
+    latest_horizon_job,
+    recurrence_cache_stats,
+    DEFAULT_HORIZON_WEEKS,
+    DEFAULT_CHUNK_TASKS,
+    DEFAULT_CHUNK_ROWS,
+    DEFAULT_CHUNK_PAUSE_SECONDS
+)
+from api.occurrences import virtual_occurrences_enabled
+from api.matrix_cache import weekly_matrix_cache
 
 class Scheduler:
     """Simple scheduler for running periodic tasks."""
@@ -16,6 +27,11 @@ class Scheduler:
         self.running = False
         self.thread: Optional[threading.Thread] = None
         self.horizon_extension_interval = 24 * 60 * 60  # 24 hours in seconds
+        self.horizon_extension_workers = 1  # >1 expands occurrences in a process pool
+        # Chunking keeps each write transaction short so interactive writes are not blocked
+        self.chunk_tasks = DEFAULT_CHUNK_TASKS
+        self.chunk_rows = DEFAULT_CHUNK_ROWS
+        self.chunk_pause_seconds = DEFAULT_CHUNK_PAUSE_SECONDS
         
     def start(self):
         """Start the scheduler."""
@@ -50,14 +66,29 @@ class Scheduler:
                 time.sleep(60)  # 1 minute
     
     def _extend_horizon(self):
-        """Extend the assignment horizon for all recurring tasks."""
+        """Extend the assignment horizon for all recurring tasks.
+
+        Runs as a chunked, resumable job: only the days past each task's
+        ``generated_through`` watermark are expanded, every chunk is committed
+        separately, and an interrupted run resumes from its saved cursor.
+        """
+        if virtual_occurrences_enabled():
+            # Unassigned occurrences are computed on read, nothing to materialize
+            return
         try:
             from api.session import managed_session
             with managed_session() as session:
-                tasks_processed, assignments_created = extend_assignment_horizon(session, DEFAULT_HORIZON_WEEKS)
+                job = run_chunked_horizon_extension(
+                    session, DEFAULT_HORIZON_WEEKS,
+                    chunk_tasks=self.chunk_tasks,
+                    chunk_rows=self.chunk_rows,
+                    pause_seconds=self.chunk_pause_seconds,
+                    workers=self.horizon_extension_workers,
+                    should_stop=lambda: not self.running
+                )
                 
-                if tasks_processed > 0 or assignments_created > 0:
-                    print(f"Horizon extension: {tasks_processed} tasks processed, {assignments_created} assignments created")
+                if job.tasks_processed > 0 or job.assignments_created > 0:
+                    print(f"Horizon extension: {job.tasks_processed} tasks processed, {job.assignments_created} assignments created in {job.chunks} chunks")
             
         except Exception as e:
             print(f"Horizon extension error: {e}")
@@ -66,7 +97,9 @@ class Scheduler:
         """Manually trigger horizon extension and return results."""
         from api.session import managed_session
         with managed_session() as session:
-            return extend_assignment_horizon(session, DEFAULT_HORIZON_WEEKS)
+            return extend_assignment_horizon(
+                session, DEFAULT_HORIZON_WEEKS, workers=self.horizon_extension_workers
+            )
 
 # Global scheduler instance
 scheduler = Scheduler()
@@ -84,9 +117,24 @@ def get_scheduler_status() -> dict:
     return {
         'running': scheduler.running,
         'horizon_extension_interval': scheduler.horizon_extension_interval,
-        'last_run': datetime.now().isoformat() if scheduler.running else None
+        'horizon_extension_workers': scheduler.horizon_extension_workers,
+        'last_run': datetime.now().isoformat() if scheduler.running else None,
+        'recurrence_cache': recurrence_cache_stats(),
+        'weekly_matrix_cache': weekly_matrix_cache.stats(),
+        'horizon_job': _latest_job_progress()
     }
 
+def _latest_job_progress() -> Optional[dict]:
+    """Return progress of the most recent chunked horizon job, if any."""
+    try:
+        from api.session import managed_session
+        with managed_session() as session:
+            job = latest_horizon_job(session)
+            return job.to_dict() if job else None
+    except Exception as e:
+        print(f"Could not load horizon job progress: {e}")
+        return None
+
 
 # Compatibility wrapper used by task routes/tests
 def generate_assignments_for_task(task, session, horizon_weeks: int = DEFAULT_HORIZON_WEEKS):
@@ -109,4 +157,6 @@ def generate_assignments_for_task(task, session, horizon_weeks: int = DEFAULT_HO
             # If expires_on is not comparable (unexpected type), ignore
             pass
 
-    return generate_assignments(task, start_date, end_date, session)
+    assignments = generate_assignments(task, start_date, end_date, session)
+    task.generated_through = end_date
+    return assignments
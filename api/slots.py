@@ -0,0 +1,157 @@
+"""Slot-occupancy bitmaps for aides' school days.
+
+Assignments are constrained to 30-minute increments between 08:00 and 16:00,
+so a day is exactly 16 slots and fits in one unsigned 16-bit integer (bit 0
+is 08:00-08:30, bit 15 is 15:30-16:00). Occupancy, absence and availability
+are kept in that shape, which turns conflict, availability and "free aide"
+checks into bitwise ANDs.
+
+:class:`SlotBitmaps` stores one ``array('H')`` per aide with an entry per day
+of the window, so a 200-day term for 100 aides takes about 80 KB for
+occupancy and absences together.
+"""
+
+from array import array
+from datetime import date, time
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy.orm import Session
+
+from api.models import Assignment, TeacherAide
+
+SLOT_MINUTES = 30
+DAY_START_MINUTES = 8 * 60
+SLOTS_PER_DAY = 16
+FULL_DAY = (1 << SLOTS_PER_DAY) - 1
+
+def slot_mask(start: time, end: time) -> int:
+    """Return the bitmap of the slots touched by ``[start, end)``.
+
+    Times off the half-hour grid are widened to the slots they touch and
+    anything outside business hours is clipped.
+    """
+    first = (start.hour * 60 + start.minute - DAY_START_MINUTES) // SLOT_MINUTES
+    last = -(-(end.hour * 60 + end.minute - DAY_START_MINUTES) // SLOT_MINUTES)
+    first = max(first, 0)
+    last = min(last, SLOTS_PER_DAY)
+    if last <= first:
+        return 0
+    return ((1 << (last - first)) - 1) << first
+
+class SlotBitmaps:
+    """Occupancy, absence and availability bitmaps for a date window.
+
+    Args:
+        start_date: First day covered (inclusive)
+        end_date: Last day covered (inclusive)
+    """
+
+    def __init__(self, start_date: date, end_date: date):
+        self.start_date = start_date
+        self.end_date = end_date
+        self.days = (end_date - start_date).days + 1
+        self.occupancy: Dict[int, array] = {}
+        self.absence: Dict[int, array] = {}
+        self.availability: Dict[int, Tuple[int, ...]] = {}
+
+    @classmethod
+    def load(cls, session: Session, start_date: date, end_date: date,
+             aide_ids: Optional[List[int]] = None,
+             dates: Optional[Iterable[date]] = None) -> 'SlotBitmaps':
+        """Build the bitmaps with one query each for aides and assignments.
+
+        Absences and availability come from :mod:`api.absence_index` and
+        :mod:`api.availability_cache`.
+
+        Args:
+            session: Database session
+            start_date: First day covered (inclusive)
+            end_date: Last day covered (inclusive)
+            aide_ids: Restrict to these aides (default: all aides)
+            dates: Only load occupancy for these days, when only a few are needed
+        """
+        bitmaps = cls(start_date, end_date)
+        if aide_ids is None:
+            aide_ids = [aide_id for aide_id, in session.query(TeacherAide.id)]
+        for aide_id in aide_ids:
+            bitmaps.add_aide(aide_id)
+        if not aide_ids:
+            return bitmaps
+
+        for aide_id, day, start, end in session.query(
+            Assignment.aide_id, Assignment.date, Assignment.start_time, Assignment.end_time
+        ).filter(
+            Assignment.aide_id.in_(aide_ids),
+            Assignment.date.in_(set(dates)) if dates is not None
+            else Assignment.date.between(start_date, end_date)
+        ):
+            bitmaps.occupy(aide_id, day, slot_mask(start, end))
+
+        from api.absence_index import absence_index
+        from api.availability_cache import availability_cache
+        for aide_id in aide_ids:
+            for absent_from, absent_to, _ in absence_index.absent_ranges(session, aide_id, start_date, end_date):
+                bitmaps.mark_absent(aide_id, absent_from, absent_to)
+            bitmaps.availability[aide_id] = availability_cache.weekday_masks(session, aide_id)
+        return bitmaps
+
+    def add_aide(self, aide_id: int) -> None:
+        """Start tracking an aide with an empty, fully available window."""
+        self.occupancy[aide_id] = array('H', bytes(2 * self.days))
+        self.absence[aide_id] = array('H', bytes(2 * self.days))
+        self.availability[aide_id] = (FULL_DAY,) * 7
+
+    def _offset(self, day: date) -> int:
+        offset = (day - self.start_date).days
+        if not 0 <= offset < self.days:
+            raise ValueError(f"{day.isoformat()} is outside {self.start_date}..{self.end_date}")
+        return offset
+
+    def occupy(self, aide_id: int, day: date, mask: int) -> None:
+        """Mark slots on ``day`` as taken by an assignment."""
+        self.occupancy[aide_id][self._offset(day)] |= mask
+
+    def mark_absent(self, aide_id: int, start_date: date, end_date: date) -> None:
+        """Block whole days for an absence, clipped to the window."""
+        absence = self.absence[aide_id]
+        first = max((start_date - self.start_date).days, 0)
+        last = min((end_date - self.start_date).days, self.days - 1)
+        for offset in range(first, last + 1):
+            absence[offset] = FULL_DAY
+
+    def blocked(self, aide_id: int, day: date) -> int:
+        """Return the slots on ``day`` the aide cannot take: busy, absent or unavailable."""
+        offset = self._offset(day)
+        return (
+            self.occupancy[aide_id][offset]
+            | self.absence[aide_id][offset]
+            | (~self.availability[aide_id][day.weekday()] & FULL_DAY)
+        )
+
+    def has_conflict(self, aide_id: int, day: date, mask: int) -> bool:
+        """Check whether the aide already has an assignment in any of the slots."""
+        return bool(self.occupancy[aide_id][self._offset(day)] & mask)
+
+    def is_absent(self, aide_id: int, day: date) -> bool:
+        """Check whether the aide is absent on ``day``."""
+        return bool(self.absence[aide_id][self._offset(day)])
+
+    def is_available(self, aide_id: int, day: date, mask: int) -> bool:
+        """Check whether the aide's availability window for the weekday covers the slots."""
+        return self.availability[aide_id][day.weekday()] & mask == mask
+
+    def is_free(self, aide_id: int, day: date, mask: int) -> bool:
+        """Check whether the aide is present, available and unassigned for every slot."""
+        return not self.blocked(aide_id, day) & mask
+
+    def free_aides(self, day: date, mask: int) -> List[int]:
+        """Return the ids of aides free for every slot in ``mask`` on ``day``."""
+        return [aide_id for aide_id in self.occupancy if self.is_free(aide_id, day, mask)]
+
+    @property
+    def nbytes(self) -> int:
+        """Size of the per-day arrays in bytes."""
+        return sum(
+            occupancy.itemsize * len(occupancy) + absence.itemsize * len(absence)
+            for occupancy, absence in zip(self.occupancy.values(), self.absence.values())
+        )
@@ -3,7 +3,10 @@ from api.db import get_db
 from api.models import TeacherAide, Assignment, Absence
 from sqlalchemy import and_
 from contextlib import contextmanager
-from datetime import datetime, date
+from datetime import datetime, date, timedelta
+from api.occurrences import virtual_occurrences_enabled, virtual_assignments
+from api.recurrence import DEFAULT_HORIZON_WEEKS
+from api.data_version import current_version, etag_for, not_modified, set_etag
 
 timetable_bp = Blueprint('timetable', __name__)
 
@@ -13,6 +16,13 @@ def get_timetable():
     db = next(get_db())  # Get the session from the generator
     
     try:
+        # Virtual occurrences are computed from today, so they change daily
+        variant = (date.today().isoformat(),) if virtual_occurrences_enabled() else ()
+        etag = etag_for(current_version(db), *variant)
+        cached = not_modified(etag)
+        if cached is not None:
+            return cached
+        
         # Get all teacher aides
         aides = db.query(TeacherAide).all()
         aides_data = [
@@ -25,7 +35,13 @@ def get_timetable():
         ]
         
         # Get all assignments
-        assignments = db.query(Assignment).all()
+        assignments = [(a, a.task) for a in db.query(Assignment).all()]
+        if virtual_occurrences_enabled():
+            # Include computed unassigned occurrences across the default horizon
+            today = date.today()
+            assignments.extend(
+                virtual_assignments(db, today, today + timedelta(weeks=DEFAULT_HORIZON_WEEKS))
+            )
         assignments_data = [
             {
                 'id': assignment.id,
@@ -33,10 +49,10 @@ def get_timetable():
                 'day': assignment.date.strftime('%A').upper(),
                 'startTime': assignment.start_time.strftime('%H:%M'),
                 'endTime': assignment.end_time.strftime('%H:%M'),
-                'task': assignment.task.title,
+                'task': task.title,
                 'categoryColor': '#FFC107'  # Default color for now
             }
-            for assignment in assignments
+            for assignment, task in assignments
         ]
         
         # Get all absences
@@ -51,10 +67,10 @@ def get_timetable():
             for absence in absences
         ]
         
-        return jsonify({
+        return set_etag(jsonify({
             'aides': aides_data,
             'assignments': assignments_data,
             'absences': absences_data
-        })
+        }), etag)
     finally:
         db.close()  # Ensure the session is closed 
\ No newline at end of file
@@ -0,0 +1,284 @@
+"""Weekly aide × day × slot matrix used by the drag-and-drop schedule.
+
+Times are handled as minutes of the day and an assignment's covered slots
+come straight from integer division, so building a week costs one dict per
+assignment and one key per covered slot. Assignments are loaded with their
+task, classroom and school class in a single joined query.
+
+:func:`build_columnar_matrix` is the compact alternative: each assignment
+is sent once as a row of parallel arrays (aide, day, start slot, span, task,
+status) that index into aide, task and status lookup tables, instead of a
+full dict repeated under every slot key it covers.
+
+:func:`iter_week_matrices` builds a run of weeks from one date-bounded scan,
+yielding each week as soon as the scan moves past it.
+"""
+
+from datetime import date, time, timedelta
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from sqlalchemy.orm import Session, joinedload
+
+from api.models import Assignment, Absence, Task, TeacherAide
+from api.absence_index import absence_index
+from api.slots import DAY_START_MINUTES, SLOT_MINUTES, SLOTS_PER_DAY
+
+# Rows fetched per round trip when scanning a multi-week range
+STREAM_BATCH_SIZE = 500
+
+DAY_NAMES = ['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday']
+
+# 'HH:MM' labels of the 16 half-hour slots, 08:00 to 15:30
+TIME_SLOTS = [
+    f'{minutes // 60:02d}:{minutes % 60:02d}'
+    for minutes in range(DAY_START_MINUTES, DAY_START_MINUTES + SLOTS_PER_DAY * SLOT_MINUTES, SLOT_MINUTES)
+]
+
+def parse_week(week: str) -> Tuple[date, date]:
+    """Return the Monday and Sunday of an ISO week given as ``YYYY-Www``.
+
+    Raises:
+        ValueError: If the week is malformed or does not exist
+    """
+    try:
+        year, week_num = map(int, week.split('-W'))
+    except (ValueError, AttributeError) as e:
+        raise ValueError(f"Invalid week {week!r}") from e
+    return date.fromisocalendar(year, week_num, 1), date.fromisocalendar(year, week_num, 7)
+
+def week_label(monday: date) -> str:
+    """Return the ``YYYY-Www`` label of the ISO week starting on ``monday``."""
+    year, week_num, _ = monday.isocalendar()
+    return f'{year}-W{week_num:02d}'
+
+def covered_slots(start_time: time, end_time: time) -> range:
+    """Return the indexes of the slots overlapping ``[start_time, end_time)``."""
+    start = start_time.hour * 60 + start_time.minute - DAY_START_MINUTES
+    end = end_time.hour * 60 + end_time.minute - DAY_START_MINUTES
+    first = max(start // SLOT_MINUTES, 0)
+    last = min(-(-end // SLOT_MINUTES), SLOTS_PER_DAY)
+    return range(first, last)
+
+def aide_entry(aide: TeacherAide) -> Dict[str, Any]:
+    """Return the row of an aide in the matrix's ``aides`` list."""
+    return {
+        'id': aide.id,
+        'name': aide.name,
+        'colour_hex': aide.colour_hex,
+        'qualifications': aide.qualifications
+    }
+
+def matrix_skeleton(week: str, start_date: date, end_date: date, aides: List[TeacherAide]) -> Dict[str, Any]:
+    """Return an empty matrix for the week listing the given aides."""
+    return {
+        'week': week,
+        'start_date': start_date.isoformat(),
+        'end_date': end_date.isoformat(),
+        'time_slots': list(TIME_SLOTS),
+        'days': list(DAY_NAMES),
+        'aides': [aide_entry(aide) for aide in aides],
+        'assignments': {},
+        'absences': {}
+    }
+
+def assignment_entry(assignment: Assignment) -> Dict[str, Any]:
+    """Return the cell payload shown for every slot an assignment covers."""
+    task = assignment.task
+    return {
+        'assignment_id': assignment.id,
+        'task_id': assignment.task_id,
+        'task_title': task.title if task else 'Unknown Task',
+        'task_category': task.category if task else 'UNKNOWN',
+        'start_time': assignment.start_time.strftime('%H:%M'),
+        'end_time': assignment.end_time.strftime('%H:%M'),
+        'status': assignment.status,
+        'is_flexible': task.is_flexible if task else False,
+        'classroom': task.classroom.name if task and task.classroom else None,
+        'school_class': task.school_class.class_code if task and task.school_class else None,
+        'notes': task.notes if task else None
+    }
+
+def assignment_cells(start_date: date, assignment: Assignment) -> List[str]:
+    """Return the ``{aide}_{day}_{slot}`` keys an assignment fills (none if unassigned or at a weekend)."""
+    if not assignment.aide_id:
+        return []
+    day_index = (assignment.date - start_date).days
+    if not 0 <= day_index < len(DAY_NAMES):
+        return []
+    prefix = f"{assignment.aide_id}_{DAY_NAMES[day_index]}_"
+    return [prefix + TIME_SLOTS[slot] for slot in covered_slots(assignment.start_time, assignment.end_time)]
+
+def add_assignment(matrix: Dict[str, Any], start_date: date, assignment: Assignment) -> None:
+    """Place an assigned, weekday assignment into the matrix cells it covers."""
+    keys = assignment_cells(start_date, assignment)
+    if not keys:
+        return
+    entry = assignment_entry(assignment)
+    cells = matrix['assignments']
+    for key in keys:
+        cells[key] = entry
+
+def absence_entry(absence: Absence) -> Dict[str, Any]:
+    """Return the cell payload shown for every day of an absence."""
+    return {
+        'absence_id': absence.id,
+        'reason': absence.reason,
+        'start_date': absence.start_date.isoformat(),
+        'end_date': absence.end_date.isoformat()
+    }
+
+def add_absences(session: Session, matrix: Dict[str, Any], start_date: date, aide_ids: List[int]) -> None:
+    """Mark the weekdays each aide is absent, from the shared absence index."""
+    friday = start_date + timedelta(days=len(DAY_NAMES) - 1)
+    absent_days = [
+        (aide_id, day, absence_id)
+        for aide_id in aide_ids
+        for day, absence_id in absence_index.absent_days(session, aide_id, start_date, friday)
+    ]
+    if not absent_days:
+        return
+    entries = {
+        absence.id: absence_entry(absence)
+        for absence in session.query(Absence).filter(
+            Absence.id.in_({absence_id for _, _, absence_id in absent_days})
+        )
+    }
+    for aide_id, day, absence_id in absent_days:
+        matrix['absences'][f"{aide_id}_{DAY_NAMES[(day - start_date).days]}"] = entries[absence_id]
+
+def week_assignments_query(session: Session, start_date: date, end_date: date):
+    """Assigned rows in the range with task, classroom and school class joined in."""
+    return session.query(Assignment).options(
+        joinedload(Assignment.task).joinedload(Task.classroom),
+        joinedload(Assignment.task).joinedload(Task.school_class)
+    ).filter(
+        Assignment.aide_id.isnot(None),
+        Assignment.date.between(start_date, end_date)
+    ).order_by(Assignment.date, Assignment.start_time, Assignment.id)
+
+def task_entry(task: Task) -> Dict[str, Any]:
+    """Return the columnar lookup-table row of a task."""
+    return {
+        'id': task.id,
+        'title': task.title,
+        'category': task.category,
+        'is_flexible': task.is_flexible,
+        'classroom': task.classroom.name if task.classroom else None,
+        'school_class': task.school_class.class_code if task.school_class else None,
+        'notes': task.notes
+    }
+
+def build_weekly_matrix(session: Session, week: str, aides: Optional[List[TeacherAide]] = None,
+                        assignments: Optional[Iterable[Assignment]] = None) -> Dict[str, Any]:
+    """Build the matrix for an ISO week (``YYYY-Www``).
+
+    Args:
+        session: Database session
+        week: ISO week
+        aides: Aides ordered by name, queried if omitted
+        assignments: The week's assigned rows, queried if omitted
+
+    Raises:
+        ValueError: If the week is malformed or does not exist
+    """
+    start_date, end_date = parse_week(week)
+    if aides is None:
+        aides = session.query(TeacherAide).order_by(TeacherAide.name).all()
+    if assignments is None:
+        assignments = week_assignments_query(session, start_date, end_date)
+    matrix = matrix_skeleton(week, start_date, end_date, aides)
+    aide_ids = [aide.id for aide in aides]
+    known_aides = set(aide_ids)
+    for assignment in assignments:
+        # Rows of aides that no longer exist have no row to show in
+        if assignment.aide_id in known_aides:
+            add_assignment(matrix, start_date, assignment)
+    add_absences(session, matrix, start_date, aide_ids)
+    return matrix
+
+def build_columnar_matrix(session: Session, week: str, aides: Optional[List[TeacherAide]] = None,
+                          assignments: Optional[Iterable[Assignment]] = None) -> Dict[str, Any]:
+    """Build the matrix for an ISO week as parallel assignment arrays.
+
+    ``assignments`` holds equal-length lists: ``id``, ``aide_index`` into
+    ``aides``, ``day_index`` into ``days``, ``start_slot`` into
+    ``time_slots``, ``slot_span``, ``task_index`` into ``tasks`` (-1 for a
+    missing task) and ``status_code`` into ``statuses``. Absences keep the
+    ``{aide}_{day}`` layout of :func:`build_weekly_matrix`, whose arguments
+    this takes.
+
+    Raises:
+        ValueError: If the week is malformed or does not exist
+    """
+    start_date, end_date = parse_week(week)
+    if aides is None:
+        aides = session.query(TeacherAide).order_by(TeacherAide.name).all()
+    if assignments is None:
+        assignments = week_assignments_query(session, start_date, end_date)
+    matrix = matrix_skeleton(week, start_date, end_date, aides)
+    aide_indexes = {aide.id: index for index, aide in enumerate(aides)}
+    task_indexes: Dict[int, int] = {}
+    status_codes: Dict[str, int] = {}
+    tasks: List[Dict[str, Any]] = []
+    columns: Dict[str, List[int]] = {
+        name: [] for name in ('id', 'aide_index', 'day_index', 'start_slot', 'slot_span', 'task_index', 'status_code')
+    }
+    for assignment in assignments:
+        day_index = (assignment.date - start_date).days
+        slots = covered_slots(assignment.start_time, assignment.end_time)
+        aide_index = aide_indexes.get(assignment.aide_id)
+        if day_index >= len(DAY_NAMES) or not slots or aide_index is None:
+            continue
+        task = assignment.task
+        if task is None:
+            task_index = -1
+        elif task.id in task_indexes:
+            task_index = task_indexes[task.id]
+        else:
+            task_index = task_indexes[task.id] = len(tasks)
+            tasks.append(task_entry(task))
+        columns['id'].append(assignment.id)
+        columns['aide_index'].append(aide_index)
+        columns['day_index'].append(day_index)
+        columns['start_slot'].append(slots.start)
+        columns['slot_span'].append(len(slots))
+        columns['task_index'].append(task_index)
+        columns['status_code'].append(status_codes.setdefault(assignment.status, len(status_codes)))
+    matrix['format'] = 'columnar'
+    matrix['assignments'] = columns
+    matrix['tasks'] = tasks
+    matrix['statuses'] = list(status_codes)
+    add_absences(session, matrix, start_date, list(aide_indexes))
+    return matrix
+
+def iter_week_matrices(session: Session, start_week: str, end_week: str,
+                       build: Callable[..., Dict[str, Any]] = build_weekly_matrix) -> Iterator[Dict[str, Any]]:
+    """Yield the matrix of every ISO week from ``start_week`` to ``end_week``.
+
+    Aides are loaded once and assignments come from a single scan of the
+    whole range, fetched :data:`STREAM_BATCH_SIZE` rows at a time. Only the
+    current week's rows are held, so memory does not grow with the range.
+
+    Args:
+        session: Database session
+        start_week: First ISO week (inclusive)
+        end_week: Last ISO week (inclusive)
+        build: :func:`build_weekly_matrix` or :func:`build_columnar_matrix`
+
+    Raises:
+        ValueError: If either week is malformed or does not exist
+    """
+    monday, _ = parse_week(start_week)
+    _, last_sunday = parse_week(end_week)
+    aides = session.query(TeacherAide).order_by(TeacherAide.name).all()
+    week_rows: List[Assignment] = []
+    for assignment in week_assignments_query(session, monday, last_sunday).yield_per(STREAM_BATCH_SIZE):
+        while assignment.date >= monday + timedelta(days=7):
+            yield build(session, week_label(monday), aides=aides, assignments=week_rows)
+            week_rows = []
+            monday += timedelta(days=7)
+        week_rows.append(assignment)
+    while monday <= last_sunday:
+        yield build(session, week_label(monday), aides=aides, assignments=week_rows)
+        week_rows = []
+        monday += timedelta(days=7)
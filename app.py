@@ -6,17 +6,30 @@ from api.db import set_engine
 from api.db import init_db
 from api.routes import api_bp
 from api.scheduler import start_scheduler
+from api.occurrences import set_virtual_occurrences
+from api.conflict_index import conflict_index
+from api.availability_cache import availability_cache
+from api.absence_index import absence_index
+from api.matrix_cache import weekly_matrix_cache
 
 # Configure logging
 logging.basicConfig(level=logging.DEBUG)
 logger = logging.getLogger(__name__)
 
-def create_app(engine=None):
+def create_app(engine=None, virtual_occurrences=False, matrix_cache_dir=None, scheduler=True):
     app = Flask(__name__)
     CORS(app)
     # Set the engine if provided (for testing)
     if engine is not None:
         set_engine(engine)
+    # Compute unassigned recurring occurrences on read instead of storing them
+    set_virtual_occurrences(virtual_occurrences)
+    # Conflict, absence and availability indexes are rebuilt from the database on first use
+    conflict_index.reset()
+    absence_index.reset()
+    availability_cache.invalidate()
+    # Built weekly matrices, optionally mirrored to disk, are kept from here on
+    weekly_matrix_cache.configure(disk_dir=matrix_cache_dir)
     # Import and register blueprints
     from api.routes import api_bp
     from api.absence import absence_bp
@@ -35,13 +48,13 @@ def create_app(engine=None):
     logger.debug("Registered routes:")
     for rule in app.url_map.iter_rules():
         logger.debug(f"{rule.endpoint}: {rule.rule}")
-    # Start the scheduler for automatic horizon extension
-    try:
-        # Temporarily disable automatic horizon extension to prevent database locks
-        # start_scheduler()
-        print("Scheduler disabled to prevent database locks")
-    except Exception as e:
-        print(f"Warning: Could not start scheduler: {e}")
+    # Start the scheduler for automatic horizon extension; its chunked job
+    # commits in short transactions so request writes are not locked out
+    if scheduler:
+        try:
+            start_scheduler()
+        except Exception as e:
+            print(f"Warning: Could not start scheduler: {e}")
     return app
 
 def print_routes(app):
@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+"""Benchmark slot bitmaps against the SQL overlap query used by the routes.
+
+Seeds an in-memory SQLite database with 100 aides and a 200-day term of
+assignments, then answers the same random "does this slot conflict?"
+questions with the three-way overlap query and with the bitmaps, and prints
+the timings, speedup and bitmap size.
+
+Usage:
+    python benchmarks/bench_slot_bitmaps.py
+"""
+
+import os
+import random
+import sys
+from datetime import date, time, timedelta
+from time import perf_counter
+
+# Add project root to path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from sqlalchemy import and_, create_engine, insert, or_
+from sqlalchemy.orm import Session
+
+from api.models import Base, Task, Assignment, TeacherAide
+from api.slots import SlotBitmaps, slot_mask
+
+AIDES = 100
+TERM_DAYS = 200
+ASSIGNMENTS_PER_DAY = 4
+CHECKS = 1000
+START_DATE = date(2024, 1, 29)
+
+def slot_time(slot: int) -> time:
+    return time(8 + slot // 2, 30 * (slot % 2))
+
+def random_slot(rng):
+    start = rng.randint(0, 14)
+    return slot_time(start), slot_time(start + rng.randint(1, 2))
+
+def seed(session: Session, rng):
+    session.execute(insert(TeacherAide), [
+        {'name': f'Aide {i}', 'colour_hex': '#123456'} for i in range(AIDES)
+    ])
+    task = Task(title='Bench', category='CLASS_SUPPORT', start_time=time(9), end_time=time(10), status='ACTIVE')
+    session.add(task)
+    session.flush()
+    aide_ids = [aide_id for aide_id, in session.query(TeacherAide.id)]
+    rows = []
+    for offset in range(TERM_DAYS):
+        day = START_DATE + timedelta(days=offset)
+        for aide_id in aide_ids:
+            for _ in range(ASSIGNMENTS_PER_DAY):
+                start, end = random_slot(rng)
+                rows.append({
+                    'task_id': task.id, 'aide_id': aide_id, 'date': day,
+                    'start_time': start, 'end_time': end, 'status': 'ASSIGNED'
+                })
+    session.execute(insert(Assignment), rows)
+    session.commit()
+    return aide_ids
+
+def sql_conflict(session, aide_id, day, start_time, end_time):
+    return session.query(Assignment.id).filter(
+        Assignment.aide_id == aide_id,
+        Assignment.date == day,
+        or_(
+            and_(Assignment.start_time <= start_time, start_time < Assignment.end_time),
+            and_(Assignment.start_time < end_time, end_time <= Assignment.end_time),
+            and_(start_time <= Assignment.start_time, Assignment.start_time < end_time)
+        )
+    ).first() is not None
+
+def main():
+    rng = random.Random(7)
+    engine = create_engine('sqlite:///:memory:')
+    Base.metadata.create_all(engine)
+    session = Session(engine)
+    aide_ids = seed(session, rng)
+    end_date = START_DATE + timedelta(days=TERM_DAYS - 1)
+
+    checks = []
+    for _ in range(CHECKS):
+        start, end = random_slot(rng)
+        checks.append((rng.choice(aide_ids), START_DATE + timedelta(days=rng.randrange(TERM_DAYS)), start, end))
+
+    started = perf_counter()
+    sql_answers = [sql_conflict(session, *check) for check in checks]
+    sql_seconds = perf_counter() - started
+
+    started = perf_counter()
+    bitmaps = SlotBitmaps.load(session, START_DATE, end_date)
+    load_seconds = perf_counter() - started
+    started = perf_counter()
+    bitmap_answers = [
+        bitmaps.has_conflict(aide_id, day, slot_mask(start, end))
+        for aide_id, day, start, end in checks
+    ]
+    bitmap_seconds = perf_counter() - started
+    assert sql_answers == bitmap_answers
+
+    print(f"{AIDES} aides x {TERM_DAYS} days, {CHECKS} conflict checks")
+    print(f"  SQL overlap query : {sql_seconds * 1000:8.1f} ms")
+    print(f"  bitmap load       : {load_seconds * 1000:8.1f} ms")
+    print(f"  bitmap checks     : {bitmap_seconds * 1000:8.1f} ms")
+    print(f"  speedup (checks)  : {sql_seconds / bitmap_seconds:8.1f}x")
+    print(f"  bitmap size       : {bitmaps.nbytes / 1024:8.1f} KB")
+
+if __name__ == '__main__':
+    main()
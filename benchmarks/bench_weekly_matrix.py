@@ -0,0 +1,183 @@
+#!/usr/bin/env python3
+"""Benchmark the weekly-matrix builder against the previous per-slot builder.
+
+Seeds an in-memory SQLite database with 100 aides and 500 assignments in one
+week, spread over tasks with classrooms and school classes, then builds the
+matrix both ways and prints the timings, speedup and statements issued.
+It then compares the JSON size and build-plus-serialize time of the default
+per-slot cells against ``format=columnar``. Assignments are 1-3 hours long.
+Finally it moves single assignments and compares the cache's incremental
+patch against a full rebuild.
+
+Usage:
+    python benchmarks/bench_weekly_matrix.py
+"""
+
+import json
+import os
+import random
+import sys
+from datetime import date, datetime, time, timedelta
+from time import perf_counter
+
+# Add project root to path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from sqlalchemy import create_engine, event, insert
+from sqlalchemy.orm import Session, joinedload
+
+from api.models import Base, Task, Assignment, TeacherAide, Classroom, SchoolClass
+from api.absence_index import absence_index
+from api.weekly_matrix import build_weekly_matrix, build_columnar_matrix
+from api.data_version import current_version
+from api.matrix_cache import weekly_matrix_cache
+
+AIDES = 100
+ASSIGNMENTS = 500
+TASKS = 40
+ROUNDS = 20
+WEEK = '2024-W10'
+MONDAY = date(2024, 3, 4)
+
+def slot_time(slot: int) -> time:
+    return time(8 + slot // 2, 30 * (slot % 2))
+
+def seed(session: Session, rng):
+    session.execute(insert(TeacherAide), [
+        {'name': f'Aide {i:03d}', 'colour_hex': '#123456'} for i in range(AIDES)
+    ])
+    session.execute(insert(Classroom), [{'name': f'Room {i}'} for i in range(TASKS)])
+    session.execute(insert(SchoolClass), [
+        {'class_code': f'C{i}', 'grade': str(i % 6 + 1), 'teacher': f'Teacher {i}'} for i in range(TASKS)
+    ])
+    session.execute(insert(Task), [
+        {'title': f'Task {i}', 'category': 'CLASS_SUPPORT', 'start_time': time(9), 'end_time': time(10),
+         'classroom_id': i + 1, 'school_class_id': i + 1, 'status': 'ASSIGNED'}
+        for i in range(TASKS)
+    ])
+    aide_ids = [aide_id for aide_id, in session.query(TeacherAide.id)]
+    # 1-3 hour assignments starting on distinct 3-hour blocks so no two share a cell
+    cells = rng.sample([(aide_id, day, block) for aide_id in aide_ids for day in range(5) for block in range(2)], ASSIGNMENTS)
+    session.execute(insert(Assignment), [
+        {
+            'task_id': rng.randint(1, TASKS), 'aide_id': aide_id, 'date': MONDAY + timedelta(days=day),
+            'start_time': slot_time(block * 6), 'end_time': slot_time(block * 6 + 2 * rng.randint(1, 3)),
+            'status': 'ASSIGNED'
+        }
+        for aide_id, day, block in cells
+    ])
+    session.commit()
+
+def legacy_matrix(session: Session):
+    """The builder the route used before: strptime per slot, task-only eager loading."""
+    start_date = MONDAY
+    end_date = MONDAY + timedelta(days=6)
+    aides = session.query(TeacherAide).order_by(TeacherAide.name).all()
+    assignments = session.query(Assignment).options(
+        joinedload(Assignment.task),
+        joinedload(Assignment.aide)
+    ).filter(Assignment.date.between(start_date, end_date)).all()
+    time_slots = []
+    current_time = time(8, 0)
+    while current_time < time(16, 0):
+        time_slots.append(current_time.strftime('%H:%M'))
+        current_minutes = current_time.hour * 60 + current_time.minute + 30
+        current_time = time(current_minutes // 60, current_minutes % 60)
+    day_names = ['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday']
+    matrix = {
+        'week': WEEK, 'start_date': start_date.isoformat(), 'end_date': end_date.isoformat(),
+        'time_slots': time_slots, 'days': day_names,
+        'aides': [
+            {'id': aide.id, 'name': aide.name, 'colour_hex': aide.colour_hex, 'qualifications': aide.qualifications}
+            for aide in aides
+        ],
+        'assignments': {}, 'absences': {}
+    }
+    for assignment in assignments:
+        if not assignment.aide_id:
+            continue
+        day_index = (assignment.date - start_date).days
+        if day_index >= len(day_names):
+            continue
+        for i, slot_time_str in enumerate(time_slots):
+            slot_start = datetime.strptime(slot_time_str, '%H:%M').time()
+            slot_end = datetime.strptime(time_slots[i + 1], '%H:%M').time() if i + 1 < len(time_slots) else time(16, 0)
+            if assignment.start_time < slot_end and assignment.end_time > slot_start:
+                task = assignment.task
+                matrix['assignments'][f"{assignment.aide_id}_{day_names[day_index]}_{slot_time_str}"] = {
+                    'assignment_id': assignment.id, 'task_id': assignment.task_id,
+                    'task_title': task.title, 'task_category': task.category,
+                    'start_time': assignment.start_time.strftime('%H:%M'),
+                    'end_time': assignment.end_time.strftime('%H:%M'),
+                    'status': assignment.status, 'is_flexible': task.is_flexible,
+                    'classroom': task.classroom.name if task.classroom else None,
+                    'school_class': task.school_class.class_code if task.school_class else None,
+                    'notes': task.notes
+                }
+    return matrix
+
+def timed(engine, build):
+    """Return the mean seconds per build, the statements of one build and its result."""
+    statements = []
+    record = lambda *args: statements.append(args[2])
+    seconds = 0.0
+    for round_number in range(ROUNDS):
+        # Fresh session each round so nothing is served from the identity map
+        with Session(engine) as session:
+            if round_number == 0:
+                event.listen(engine, 'before_cursor_execute', record)
+            started = perf_counter()
+            result = build(session)
+            seconds += perf_counter() - started
+            if round_number == 0:
+                event.remove(engine, 'before_cursor_execute', record)
+                first = result
+    return seconds / ROUNDS, len(statements), first
+
+def main():
+    engine = create_engine('sqlite:///:memory:')
+    Base.metadata.create_all(engine)
+    with Session(engine) as session:
+        seed(session, random.Random(11))
+        # Warm the absence index so both builders read it from memory
+        absence_index.intervals(session, 1)
+
+    legacy_seconds, legacy_statements, legacy = timed(engine, legacy_matrix)
+    builder_seconds, builder_statements, matrix = timed(engine, lambda session: build_weekly_matrix(session, WEEK))
+    assert legacy['assignments'] == matrix['assignments']
+    assert legacy['aides'] == matrix['aides'] and legacy['time_slots'] == matrix['time_slots']
+
+    print(f"{AIDES} aides, {ASSIGNMENTS} assignments in {WEEK}, {len(matrix['assignments'])} cells")
+    print(f"  previous builder : {legacy_seconds * 1000:8.1f} ms  {legacy_statements:4d} statements")
+    print(f"  weekly_matrix    : {builder_seconds * 1000:8.1f} ms  {builder_statements:4d} statements")
+    print(f"  speedup          : {legacy_seconds / builder_seconds:8.1f}x")
+
+    cells_seconds, _, cells_json = timed(engine, lambda session: json.dumps(build_weekly_matrix(session, WEEK)))
+    columnar_seconds, _, columnar_json = timed(engine, lambda session: json.dumps(build_columnar_matrix(session, WEEK)))
+    print("Build + json.dumps")
+    print(f"  cells            : {cells_seconds * 1000:8.1f} ms  {len(cells_json) / 1024:8.1f} KB")
+    print(f"  columnar         : {columnar_seconds * 1000:8.1f} ms  {len(columnar_json) / 1024:8.1f} KB")
+    print(f"  payload ratio    : {len(cells_json) / len(columnar_json):8.1f}x")
+
+    # The process-wide cache is the one the commit hooks patch
+    cache = weekly_matrix_cache
+    cache.reset()
+    rng = random.Random(5)
+    with Session(engine) as session:
+        cache.matrix(session, WEEK, current_version(session))
+        # Late-block rows own 11:00-14:00 for their aide and day, so moving within it never collides
+        late_ids = [assignment_id for assignment_id, in session.query(Assignment.id).filter(Assignment.start_time == slot_time(6))]
+        for assignment_id in rng.sample(late_ids, ROUNDS):
+            assignment = session.get(Assignment, assignment_id)
+            assignment.start_time, assignment.end_time = slot_time(10), slot_time(12)
+            session.commit()
+            patched = cache.matrix(session, WEEK, current_version(session))
+        assert patched == build_weekly_matrix(session, WEEK)
+    stats = cache.stats()
+    assert stats['patches'] == ROUNDS
+    print("Single-assignment move")
+    print(f"  patch            : {stats['patch_latency_ms']['mean']:8.2f} ms  (hit ratio {stats['hit_ratio']:.2f})")
+    print(f"  full rebuild     : {builder_seconds * 1000:8.2f} ms")
+
+if __name__ == '__main__':
+    main()
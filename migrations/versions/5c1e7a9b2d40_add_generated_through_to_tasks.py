@@ -0,0 +1,28 @@
+"""Add generated_through watermark to tasks
+
+Revision ID: 5c1e7a9b2d40
+Revises: d209d70ea919
+Create Date: 2026-10-16 09:12:31.184022
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5c1e7a9b2d40'
+down_revision: Union[str, None] = 'd209d70ea919'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    with op.batch_alter_table('tasks', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('generated_through', sa.Date(), nullable=True))
+
+
+def downgrade() -> None:
+    with op.batch_alter_table('tasks', schema=None) as batch_op:
+        batch_op.drop_column('generated_through')
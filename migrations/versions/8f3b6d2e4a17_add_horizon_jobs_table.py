@@ -0,0 +1,41 @@
+"""Add horizon_jobs table for chunked horizon extension
+
+Revision ID: 8f3b6d2e4a17
+Revises: 5c1e7a9b2d40
+Create Date: 2026-10-16 11:47:05.902316
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8f3b6d2e4a17'
+down_revision: Union[str, None] = '5c1e7a9b2d40'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'horizon_jobs',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('horizon_end', sa.Date(), nullable=False),
+        sa.Column('full_rescan', sa.Boolean(), nullable=False),
+        sa.Column('status', sa.String(length=20), nullable=False),
+        sa.Column('cursor_task_id', sa.Integer(), nullable=False),
+        sa.Column('tasks_processed', sa.Integer(), nullable=False),
+        sa.Column('assignments_created', sa.Integer(), nullable=False),
+        sa.Column('chunks', sa.Integer(), nullable=False),
+        sa.Column('error', sa.String(length=500), nullable=True),
+        sa.Column('started_at', sa.DateTime(), server_default=sa.text('(CURRENT_TIMESTAMP)'), nullable=True),
+        sa.Column('updated_at', sa.DateTime(), server_default=sa.text('(CURRENT_TIMESTAMP)'), nullable=True),
+        sa.Column('finished_at', sa.DateTime(), nullable=True),
+        sa.PrimaryKeyConstraint('id')
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('horizon_jobs')
@@ -0,0 +1,35 @@
+"""Add occurrence_exceptions table for moved or deleted virtual occurrences
+
+Revision ID: a93e5d7c1b48
+Revises: c58d1f3a9e26
+Create Date: 2026-10-16 21:12:45.903118
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a93e5d7c1b48'
+down_revision: Union[str, None] = 'c58d1f3a9e26'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'occurrence_exceptions',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('task_id', sa.Integer(), nullable=False),
+        sa.Column('date', sa.Date(), nullable=False),
+        sa.Column('created_at', sa.DateTime(), server_default=sa.text('(CURRENT_TIMESTAMP)'), nullable=True),
+        sa.ForeignKeyConstraint(['task_id'], ['tasks.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('task_id', 'date', name='uq_occurrence_exceptions_task_date')
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('occurrence_exceptions')
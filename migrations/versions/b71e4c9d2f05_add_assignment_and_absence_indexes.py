@@ -0,0 +1,35 @@
+"""Add composite indexes on assignments and absences
+
+Revision ID: b71e4c9d2f05
+Revises: 8f3b6d2e4a17
+Create Date: 2026-10-16 14:03:52.417730
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b71e4c9d2f05'
+down_revision: Union[str, None] = '8f3b6d2e4a17'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Earlier revisions indexed the old singular tables; index the live ones
+    op.create_index('assignments_aide_date_start_idx', 'assignments', ['aide_id', 'date', 'start_time'], unique=False, if_not_exists=True)
+    op.create_index('assignments_task_date_idx', 'assignments', ['task_id', 'date'], unique=False, if_not_exists=True)
+    op.create_index('assignments_date_status_idx', 'assignments', ['date', 'status'], unique=False, if_not_exists=True)
+    op.create_index('absences_aide_dates_idx', 'absences', ['aide_id', 'start_date', 'end_date'], unique=False, if_not_exists=True)
+    op.create_index('absences_dates_idx', 'absences', ['start_date', 'end_date'], unique=False, if_not_exists=True)
+
+
+def downgrade() -> None:
+    op.drop_index('absences_dates_idx', table_name='absences', if_exists=True)
+    op.drop_index('absences_aide_dates_idx', table_name='absences', if_exists=True)
+    op.drop_index('assignments_date_status_idx', table_name='assignments', if_exists=True)
+    op.drop_index('assignments_task_date_idx', table_name='assignments', if_exists=True)
+    op.drop_index('assignments_aide_date_start_idx', table_name='assignments', if_exists=True)
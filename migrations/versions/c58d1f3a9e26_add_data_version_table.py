@@ -0,0 +1,32 @@
+"""Add data_version counter for conditional GETs
+
+Revision ID: c58d1f3a9e26
+Revises: e4a9c3f17b62
+Create Date: 2026-10-16 18:04:12.417330
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c58d1f3a9e26'
+down_revision: Union[str, None] = 'e4a9c3f17b62'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    data_version = op.create_table(
+        'data_version',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('version', sa.Integer(), nullable=False),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.bulk_insert(data_version, [{'id': 1, 'version': 0}])
+
+
+def downgrade() -> None:
+    op.drop_table('data_version')
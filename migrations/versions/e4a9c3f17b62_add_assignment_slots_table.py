@@ -0,0 +1,62 @@
+"""Add assignment_slots table enforcing one assignment per aide slot
+
+Revision ID: e4a9c3f17b62
+Revises: b71e4c9d2f05
+Create Date: 2026-10-16 17:21:38.604915
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e4a9c3f17b62'
+down_revision: Union[str, None] = 'b71e4c9d2f05'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    slots = op.create_table(
+        'assignment_slots',
+        sa.Column('assignment_id', sa.Integer(), nullable=False),
+        sa.Column('slot', sa.SmallInteger(), nullable=False),
+        sa.Column('aide_id', sa.Integer(), nullable=False),
+        sa.Column('date', sa.Date(), nullable=False),
+        sa.CheckConstraint('slot >= 0 AND slot < 16', name='ck_assignment_slots_slot'),
+        sa.ForeignKeyConstraint(['aide_id'], ['teacher_aide.id'], ondelete='CASCADE'),
+        sa.ForeignKeyConstraint(['assignment_id'], ['assignments.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('assignment_id', 'slot'),
+        sa.UniqueConstraint('aide_id', 'date', 'slot', name='uq_assignment_slots_aide_date_slot')
+    )
+
+    # Backfill from assigned rows. Existing double bookings cannot be represented;
+    # the earliest assignment keeps the slot and the rest show up in the conflict report.
+    bind = op.get_bind()
+    assignments = sa.table(
+        'assignments',
+        sa.column('id', sa.Integer), sa.column('aide_id', sa.Integer), sa.column('date', sa.Date),
+        sa.column('start_time', sa.Time), sa.column('end_time', sa.Time)
+    )
+    held = set()
+    rows = []
+    for assignment_id, aide_id, day, start, end in bind.execute(
+        sa.select(assignments.c.id, assignments.c.aide_id, assignments.c.date,
+                  assignments.c.start_time, assignments.c.end_time)
+        .where(assignments.c.aide_id.isnot(None))
+        .order_by(assignments.c.id)
+    ):
+        first = max((start.hour * 60 + start.minute - 480) // 30, 0)
+        last = min(-(-(end.hour * 60 + end.minute - 480) // 30), 16)
+        for slot in range(first, last):
+            if (aide_id, day, slot) not in held:
+                held.add((aide_id, day, slot))
+                rows.append({'assignment_id': assignment_id, 'slot': slot, 'aide_id': aide_id, 'date': day})
+    if rows:
+        op.bulk_insert(slots, rows)
+
+
+def downgrade() -> None:
+    op.drop_table('assignment_slots')
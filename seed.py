@@ -5,6 +5,8 @@ import argparse
 import os
 from api.models import Base, TeacherAide, Availability, Classroom, Task, Assignment, Absence, SchoolClass
 from api.db import init_db, get_session
+from api.absence_index import absence_index
+from api.availability_cache import availability_cache
 from app import create_app
 import logging
 
@@ -312,6 +314,8 @@ def create_assignments(session, tasks, aides):
     start_date = today - timedelta(days=today.weekday())  # Start of current week
     end_date = start_date + timedelta(days=4)  # End of week (Friday)
     
+    aide_ids = [aide.id for aide in aides]
+
     # Create assignments for each non-flexible task
     for task in tasks:
         if task.is_flexible:
@@ -319,13 +323,19 @@ def create_assignments(session, tasks, aides):
             continue
 
         assignments = task.generate_assignments(start_date, end_date, session)
-        for assignment in assignments:
+        if not assignments:
+            continue
+        # Every aide against every date of the task at once; no window means unavailable
+        available = availability_cache.available(
+            session, aide_ids, [a.date for a in assignments], task.start_time, task.end_time, default=0
+        )
+        for column, assignment in enumerate(assignments):
             # Persist the assignment row first
             assignment.status = 'UNASSIGNED'
 
             # Try to assign to the first available aide
-            for aide in aides:
-                if aide.is_available(assignment.date, assignment.start_time, assignment.end_time):
+            for row, aide in enumerate(aides):
+                if available[row, column] and not absence_index.is_absent(session, aide.id, assignment.date):
                     assignment.aide_id = aide.id
                     assignment.status = 'ASSIGNED'
                     break
@@ -62,7 +62,7 @@ def db_session(connection):
 @pytest.fixture
 def app(engine):
     """Create a Flask app for testing."""
-    app = create_app(engine)
+    app = create_app(engine, scheduler=False)
     app.config.update({
         'TESTING': True,
         'WTF_CSRF_ENABLED': False
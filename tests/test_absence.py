@@ -14,7 +14,7 @@ def app():
     """Create a Flask app with an in-memory SQLite database."""
     engine = create_engine('sqlite:///:memory:')
     Base.metadata.create_all(engine)
-    app = create_app(engine)
+    app = create_app(engine, scheduler=False)
     return app
 
 @pytest.fixture
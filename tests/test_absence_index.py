@@ -0,0 +1,88 @@
+"""Tests for the per-aide absence interval index."""
+
+import pytest
+from datetime import date
+from sqlalchemy.orm import Session
+
+from api.models import Absence, TeacherAide
+from api.absence_index import absence_index
+
+@pytest.fixture
+def aide(db_session: Session) -> TeacherAide:
+    aide = TeacherAide(name="Absent Aide", colour_hex="#112233")
+    db_session.add(aide)
+    db_session.commit()
+    return aide
+
+def _absence(session: Session, aide: TeacherAide, start: date, end: date) -> Absence:
+    absence = Absence(aide_id=aide.id, start_date=start, end_date=end, reason="Leave")
+    session.add(absence)
+    session.commit()
+    return absence
+
+class TestAbsenceIndex:
+    """Tests for point and range lookups and refreshes."""
+
+    def test_absent_on_boundaries(self, db_session: Session, aide):
+        """Both ends of an absence are inclusive."""
+        first = _absence(db_session, aide, date(2030, 3, 4), date(2030, 3, 6))
+        second = _absence(db_session, aide, date(2030, 3, 11), date(2030, 3, 11))
+
+        assert absence_index.absence_on(db_session, aide.id, date(2030, 3, 3)) is None
+        assert absence_index.absence_on(db_session, aide.id, date(2030, 3, 4)) == first.id
+        assert absence_index.absence_on(db_session, aide.id, date(2030, 3, 6)) == first.id
+        assert absence_index.absence_on(db_session, aide.id, date(2030, 3, 7)) is None
+        assert absence_index.absence_on(db_session, aide.id, date(2030, 3, 11)) == second.id
+        assert not absence_index.is_absent(db_session, aide.id + 1, date(2030, 3, 4))
+
+    def test_absent_ranges_are_clipped(self, db_session: Session, aide):
+        """Range lookups return only the overlapping part of each absence."""
+        first = _absence(db_session, aide, date(2030, 3, 1), date(2030, 3, 5))
+        second = _absence(db_session, aide, date(2030, 3, 7), date(2030, 3, 20))
+
+        assert absence_index.absent_ranges(db_session, aide.id, date(2030, 3, 4), date(2030, 3, 10)) == [
+            (date(2030, 3, 4), date(2030, 3, 5), first.id),
+            (date(2030, 3, 7), date(2030, 3, 10), second.id),
+        ]
+        assert list(absence_index.absent_days(db_session, aide.id, date(2030, 3, 5), date(2030, 3, 7))) == [
+            (date(2030, 3, 5), first.id), (date(2030, 3, 7), second.id)
+        ]
+        assert absence_index.absent_ranges(db_session, aide.id, date(2030, 3, 21), date(2030, 3, 31)) == []
+
+    def test_overlapping_rows_are_merged(self, db_session: Session, aide):
+        """Overlapping absences collapse into one interval keeping the earliest id."""
+        first = _absence(db_session, aide, date(2030, 3, 4), date(2030, 3, 6))
+        _absence(db_session, aide, date(2030, 3, 5), date(2030, 3, 9))
+
+        assert absence_index.absent_ranges(db_session, aide.id, date(2030, 3, 1), date(2030, 3, 31)) == [
+            (date(2030, 3, 4), date(2030, 3, 9), first.id)
+        ]
+
+    def test_refreshed_after_commit(self, db_session: Session, aide):
+        """Created, moved and deleted absences are visible on the next lookup."""
+        assert not absence_index.is_absent(db_session, aide.id, date(2030, 3, 4))
+
+        absence = _absence(db_session, aide, date(2030, 3, 4), date(2030, 3, 4))
+        assert absence_index.is_absent(db_session, aide.id, date(2030, 3, 4))
+
+        absence.start_date = absence.end_date = date(2030, 3, 5)
+        # The writing session sees its own change before committing
+        assert absence_index.is_absent(db_session, aide.id, date(2030, 3, 5))
+        db_session.commit()
+        assert not absence_index.is_absent(db_session, aide.id, date(2030, 3, 4))
+        assert absence_index.is_absent(db_session, aide.id, date(2030, 3, 5))
+
+        db_session.delete(absence)
+        db_session.commit()
+        assert not absence_index.is_absent(db_session, aide.id, date(2030, 3, 5))
+
+    def test_absence_routes_refresh(self, client, db_session: Session, aide):
+        """Absences created and deleted through the API apply to booking checks."""
+        aide_id = aide.id
+        assert not absence_index.is_absent(db_session, aide_id, date(2030, 3, 4))
+
+        response = client.post('/api/absences', json={
+            'aide_id': aide_id, 'start_date': '2030-03-04', 'end_date': '2030-03-05'
+        })
+        assert response.status_code == 201
+        assert absence_index.is_absent(db_session, aide_id, date(2030, 3, 5))
@@ -0,0 +1,111 @@
+"""Tests for the database-enforced assignment slot table."""
+
+import pytest
+from datetime import date, time
+from sqlalchemy.orm import Session
+
+from api.models import Task, Assignment, AssignmentSlot, TeacherAide, SlotConflictError
+from api.constants import Status
+
+DAY = date(2030, 3, 4)
+
+@pytest.fixture
+def aide(db_session: Session) -> TeacherAide:
+    aide = TeacherAide(name="Slot Aide", colour_hex="#112233")
+    db_session.add(aide)
+    db_session.commit()
+    return aide
+
+@pytest.fixture
+def task(db_session: Session) -> Task:
+    task = Task(
+        title="Slot Task",
+        category="CLASS_SUPPORT",
+        start_time=time(9, 0),
+        end_time=time(10, 0),
+        status=Status.UNASSIGNED
+    )
+    db_session.add(task)
+    db_session.commit()
+    return task
+
+def _assign(session: Session, task: Task, aide, start: time, end: time) -> Assignment:
+    assignment = Assignment(
+        task_id=task.id, aide_id=aide.id if aide else None, date=DAY,
+        start_time=start, end_time=end,
+        status=Status.ASSIGNED.value if aide else Status.UNASSIGNED.value
+    )
+    session.add(assignment)
+    session.commit()
+    return assignment
+
+def _slots(session: Session, assignment_id: int):
+    return [slot for slot, in session.query(AssignmentSlot.slot).filter_by(assignment_id=assignment_id).order_by(AssignmentSlot.slot)]
+
+class TestAssignmentSlots:
+    """Tests for keeping slots in sync and rejecting double bookings."""
+
+    def test_slots_follow_assignment_writes(self, db_session: Session, task, aide):
+        """Slots are claimed on insert, moved on update and freed on unassign and delete."""
+        assignment = _assign(db_session, task, aide, time(9, 0), time(10, 0))
+        assert _slots(db_session, assignment.id) == [2, 3]
+
+        assignment.start_time, assignment.end_time = time(13, 0), time(14, 30)
+        db_session.commit()
+        assert _slots(db_session, assignment.id) == [10, 11, 12]
+
+        assignment.aide_id = None
+        db_session.commit()
+        assert _slots(db_session, assignment.id) == []
+
+        assignment.aide_id = aide.id
+        db_session.commit()
+        assignment_id = assignment.id
+        db_session.delete(assignment)
+        db_session.commit()
+        assert _slots(db_session, assignment_id) == []
+
+    def test_unassigned_rows_hold_no_slots(self, db_session: Session, task):
+        """Unassigned rows never conflict."""
+        first = _assign(db_session, task, None, time(9, 0), time(10, 0))
+        second = _assign(db_session, task, None, time(9, 0), time(10, 0))
+        assert _slots(db_session, first.id) == _slots(db_session, second.id) == []
+
+    def test_overlap_fails_at_insert(self, db_session: Session, task, aide):
+        """A second assignment sharing a slot is rejected by the database."""
+        _assign(db_session, task, aide, time(9, 0), time(10, 0))
+        # Touching slots are fine
+        assert _slots(db_session, _assign(db_session, task, aide, time(10, 0), time(11, 0)).id) == [4, 5]
+
+        with pytest.raises(SlotConflictError):
+            _assign(db_session, task, aide, time(9, 30), time(10, 30))
+        db_session.rollback()
+
+    def test_route_reports_race_as_conflict(self, client, db_session: Session, task, aide, monkeypatch):
+        """A booking that passed the conflict check but lost the race returns 409."""
+        _assign(db_session, task, aide, time(9, 0), time(10, 0))
+        other = Task(title="Other", category="CLASS_SUPPORT", start_time=time(9, 0),
+                     end_time=time(10, 0), status=Status.UNASSIGNED)
+        db_session.add(other)
+        db_session.commit()
+        other_id, aide_id = other.id, aide.id
+        # Simulate a concurrent request that booked the slot after the check ran
+        monkeypatch.setattr('api.routes.assignment_routes.find_conflict', lambda *args, **kwargs: None)
+
+        response = client.post('/api/assignments', json={
+            'task_id': other_id, 'aide_id': aide_id, 'date': DAY.isoformat(),
+            'start_time': '09:30', 'end_time': '10:30'
+        })
+        assert response.status_code == 409
+        assert response.get_json()['error']['code'] == 'CONFLICT'
+
+    def test_batch_claims_slots(self, client, db_session: Session, task, aide):
+        """Rows created by the bulk batch INSERT hold their slots too."""
+        aide_id = aide.id
+        response = client.post('/api/assignments/batch', json={
+            'task_id': task.id, 'aide_id': aide_id, 'dates': [DAY.isoformat()],
+            'start_time': '09:00', 'end_time': '10:00'
+        })
+        assert response.status_code == 201
+        assignment_id = response.get_json()['assignments'][0]['id']
+        assert _slots(db_session, assignment_id) == [2, 3]
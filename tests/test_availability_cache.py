@@ -0,0 +1,89 @@
+"""Tests for the weekly availability mask cache."""
+
+import pytest
+from datetime import date, time
+from sqlalchemy.orm import Session
+
+from api.models import Availability, TeacherAide
+from api.availability_cache import availability_cache, window_mask
+from api.slots import slot_mask
+
+MONDAY = date(2030, 3, 4)
+TUESDAY = date(2030, 3, 5)
+SATURDAY = date(2030, 3, 9)
+
+@pytest.fixture
+def aides(db_session: Session):
+    morning = TeacherAide(name="Morning Aide", colour_hex="#112233")
+    morning.availabilities.append(Availability(weekday='MO', start_time=time(8, 0), end_time=time(12, 0)))
+    anytime = TeacherAide(name="Anytime Aide", colour_hex="#445566")
+    db_session.add_all([morning, anytime])
+    db_session.commit()
+    return morning, anytime
+
+class TestAvailabilityCache:
+    """Tests for mask lookups and invalidation."""
+
+    def test_window_mask_rounds_inwards(self):
+        """Only slots the window fully covers count as available."""
+        assert window_mask(time(8, 0), time(9, 0)) == slot_mask(time(8, 0), time(9, 0))
+        assert window_mask(time(8, 15), time(9, 45)) == slot_mask(time(8, 30), time(9, 30))
+        assert window_mask(time(8, 15), time(8, 45)) == 0
+
+    def test_available_matrix(self, db_session: Session, aides):
+        """Rows are aides, columns dates; missing windows use the default."""
+        morning, anytime = aides
+        result = availability_cache.available(
+            db_session, [morning.id, anytime.id], [MONDAY, TUESDAY, SATURDAY], time(9, 0), time(10, 0)
+        )
+        assert result.shape == (2, 3)
+        assert result.tolist() == [[True, True, True], [True, True, True]]
+
+        afternoon = availability_cache.available(
+            db_session, [morning.id, anytime.id], [MONDAY, TUESDAY], time(13, 0), time(14, 0)
+        )
+        assert afternoon.tolist() == [[False, True], [True, True]]
+
+        strict = availability_cache.available(
+            db_session, [morning.id, anytime.id], [MONDAY, TUESDAY], time(9, 0), time(10, 0), default=0
+        )
+        assert strict.tolist() == [[True, False], [False, False]]
+
+    def test_loaded_once(self, db_session: Session, aides):
+        """Repeated lookups reuse the same masks."""
+        morning, _ = aides
+        loads = availability_cache.loads
+        for _ in range(5):
+            availability_cache.is_available(db_session, morning.id, MONDAY, time(9, 0), time(10, 0))
+        assert availability_cache.loads == loads + 1
+
+    def test_invalidated_on_commit(self, db_session: Session, aides):
+        """Committed availability writes are visible on the next lookup."""
+        morning, _ = aides
+        assert not availability_cache.is_available(db_session, morning.id, MONDAY, time(13, 0), time(14, 0))
+
+        morning.availabilities[0].end_time = time(15, 0)
+        # The writing session sees its own change before committing
+        assert availability_cache.is_available(db_session, morning.id, MONDAY, time(13, 0), time(14, 0))
+        db_session.commit()
+        assert availability_cache.is_available(db_session, morning.id, MONDAY, time(13, 0), time(14, 0))
+
+    def test_availability_routes_invalidate(self, client, db_session: Session, aides):
+        """Windows added through the API apply to the next booking check."""
+        _, anytime = aides
+        anytime_id = anytime.id
+        assert availability_cache.is_available(db_session, anytime_id, TUESDAY, time(13, 0), time(14, 0))
+
+        response = client.post(f'/api/teacher-aides/{anytime_id}/availability', json={
+            'weekday': 'TU', 'start_time': '08:00', 'end_time': '12:00'
+        })
+        assert response.status_code == 201
+        assert not availability_cache.is_available(db_session, anytime_id, TUESDAY, time(13, 0), time(14, 0))
+
+    def test_teacher_aide_is_available(self, db_session: Session, aides):
+        """The model check requires a window and uses the cached masks."""
+        morning, anytime = aides
+        assert morning.is_available(MONDAY, time(9, 0), time(10, 0))
+        assert not morning.is_available(MONDAY, time(12, 0), time(13, 0))
+        assert not morning.is_available(TUESDAY, time(9, 0), time(10, 0))
+        assert not anytime.is_available(MONDAY, time(9, 0), time(10, 0))
@@ -0,0 +1,169 @@
+"""Tests for the in-memory conflict index."""
+
+import pytest
+from datetime import date, time
+from sqlalchemy import insert, update
+from sqlalchemy.orm import Session
+
+from api.models import Task, Assignment, TeacherAide
+from api.conflict_index import conflict_index, find_conflict
+from api.constants import Status
+
+DAY = date(2030, 3, 4)
+
+@pytest.fixture
+def aide(db_session: Session) -> TeacherAide:
+    aide = TeacherAide(name="Index Aide", colour_hex="#112233")
+    db_session.add(aide)
+    db_session.commit()
+    return aide
+
+@pytest.fixture
+def task(db_session: Session) -> Task:
+    task = Task(
+        title="Index Task",
+        category="CLASS_SUPPORT",
+        start_time=time(9, 0),
+        end_time=time(10, 0),
+        status=Status.UNASSIGNED
+    )
+    db_session.add(task)
+    db_session.commit()
+    return task
+
+def _assign(session: Session, task: Task, aide: TeacherAide, start: time, end: time) -> Assignment:
+    assignment = Assignment(
+        task_id=task.id, aide_id=aide.id, date=DAY,
+        start_time=start, end_time=end, status=Status.ASSIGNED.value
+    )
+    session.add(assignment)
+    return assignment
+
+class TestConflictIndex:
+    """Tests for overlap lookups and write-through maintenance."""
+
+    def test_overlap_boundaries(self, db_session: Session, task, aide):
+        """Touching slots do not overlap; any shared minute does."""
+        first = _assign(db_session, task, aide, time(9, 0), time(10, 0))
+        db_session.commit()
+
+        def overlaps(start, end):
+            return conflict_index.overlapping(db_session, aide.id, DAY, start, end)
+
+        assert overlaps(time(8, 0), time(9, 0)) == []
+        assert overlaps(time(10, 0), time(11, 0)) == []
+        assert overlaps(time(9, 30), time(10, 30)) == [first.id]
+        assert overlaps(time(8, 0), time(12, 0)) == [first.id]
+        assert overlaps(time(9, 15), time(9, 45)) == [first.id]
+        assert conflict_index.overlapping(db_session, aide.id, DAY, time(9, 0), time(10, 0),
+                                          exclude_id=first.id) == []
+
+    def test_write_through_on_update_and_delete(self, db_session: Session, task, aide):
+        """Committed moves and deletes are reflected without a rebuild."""
+        assignment = _assign(db_session, task, aide, time(9, 0), time(10, 0))
+        db_session.commit()
+        assert find_conflict(db_session, aide.id, DAY, time(9, 0), time(9, 30)) is assignment
+        generation = conflict_index.generation
+
+        assignment.start_time, assignment.end_time = time(13, 0), time(14, 0)
+        db_session.commit()
+        assert find_conflict(db_session, aide.id, DAY, time(9, 0), time(9, 30)) is None
+        assert find_conflict(db_session, aide.id, DAY, time(13, 30), time(14, 0)) is assignment
+
+        db_session.delete(assignment)
+        db_session.commit()
+        assert find_conflict(db_session, aide.id, DAY, time(13, 30), time(14, 0)) is None
+        assert conflict_index.generation == generation
+
+    def test_uncommitted_changes_are_overlaid(self, db_session: Session, task, aide):
+        """Rows added in the current transaction conflict before commit, and vanish on rollback."""
+        aide_id = aide.id
+        conflict_index.rebuild(db_session)
+        pending = _assign(db_session, task, aide, time(11, 0), time(12, 0))
+        assert find_conflict(db_session, aide_id, DAY, time(11, 30), time(12, 30)) is pending
+
+        db_session.rollback()
+        assert conflict_index.overlapping(db_session, aide_id, DAY, time(11, 0), time(12, 0)) == []
+
+    def test_external_write_triggers_rebuild(self, db_session: Session, task, aide, monkeypatch):
+        """A bulk SQL write not seen by the ORM is picked up by the fingerprint check."""
+        assignment = _assign(db_session, task, aide, time(9, 0), time(10, 0))
+        db_session.commit()
+        assert find_conflict(db_session, aide.id, DAY, time(9, 0), time(10, 0)) is assignment
+
+        db_session.execute(update(Assignment).where(Assignment.id == assignment.id).values(aide_id=None))
+        db_session.commit()
+        monkeypatch.setattr(conflict_index, 'verify_interval', 0)
+        generation = conflict_index.generation
+        assert conflict_index.overlapping(db_session, aide.id, DAY, time(9, 0), time(10, 0)) == []
+        assert conflict_index.generation == generation + 1
+
+    def test_external_write_after_local_commit_is_indexed(self, db_session: Session, task, aide, monkeypatch):
+        """A local commit re-baselines the fingerprint, so a later external insert still triggers a rebuild."""
+        first = _assign(db_session, task, aide, time(9, 0), time(10, 0))
+        db_session.commit()
+        assert find_conflict(db_session, aide.id, DAY, time(9, 0), time(10, 0)) is first
+        _assign(db_session, task, aide, time(10, 0), time(11, 0))
+        db_session.commit()
+
+        # Core statement on the connection: no ORM events, no write-through
+        db_session.connection().execute(insert(Assignment.__table__).values(
+            task_id=task.id, aide_id=aide.id, date=DAY,
+            start_time=time(13, 0), end_time=time(14, 0), status=Status.ASSIGNED.value
+        ))
+        monkeypatch.setattr(conflict_index, 'verify_interval', 0)
+        external = find_conflict(db_session, aide.id, DAY, time(13, 0), time(14, 0))
+        assert external is not None and external.start_time == time(13, 0)
+
+    def test_local_commit_keeps_index_without_rebuild(self, db_session: Session, task, aide, monkeypatch):
+        """The fingerprint read at commit time becomes the baseline when it matches the index."""
+        _assign(db_session, task, aide, time(9, 0), time(10, 0))
+        db_session.commit()
+        find_conflict(db_session, aide.id, DAY, time(9, 0), time(10, 0))
+        generation = conflict_index.generation
+        _assign(db_session, task, aide, time(10, 0), time(11, 0))
+        db_session.commit()
+
+        monkeypatch.setattr(conflict_index, 'verify_interval', 0)
+        assert find_conflict(db_session, aide.id, DAY, time(10, 0), time(11, 0)) is not None
+        assert conflict_index.generation == generation
+
+    def test_check_conflicts_uses_index(self, db_session: Session, task, aide):
+        """Assignment.check_conflicts returns the overlapping rows."""
+        first = _assign(db_session, task, aide, time(9, 0), time(10, 0))
+        db_session.flush()
+        # assignment_slots rejects double bookings through the ORM; insert one as legacy data
+        second = db_session.scalars(insert(Assignment).returning(Assignment), [{
+            'task_id': task.id, 'aide_id': aide.id, 'date': DAY,
+            'start_time': time(9, 30), 'end_time': time(10, 30), 'status': Status.ASSIGNED.value
+        }]).one()
+        db_session.commit()
+        assert first.check_conflicts(db_session) == [second]
+        assert second.check_conflicts(db_session) == [first]
+
+    def test_forced_check_ignores_verify_interval(self, db_session: Session, task, aide):
+        """Write paths see an external write immediately; throttled reads wait for the interval."""
+        find_conflict(db_session, aide.id, DAY, time(9, 0), time(10, 0))
+        db_session.connection().execute(insert(Assignment.__table__).values(
+            task_id=task.id, aide_id=aide.id, date=DAY,
+            start_time=time(9, 0), end_time=time(10, 0), status=Status.ASSIGNED.value
+        ))
+        assert find_conflict(db_session, aide.id, DAY, time(9, 0), time(10, 0)) is None
+        assert find_conflict(db_session, aide.id, DAY, time(9, 0), time(10, 0), force=True) is not None
+
+    def test_forced_check_with_uncommitted_writes(self, db_session: Session, task, aide):
+        """Rows the session has not written are verified even while its own writes are pending."""
+        aide_id = aide.id
+        find_conflict(db_session, aide.id, DAY, time(9, 0), time(10, 0))
+        pending = _assign(db_session, task, aide, time(13, 0), time(14, 0))
+        db_session.flush()
+        db_session.connection().execute(insert(Assignment.__table__).values(
+            task_id=task.id, aide_id=aide.id, date=DAY,
+            start_time=time(9, 0), end_time=time(10, 0), status=Status.ASSIGNED.value
+        ))
+        assert find_conflict(db_session, aide.id, DAY, time(9, 30), time(10, 0), force=True) is not None
+        assert find_conflict(db_session, aide.id, DAY, time(13, 0), time(14, 0), force=True) is pending
+
+        # The uncommitted row was left out of the rebuild, so a rollback leaves nothing behind
+        db_session.rollback()
+        assert conflict_index.overlapping(db_session, aide_id, DAY, time(13, 0), time(14, 0)) == []
@@ -0,0 +1,50 @@
+"""Tests for the global data version behind conditional GETs."""
+
+from datetime import date, time
+from sqlalchemy import insert, update
+from sqlalchemy.orm import Session
+
+from api.models import Task, Assignment, TeacherAide, HorizonJob
+from api.data_version import current_version
+
+class TestDataVersion:
+    """Tests for bumping the version on schedule writes."""
+
+    def test_orm_writes_bump_version(self, db_session: Session):
+        """Inserts, updates and deletes of versioned models each bump the version."""
+        start = current_version(db_session)
+        aide = TeacherAide(name="Version Aide", colour_hex="#123456")
+        db_session.add(aide)
+        db_session.commit()
+        assert current_version(db_session) == start + 1
+
+        aide.name = "Renamed Aide"
+        db_session.commit()
+        assert current_version(db_session) == start + 2
+
+        db_session.delete(aide)
+        db_session.commit()
+        assert current_version(db_session) == start + 3
+
+    def test_bulk_statements_bump_version(self, db_session: Session):
+        """Bulk ORM-enabled statements bump the version like flushes do."""
+        task = Task(title="Version Task", category="CLASS_SUPPORT",
+                    start_time=time(9, 0), end_time=time(10, 0), status='UNASSIGNED')
+        db_session.add(task)
+        db_session.commit()
+        start = current_version(db_session)
+
+        db_session.execute(insert(Assignment), [{
+            'task_id': task.id, 'date': date(2030, 3, 4), 'start_time': time(9, 0),
+            'end_time': time(10, 0), 'status': 'UNASSIGNED'
+        }])
+        db_session.execute(update(Task).where(Task.id == task.id).values(notes="Bulk"))
+        db_session.commit()
+        assert current_version(db_session) == start + 2
+
+    def test_unversioned_writes_keep_version(self, db_session: Session):
+        """Bookkeeping rows that no view shows do not invalidate ETags."""
+        start = current_version(db_session)
+        db_session.add(HorizonJob(horizon_end=date(2030, 6, 1)))
+        db_session.commit()
+        assert current_version(db_session) == start
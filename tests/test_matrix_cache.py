@@ -0,0 +1,131 @@
+"""Tests for the incrementally patched weekly-matrix cache."""
+
+import pytest
+from datetime import date, time
+from sqlalchemy import update
+from sqlalchemy.orm import Session
+
+from api.models import Task, TeacherAide, DataVersion
+from api.constants import Status
+from api.data_version import current_version
+from api.matrix_cache import weekly_matrix_cache, WeeklyMatrixCache
+from api.weekly_matrix import build_weekly_matrix
+
+WEEK = '2030-W10'
+MONDAY = date(2030, 3, 4)
+URL = f'/api/assignments/weekly-matrix?week={WEEK}'
+
+@pytest.fixture
+def schedule(db_session: Session):
+    """Two aides and two non-recurring tasks; returns their ids."""
+    aides = [TeacherAide(name=f"Cache Aide {i}", colour_hex="#123456") for i in range(2)]
+    tasks = [
+        Task(title=f"Cache Task {i}", category="CLASS_SUPPORT", start_time=time(9, 0),
+             end_time=time(10, 0), status=Status.UNASSIGNED)
+        for i in range(2)
+    ]
+    db_session.add_all(aides + tasks)
+    db_session.commit()
+    return [aide.id for aide in aides], [task.id for task in tasks]
+
+def _fresh(db_session: Session):
+    db_session.expire_all()
+    return build_weekly_matrix(db_session, WEEK)
+
+class TestWeeklyMatrixCache:
+    """Tests for patching cached weeks instead of rebuilding them."""
+
+    def test_route_writes_are_patched(self, client, db_session: Session, schedule):
+        """Assignment, batch and absence writes through the API patch the cached week."""
+        (aide_a, aide_b), (task_1, task_2) = schedule
+        assert client.get(URL).status_code == 200
+        assert weekly_matrix_cache.stats()['misses'] == 1
+
+        created = client.post('/api/assignments', json={
+            'task_id': task_1, 'aide_id': aide_a, 'date': MONDAY.isoformat(),
+            'start_time': '09:00', 'end_time': '10:30'
+        })
+        assert created.status_code == 201
+        assignment_id = created.get_json()['id']
+        assert client.get(URL).get_json() == _fresh(db_session)
+
+        # Move to another aide and day in the same week
+        assert client.put(f'/api/assignments/{assignment_id}', json={
+            'aide_id': aide_b, 'date': '2030-03-06', 'start_time': '13:00', 'end_time': '14:00'
+        }).status_code == 200
+        assert client.get(URL).get_json() == _fresh(db_session)
+
+        assert client.post('/api/assignments/batch', json={
+            'task_id': task_2, 'aide_id': aide_a, 'dates': ['2030-03-05', '2030-03-07'],
+            'start_time': '08:00', 'end_time': '09:00'
+        }).status_code == 201
+        assert client.get(URL).get_json() == _fresh(db_session)
+
+        absence = client.post('/api/absences', json={
+            'aide_id': aide_b, 'start_date': '2030-03-06', 'end_date': '2030-03-07', 'reason': 'Leave'
+        })
+        assert absence.status_code == 201
+        # Creating the absence also released aide B's Wednesday assignment
+        matrix = client.get(URL).get_json()
+        assert sorted(matrix['absences']) == [f'{aide_b}_Thursday', f'{aide_b}_Wednesday']
+        assert not any(key.startswith(f'{aide_b}_') for key in matrix['assignments'])
+        assert matrix == _fresh(db_session)
+
+        absence_id = absence.get_json()['absence']['id']
+        assert client.delete(f"/api/absences/{absence_id}").status_code in (200, 204)
+        assert client.delete(f'/api/assignments/{assignment_id}').status_code in (200, 204)
+        assert client.get(URL).get_json() == _fresh(db_session)
+
+        stats = weekly_matrix_cache.stats()
+        assert stats['misses'] == 1
+        # Both deletes were queued and applied by the last read in one patch
+        assert stats['patches'] == 5
+        assert stats['hit_ratio'] == round(5 / 6, 4)
+
+    def test_aide_edits_are_patched(self, client, db_session: Session, schedule):
+        """Renaming or adding an aide reorders the aide list without a rebuild."""
+        (aide_a, _), _ = schedule
+        client.get(URL)
+        db_session.get(TeacherAide, aide_a).name = "Zed Aide"
+        db_session.add(TeacherAide(name="Able Aide", colour_hex="#654321"))
+        db_session.commit()
+
+        matrix = client.get(URL).get_json()
+        assert matrix['aides'] == _fresh(db_session)['aides']
+        assert matrix['aides'][0]['name'] == "Able Aide"
+        assert weekly_matrix_cache.stats()['misses'] == 1
+
+    def test_task_edit_and_external_write_rebuild(self, client, db_session: Session, schedule):
+        """Writes the cache cannot patch fall back to a rebuild."""
+        _, (task_1, _) = schedule
+        client.get(URL)
+        db_session.get(Task, task_1).title = "Renamed Task"
+        db_session.commit()
+        client.get(URL)
+        assert weekly_matrix_cache.stats()['misses'] == 2
+
+        # A version bump the cache did not see stands in for another process
+        db_session.execute(update(DataVersion).values(version=DataVersion.version + 1))
+        db_session.commit()
+        client.get(URL)
+        assert weekly_matrix_cache.stats()['misses'] == 3
+
+    def test_lru_eviction_and_disk(self, db_session: Session, schedule, tmp_path):
+        """Weeks past the size bound are evicted, and the disk copy survives a new cache."""
+        cache = WeeklyMatrixCache(max_weeks=2, disk_dir=str(tmp_path))
+        version = current_version(db_session)
+        for week in ('2030-W10', '2030-W11', '2030-W12'):
+            cache.matrix(db_session, week, version)
+        assert cache.stats()['evictions'] == 1
+        assert cache.stats()['size'] == 2
+
+        reopened = WeeklyMatrixCache(disk_dir=str(tmp_path))
+        assert reopened.get(db_session, '2030-W10', version) == build_weekly_matrix(db_session, '2030-W10')
+        assert reopened.stats()['disk_hits'] == 1
+        # Files written at another version are ignored
+        assert reopened.get(db_session, '2030-W11', version + 1) is None
+
+    def test_stats_in_scheduler_status(self, client, db_session: Session):
+        """Hit ratio and patch latency are reported with the scheduler status."""
+        stats = client.get('/api/scheduler/status').get_json()['weekly_matrix_cache']
+        assert {'hit_ratio', 'patches', 'patch_latency_ms', 'evictions'} <= set(stats)
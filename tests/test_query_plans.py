@@ -0,0 +1,80 @@
+"""Query-plan regression tests for the hot assignment and absence lookups.
+
+Each statement mirrors a query issued by the routes or the recurrence engine
+and must be answered with an index SEARCH, never a full-table SCAN.
+"""
+
+import pytest
+from datetime import date, time
+from sqlalchemy import select, func
+from sqlalchemy.orm import Session
+
+from api.models import Assignment, Absence, Availability
+
+DAY = date(2030, 3, 4)
+WEEK_END = date(2030, 3, 10)
+
+HOT_QUERIES = {
+    'aide conflict (create/update/check)': select(Assignment.id).where(
+        Assignment.aide_id == 1,
+        Assignment.date == DAY,
+        Assignment.start_time < time(10, 0),
+        Assignment.end_time > time(9, 0)
+    ),
+    'slot bitmaps / batch occupancy': select(
+        Assignment.aide_id, Assignment.date, Assignment.start_time, Assignment.end_time
+    ).where(
+        Assignment.aide_id.in_([1, 2, 3]),
+        Assignment.date.between(DAY, WEEK_END)
+    ),
+    'duplicate task/date': select(Assignment.id).where(
+        Assignment.task_id == 1,
+        Assignment.date == DAY
+    ),
+    'future assignments of a task': select(Assignment).where(
+        Assignment.task_id == 1,
+        Assignment.date >= DAY,
+        Assignment.date <= WEEK_END
+    ),
+    'horizon existing keys': select(Assignment.task_id, Assignment.date, Assignment.start_time).where(
+        Assignment.date >= DAY,
+        Assignment.date <= WEEK_END,
+        Assignment.task_id.in_([1, 2, 3])
+    ),
+    'weekly matrix assignments': select(Assignment).where(
+        Assignment.date.between(DAY, WEEK_END)
+    ),
+    'assignment list by status': select(func.count(Assignment.id)).where(
+        Assignment.status == 'UNASSIGNED',
+        Assignment.date >= DAY,
+        Assignment.date <= WEEK_END
+    ),
+    'aide absence on a date': select(Absence.id).where(
+        Absence.aide_id == 1,
+        Absence.start_date <= DAY,
+        Absence.end_date >= DAY
+    ),
+    'weekly matrix absences': select(Absence).where(
+        Absence.start_date <= WEEK_END,
+        Absence.end_date >= DAY
+    ),
+    'aide availability for a weekday': select(Availability).where(
+        Availability.aide_id == 1,
+        Availability.weekday == 'MO'
+    ),
+}
+
+def query_plan(session: Session, statement) -> list:
+    """Return the detail column of ``EXPLAIN QUERY PLAN`` for a statement."""
+    connection = session.connection()
+    compiled = statement.compile(dialect=connection.dialect, compile_kwargs={'literal_binds': True})
+    rows = connection.exec_driver_sql(f"EXPLAIN QUERY PLAN {compiled}").all()
+    return [row[-1] for row in rows]
+
+@pytest.mark.parametrize('name', sorted(HOT_QUERIES))
+def test_hot_query_uses_index(db_session: Session, name: str):
+    """Hot lookups must search an index instead of scanning the table."""
+    plan = query_plan(db_session, HOT_QUERIES[name])
+    scans = [step for step in plan if step.startswith('SCAN')]
+    assert not scans, f"{name} scans a table: {plan}"
+    assert any('INDEX' in step for step in plan), plan
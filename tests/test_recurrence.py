@@ -1,16 +1,28 @@
 """Tests for the recurrence engine functionality."""
 
 import pytest
-from datetime import date, datetime, timedelta
+import random
+from datetime import date, datetime, time, timedelta
+from sqlalchemy import insert
 from sqlalchemy.orm import Session
 from dateutil.rrule import rrulestr
 
-from api.models import Task, Assignment
+from api.models import Task, Assignment, TeacherAide, HorizonJob
 from api.recurrence import (
     parse_rrule,
+    expand_rrule,
+    expand_rrules,
+    normalize_rrule,
+    recurrence_cache_stats,
+    clear_recurrence_caches,
+    LRUCache,
     generate_assignments,
     extend_assignment_horizon,
+    bulk_extend_assignment_horizon,
+    run_chunked_horizon_extension,
+    materialize_window,
     update_future_assignments,
+    diff_future_assignments,
     DEFAULT_HORIZON_WEEKS,
     MAX_HORIZON_WEEKS
 )
@@ -89,6 +101,119 @@ class TestRRuleParsing:
             result = parse_rrule(rule, start_date)
             assert result is None, f"Expected None for invalid rule: {rule}"
 
+class TestRecurrenceCache:
+    """Tests for the shared rule/occurrence cache."""
+
+    def setup_method(self):
+        clear_recurrence_caches()
+
+    def test_normalize_rrule(self):
+        """Equivalent rules normalize to the same key."""
+        assert normalize_rrule("byday=MO,WE; FREQ=WEEKLY") == normalize_rrule("FREQ=WEEKLY;BYDAY=MO,WE")
+        assert normalize_rrule("RRULE:FREQ=DAILY") == "FREQ=DAILY"
+
+    def test_expand_rrule_is_cached(self):
+        """Identical rule/time/window expansions are computed once."""
+        start_date = date(2024, 1, 1)
+        start_time = datetime.strptime("09:00", "%H:%M").time()
+        first = expand_rrule("FREQ=WEEKLY;BYDAY=MO,WE,FR", start_time, start_date, start_date + timedelta(days=13))
+        second = expand_rrule("FREQ=WEEKLY;BYDAY=MO,WE,FR", start_time, start_date, start_date + timedelta(days=13))
+
+        assert first == second
+        assert len(first) == 6
+        stats = recurrence_cache_stats()['occurrences']
+        assert stats['hits'] == 1
+        assert stats['misses'] == 1
+
+    def test_expand_rrule_matches_rrulestr(self):
+        """Cached expansion matches a direct dateutil expansion."""
+        start_date = date(2024, 1, 1)
+        end_date = date(2024, 3, 31)
+        start_time = datetime.strptime("09:00", "%H:%M").time()
+        for rule_str in ["FREQ=DAILY;INTERVAL=3", "FREQ=WEEKLY;BYDAY=TU,TH", "FREQ=MONTHLY;BYMONTHDAY=15"]:
+            dt_start = datetime.combine(start_date, start_time)
+            expected = tuple(d.date() for d in rrulestr(rule_str, dtstart=dt_start).between(
+                dt_start, datetime.combine(end_date, datetime.max.time()), inc=True
+            ))
+            assert expand_rrule(rule_str, start_time, start_date, end_date) == expected
+
+    def test_invalid_rule_expands_to_nothing(self):
+        """Invalid rules produce no dates and are cached as invalid."""
+        start_time = datetime.strptime("09:00", "%H:%M").time()
+        assert expand_rrule("FREQ=INVALID", start_time, date(2024, 1, 1), date(2024, 1, 31)) == ()
+
+    def test_lru_eviction(self):
+        """The least recently used entry is evicted once the cache is full."""
+        cache = LRUCache(maxsize=2)
+        cache.put('a', 1)
+        cache.put('b', 2)
+        cache.get('a')
+        cache.put('c', 3)
+
+        assert cache.get('b', 'evicted') == 'evicted'
+        assert cache.get('a') == 1
+        assert cache.stats()['evictions'] == 1
+
+class TestVectorizedExpansion:
+    """Differential tests of the NumPy DAILY/WEEKLY expander against dateutil."""
+
+    def setup_method(self):
+        clear_recurrence_caches()
+
+    @staticmethod
+    def _reference(rule_str, start_time, start_date, end_date):
+        dt_start = datetime.combine(start_date, start_time)
+        try:
+            rule = rrulestr(rule_str, dtstart=dt_start)
+        except ValueError:
+            return ()
+        return tuple(d.date() for d in rule.between(
+            dt_start, datetime.combine(end_date, time.max), inc=True
+        ))
+
+    def test_random_rules_match_rrulestr(self):
+        """Randomly generated simple rules expand exactly like rrulestr."""
+        rng = random.Random(1234)
+        codes = ['MO', 'TU', 'WE', 'TH', 'FR', 'SA', 'SU']
+        rules = []
+        for _ in range(300):
+            parts = [f"FREQ={rng.choice(['DAILY', 'WEEKLY'])}"]
+            if rng.random() < 0.6:
+                parts.append("BYDAY=" + ",".join(rng.sample(codes, rng.randint(1, 5))))
+            if rng.random() < 0.4:
+                parts.append(f"INTERVAL={rng.randint(1, 4)}")
+            if rng.random() < 0.2:
+                parts.append(f"COUNT={rng.randint(0, 30)}")
+            elif rng.random() < 0.3:
+                until = date(2024, 1, 1) + timedelta(days=rng.randint(0, 200))
+                if rng.random() < 0.5:
+                    parts.append(f"UNTIL={until:%Y%m%d}")
+                else:
+                    parts.append(f"UNTIL={until:%Y%m%d}T{rng.choice(['080000', '093000', '235959'])}")
+            rng.shuffle(parts)
+            rules.append((";".join(parts), time(rng.choice([8, 9, 10, 13]), rng.choice([0, 30]))))
+
+        for start_date in (date(2024, 1, 1), date(2024, 2, 29), date(2024, 3, 7)):
+            end_date = start_date + timedelta(days=180)
+            expanded = expand_rrules(rules, start_date, end_date)
+            for rule_str, start_time in rules:
+                expected = self._reference(rule_str, start_time, start_date, end_date)
+                assert expanded[(rule_str, start_time)] == expected, rule_str
+
+    def test_unsupported_rules_fall_back_to_dateutil(self):
+        """Rules outside the fast path still expand correctly."""
+        start_time = time(9, 0)
+        start_date = date(2024, 1, 1)
+        end_date = date(2024, 12, 31)
+        for rule_str in [
+            "FREQ=MONTHLY;BYMONTHDAY=1,15",
+            "FREQ=WEEKLY;BYDAY=MO,FR;WKST=SU;INTERVAL=2",
+            "FREQ=DAILY;BYMONTH=2",
+            "FREQ=WEEKLY;BYDAY=",
+        ]:
+            assert expand_rrule(rule_str, start_time, start_date, end_date) == \
+                self._reference(rule_str, start_time, start_date, end_date)
+
 class TestAssignmentGeneration:
     """Tests for assignment generation functionality."""
     
@@ -206,6 +331,306 @@ class TestHorizonExtension:
             assignments = db_session.query(Assignment).filter_by(task_id=task.id).all()
             assert len(assignments) > 0
 
+    def test_bulk_extend_horizon_reports_phases(self, db_session: Session, recurring_task: Task):
+        """Test the bulk extension report and that a second run creates nothing."""
+        report = bulk_extend_assignment_horizon(db_session, horizon_weeks=2)
+
+        assert report['tasks_processed'] == 1
+        assert report['assignments_created'] > 0
+        assert set(report['phases']) == {'load_tasks', 'load_existing', 'expand', 'insert'}
+        assert report['phases']['insert']['rows'] == report['assignments_created']
+        assert all(phase['seconds'] >= 0 for phase in report['phases'].values())
+
+        created = db_session.query(Assignment).filter_by(task_id=recurring_task.id).count()
+        assert created == report['assignments_created']
+
+        rerun = bulk_extend_assignment_horizon(db_session, horizon_weeks=2, full_rescan=True)
+        assert rerun['assignments_created'] == 0
+        assert rerun['phases']['load_existing']['rows'] == created
+
+    def test_bulk_extend_horizon_matches_per_task_generation(self, db_session: Session, recurring_task: Task):
+        """Test that bulk extension produces the same dates as per-task generation."""
+        start_date = date.today()
+        end_date = start_date + timedelta(weeks=2)
+        expected = sorted(
+            a.date for a in recurring_task.generate_assignments(start_date, end_date)
+        )
+
+        bulk_extend_assignment_horizon(db_session, horizon_weeks=2)
+        actual = sorted(
+            a.date for a in db_session.query(Assignment).filter_by(task_id=recurring_task.id)
+        )
+        assert actual == expected
+
+    def test_bulk_extend_horizon_advances_watermark(self, db_session: Session, recurring_task: Task):
+        """Test that extension records the watermark and only appends past it."""
+        bulk_extend_assignment_horizon(db_session, horizon_weeks=2)
+        assert recurring_task.generated_through == date.today() + timedelta(weeks=2)
+
+        # Occurrences inside the generated window are not recreated incrementally
+        first = db_session.query(Assignment).filter_by(task_id=recurring_task.id).first()
+        db_session.delete(first)
+        db_session.flush()
+
+        report = bulk_extend_assignment_horizon(db_session, horizon_weeks=4)
+        assert report['tasks_processed'] == 1
+        assert report['assignments_created'] > 0
+        assert recurring_task.generated_through == date.today() + timedelta(weeks=4)
+        new_dates = db_session.query(Assignment.date).filter(
+            Assignment.task_id == recurring_task.id,
+            Assignment.date <= date.today() + timedelta(weeks=2)
+        ).all()
+        assert (first.date,) not in new_dates
+
+        # An up-to-date task is skipped entirely
+        report = bulk_extend_assignment_horizon(db_session, horizon_weeks=4)
+        assert report['tasks_processed'] == 0
+        assert report['assignments_created'] == 0
+
+        # A full rescan ignores the watermark and fills the gap
+        report = bulk_extend_assignment_horizon(db_session, horizon_weeks=4, full_rescan=True)
+        assert report['assignments_created'] == 1
+
+    def test_parallel_expansion_matches_serial(self):
+        """Sharded process-pool expansion returns the same occurrences as serial expansion."""
+        from api.recurrence import _expand_items, _shard_by_id
+        start_date = date(2024, 1, 1)
+        items = [
+            (task_id, rule, time(9, 0), None, start_date, start_date)
+            for task_id, rule in enumerate([
+                "FREQ=WEEKLY;BYDAY=MO,WE,FR",
+                "FREQ=DAILY",
+                "FREQ=WEEKLY;BYDAY=TU;INTERVAL=2",
+                "FREQ=MONTHLY;BYMONTHDAY=1",
+                "FREQ=DAILY;COUNT=3",
+            ], start=1)
+        ]
+        end_date = start_date + timedelta(weeks=8)
+
+        shards = _shard_by_id(list(reversed(items)), 2)
+        assert [[item[0] for item in shard] for shard in shards] == [[1, 2, 3], [4, 5]]
+
+        serial, serial_shards = _expand_items(items, end_date, workers=1)
+        parallel, parallel_shards = _expand_items(items, end_date, workers=2)
+        assert serial_shards == 1
+        assert parallel_shards == 2
+        assert sorted(parallel) == sorted(serial)
+
+    def test_watermark_keeps_rule_anchor(self, db_session: Session):
+        """Days after the watermark follow the rule from its anchor, not from the watermark."""
+        today = date.today()
+        tasks = [
+            Task(title=f"Anchored {rule}", category="CLASS_SUPPORT", recurrence_rule=rule,
+                 start_time=time(9, 0), end_time=time(10, 0), status=Status.UNASSIGNED,
+                 created_at=datetime.combine(today, time(8, 0)), generated_through=today)
+            for rule in ("FREQ=DAILY;INTERVAL=2", "FREQ=DAILY;COUNT=3")
+        ]
+        db_session.add_all(tasks)
+        db_session.commit()
+        interval, count = (task.id for task in tasks)
+
+        bulk_extend_assignment_horizon(db_session, horizon_weeks=1)
+
+        def offsets(task_id):
+            return sorted((a.date - today).days for a in
+                          db_session.query(Assignment).filter(Assignment.task_id == task_id))
+        assert offsets(interval) == [2, 4, 6]
+        assert offsets(count) == [1, 2]
+
+    def test_bulk_extend_horizon_with_workers(self, db_session: Session, recurring_task: Task):
+        """The workers option produces the same rows and reports the worker count."""
+        report = bulk_extend_assignment_horizon(db_session, horizon_weeks=2, workers=2)
+        assert report['assignments_created'] > 0
+        assert report['workers'] >= 1
+        with pytest.raises(ValueError):
+            bulk_extend_assignment_horizon(db_session, horizon_weeks=2, workers=0)
+
+class TestChunkedHorizonJob:
+    """Tests for the chunked, resumable horizon extension job."""
+
+    @pytest.fixture
+    def recurring_tasks(self, db_session: Session):
+        tasks = [
+            Task(
+                title=f"Chunk Task {i}",
+                category="CLASS_SUPPORT",
+                start_time=datetime.strptime("09:00", "%H:%M").time(),
+                end_time=datetime.strptime("10:00", "%H:%M").time(),
+                recurrence_rule="FREQ=WEEKLY;BYDAY=MO,WE,FR",
+                status=Status.UNASSIGNED
+            )
+            for i in range(5)
+        ]
+        db_session.add_all(tasks)
+        db_session.commit()
+        return tasks
+
+    def test_job_commits_in_chunks(self, db_session: Session, recurring_tasks):
+        """The job processes tasks in bounded chunks and records its progress."""
+        job = run_chunked_horizon_extension(db_session, horizon_weeks=2, chunk_tasks=2, pause_seconds=0)
+
+        assert job.status == HorizonJob.COMPLETE
+        assert job.chunks == 3
+        assert job.tasks_processed == 5
+        assert job.cursor_task_id == recurring_tasks[-1].id
+        assert job.assignments_created == db_session.query(Assignment).count()
+        assert all(t.generated_through == date.today() + timedelta(weeks=2) for t in recurring_tasks)
+
+    def test_row_budget_limits_chunk(self, db_session: Session, recurring_tasks):
+        """A row budget smaller than one task's occurrences yields one task per chunk."""
+        job = run_chunked_horizon_extension(
+            db_session, horizon_weeks=2, chunk_tasks=10, chunk_rows=1, pause_seconds=0
+        )
+        assert job.chunks == 5
+
+    def test_tasks_cut_by_row_budget_are_expanded_once(self, db_session: Session, recurring_tasks, monkeypatch):
+        """Tasks left out of a chunk reuse their expansion in the next chunk."""
+        import api.recurrence as recurrence
+        expanded = []
+        original = recurrence.expand_occurrence_shard
+
+        def counting_shard(items, end_date):
+            expanded.extend(item[0] for item in items)
+            return original(items, end_date)
+
+        monkeypatch.setattr(recurrence, 'expand_occurrence_shard', counting_shard)
+        job = run_chunked_horizon_extension(
+            db_session, horizon_weeks=2, chunk_tasks=10, chunk_rows=1, pause_seconds=0
+        )
+        assert job.chunks == 5
+        assert sorted(expanded) == [task.id for task in recurring_tasks]
+        assert job.assignments_created == db_session.query(Assignment).count()
+
+    def test_job_reuses_one_process_pool(self, db_session: Session, recurring_tasks, monkeypatch):
+        """Every chunk of a parallel job is expanded by the same pool."""
+        import api.recurrence as recurrence
+        pools = []
+        original = recurrence.ProcessPoolExecutor
+
+        def counting_pool(*args, **kwargs):
+            pools.append(original(*args, **kwargs))
+            return pools[-1]
+
+        monkeypatch.setattr(recurrence, 'ProcessPoolExecutor', counting_pool)
+        monkeypatch.setattr(recurrence, 'MAX_HORIZON_WORKERS', 2)
+        job = run_chunked_horizon_extension(
+            db_session, horizon_weeks=2, chunk_tasks=2, pause_seconds=0, workers=2
+        )
+        assert job.chunks == 3
+        assert len(pools) == 1
+        assert job.assignments_created == db_session.query(Assignment).count()
+
+    def test_interrupted_job_resumes_from_cursor(self, db_session: Session, recurring_tasks):
+        """An interrupted job is resumed from its cursor without duplicating rows."""
+        calls = {'n': 0}
+
+        def stop_after_first_chunk():
+            calls['n'] += 1
+            return calls['n'] > 1
+
+        job = run_chunked_horizon_extension(
+            db_session, horizon_weeks=2, chunk_tasks=2, pause_seconds=0,
+            should_stop=stop_after_first_chunk
+        )
+        assert job.status == HorizonJob.RUNNING
+        assert job.cursor_task_id == recurring_tasks[1].id
+        first_rows = job.assignments_created
+
+        resumed = run_chunked_horizon_extension(db_session, horizon_weeks=2, chunk_tasks=2, pause_seconds=0)
+        assert resumed.id == job.id
+        assert resumed.status == HorizonJob.COMPLETE
+        assert resumed.tasks_processed == 5
+        assert resumed.assignments_created == db_session.query(Assignment).count()
+        assert resumed.assignments_created == first_rows * 5 // 2
+
+    def test_job_left_running_on_another_day_is_closed_out(self, db_session: Session, recurring_tasks):
+        """A job interrupted for a different horizon end is superseded instead of left RUNNING."""
+        stale = HorizonJob(horizon_end=date.today() + timedelta(weeks=2, days=-1),
+                           cursor_task_id=recurring_tasks[1].id)
+        db_session.add(stale)
+        db_session.commit()
+
+        job = run_chunked_horizon_extension(db_session, horizon_weeks=2, chunk_tasks=2, pause_seconds=0)
+        assert job.id != stale.id
+        assert job.status == HorizonJob.COMPLETE
+        assert job.tasks_processed == 5
+        assert stale.status == HorizonJob.SUPERSEDED
+        assert stale.finished_at is not None
+        assert db_session.query(HorizonJob).filter_by(status=HorizonJob.RUNNING).count() == 0
+
+class TestOnDemandMaterialization:
+    """Tests for materializing a requested window past the horizon."""
+
+    @pytest.fixture(autouse=True)
+    def fresh_caches(self):
+        clear_recurrence_caches()
+        yield
+        clear_recurrence_caches()
+
+    def _far_week(self):
+        monday = date.today() - timedelta(days=date.today().weekday())
+        start = monday + timedelta(weeks=8)
+        return start, start + timedelta(days=6)
+
+    def test_far_week_is_generated_once(self, db_session: Session, recurring_task: Task):
+        """A week past the horizon is filled without generating the gap before it."""
+        bulk_extend_assignment_horizon(db_session, horizon_weeks=2)
+        watermark = recurring_task.generated_through
+        start, end = self._far_week()
+
+        assert materialize_window(db_session, start, end) == 3
+        stored = db_session.query(Assignment).filter(Assignment.date.between(start, end)).all()
+        assert sorted(a.date.weekday() for a in stored) == [0, 2, 4]
+        assert db_session.query(Assignment).filter(
+            Assignment.date > watermark, Assignment.date < start
+        ).count() == 0
+        assert recurring_task.generated_through == watermark
+
+        assert materialize_window(db_session, start, end) == 0
+
+        clear_recurrence_caches()
+        assert materialize_window(db_session, start, end) == 0
+        assert db_session.query(Assignment).filter(Assignment.date.between(start, end)).count() == 3
+
+    def test_adjacent_window_advances_watermark(self, db_session: Session, recurring_task: Task):
+        """A window continuing from the watermark moves the watermark forward."""
+        bulk_extend_assignment_horizon(db_session, horizon_weeks=1)
+        start = recurring_task.generated_through + timedelta(days=1)
+        end = start + timedelta(days=6)
+
+        materialize_window(db_session, start, end)
+        assert recurring_task.generated_through == end
+
+        report = bulk_extend_assignment_horizon(db_session, horizon_weeks=2)
+        assert report['assignments_created'] == 0
+
+    def test_rows_written_while_waiting_for_the_lock_are_skipped(self, db_session: Session,
+                                                                 recurring_task: Task, monkeypatch):
+        """Keys are re-read once the write lock is held, so a concurrent writer's rows are not duplicated."""
+        import api.recurrence as recurrence
+        bulk_extend_assignment_horizon(db_session, horizon_weeks=2)
+        start, end = self._far_week()
+        original = recurrence.begin_write
+
+        def other_process_first(session):
+            # Another process materialized the same window before this one got the lock
+            session.execute(insert(Assignment.__table__), [
+                {'task_id': recurring_task.id, 'date': start + timedelta(days=offset),
+                 'start_time': recurring_task.start_time, 'end_time': recurring_task.end_time,
+                 'status': Status.UNASSIGNED.value}
+                for offset in (0, 2, 4)
+            ])
+            original(session)
+
+        monkeypatch.setattr(recurrence, 'begin_write', other_process_first)
+        assert materialize_window(db_session, start, end) == 0
+        assert db_session.query(Assignment).filter(Assignment.date.between(start, end)).count() == 3
+
+    def test_past_window_is_ignored(self, db_session: Session, recurring_task: Task):
+        """Windows entirely in the past are not backfilled."""
+        end = date.today() - timedelta(days=1)
+        assert materialize_window(db_session, end - timedelta(days=6), end) == 0
+
 class TestFutureAssignmentUpdates:
     """Tests for updating future assignments."""
     
@@ -273,6 +698,88 @@ class TestFutureAssignmentUpdates:
         assert len(future_assignments) > 0
         assert all(a.date.weekday() in [1, 3] for a in future_assignments)  # Tuesday=1, Thursday=3
 
+    def test_diff_preserves_aide_and_touches_only_changed_rows(self, db_session: Session, recurring_task: Task):
+        """Rule edits keep surviving rows and their aides, and only add/remove changed dates."""
+        aide = TeacherAide(name="Diff Aide", colour_hex="#123456")
+        db_session.add(aide)
+        db_session.flush()
+        generate_assignments(recurring_task, date.today(), date.today() + timedelta(weeks=2), db_session)
+        mondays = db_session.query(Assignment).filter(Assignment.task_id == recurring_task.id).all()
+        mondays = [a for a in mondays if a.date.weekday() == 0]
+        for a in mondays:
+            a.aide_id = aide.id
+            a.status = Status.ASSIGNED
+        db_session.flush()
+        monday_ids = {a.id for a in mondays}
+
+        # Drop Wednesday and Friday, add Tuesday
+        recurring_task.recurrence_rule = "FREQ=WEEKLY;BYDAY=MO,TU"
+        counts = diff_future_assignments(recurring_task, db_session, horizon_weeks=2)
+
+        assert counts['updated'] == 0
+        assert counts['deleted'] > 0
+        assert counts['inserted'] > 0
+        remaining = db_session.query(Assignment).filter_by(task_id=recurring_task.id).all()
+        assert all(a.date.weekday() in (0, 1) for a in remaining)
+        kept = [a for a in remaining if a.id in monday_ids]
+        assert len(kept) == len(mondays)
+        assert all(a.aide_id == aide.id for a in kept)
+
+    def test_diff_updates_times_in_place_and_releases_conflicting_aide(self, db_session: Session, recurring_task: Task):
+        """Time edits update rows in place and release aides that no longer fit."""
+        aide = TeacherAide(name="Busy Aide", colour_hex="#654321")
+        other_task = Task(
+            title="Other Task",
+            category="CLASS_SUPPORT",
+            start_time=datetime.strptime("10:00", "%H:%M").time(),
+            end_time=datetime.strptime("11:00", "%H:%M").time(),
+            status=Status.UNASSIGNED
+        )
+        db_session.add_all([aide, other_task])
+        db_session.flush()
+        generate_assignments(recurring_task, date.today(), date.today() + timedelta(weeks=1), db_session)
+        rows = db_session.query(Assignment).filter_by(task_id=recurring_task.id).order_by(Assignment.date).all()
+        for a in rows:
+            a.aide_id = aide.id
+            a.status = Status.ASSIGNED
+        # The aide is busy 10:00-11:00 on the first occurrence date only
+        db_session.add(Assignment(
+            task_id=other_task.id, aide_id=aide.id, date=rows[0].date,
+            start_time=other_task.start_time, end_time=other_task.end_time, status=Status.ASSIGNED
+        ))
+        db_session.flush()
+        ids_before = {a.id for a in rows}
+
+        recurring_task.start_time = datetime.strptime("10:00", "%H:%M").time()
+        recurring_task.end_time = datetime.strptime("11:00", "%H:%M").time()
+        counts = diff_future_assignments(recurring_task, db_session, horizon_weeks=1)
+
+        assert counts['updated'] == len(rows)
+        assert counts['deleted'] == 0
+        assert counts['released'] == 1
+        after = db_session.query(Assignment).filter_by(task_id=recurring_task.id).order_by(Assignment.date).all()
+        assert {a.id for a in after} == ids_before
+        assert after[0].aide_id is None
+        assert all(a.aide_id == aide.id for a in after[1:])
+        assert all(a.start_time == recurring_task.start_time for a in after)
+
+    def test_diff_covers_rows_past_default_horizon(self, client, db_session: Session, recurring_task: Task):
+        """A time edit reconciles a 10-week horizon, so re-extending adds no duplicates."""
+        bulk_extend_assignment_horizon(db_session, horizon_weeks=MAX_HORIZON_WEEKS)
+        db_session.commit()
+        rows_before = db_session.query(Assignment).filter_by(task_id=recurring_task.id).count()
+
+        response = client.put(f"/api/tasks/{recurring_task.id}", json={"start_time": "09:30"})
+        assert response.status_code == 200
+        bulk_extend_assignment_horizon(db_session, horizon_weeks=MAX_HORIZON_WEEKS)
+        db_session.commit()
+
+        db_session.expire_all()
+        rows = db_session.query(Assignment).filter_by(task_id=recurring_task.id).all()
+        assert len(rows) == rows_before
+        assert len({a.date for a in rows}) == len(rows)
+        assert all(a.start_time == time(9, 30) for a in rows)
+
 class TestTaskUpdateIntegration:
     """Tests for task update integration with recurrence."""
     
@@ -2,8 +2,10 @@
 
 import pytest
 from datetime import date, datetime, timedelta
-from api.models import Task, Assignment
+import json
+from api.models import Task, Assignment, TeacherAide, Absence, Availability
 from api.constants import Status
+from sqlalchemy import insert
 from sqlalchemy.orm import Session
 
 @pytest.fixture
@@ -116,4 +118,765 @@ class TestHorizonExtensionEndpoint:
         assert response.status_code == 200
         
         data = response.get_json()
-        assert data['assignments_created'] == 0 
\ No newline at end of file
+        assert data['assignments_created'] == 0
+
+class TestSchedulerStatusEndpoint:
+    """Tests for the scheduler status endpoint."""
+
+    def test_status_reports_horizon_job_progress(self, client, db_session: Session, recurring_task: Task):
+        """Test that the latest chunked job's progress is exposed."""
+        from api.recurrence import run_chunked_horizon_extension
+        run_chunked_horizon_extension(db_session, horizon_weeks=2, pause_seconds=0)
+
+        response = client.get('/api/scheduler/status')
+        assert response.status_code == 200
+
+        data = response.get_json()
+        assert 'horizon_job' in data
+        assert data['horizon_job']['status'] == 'COMPLETE'
+        assert data['horizon_job']['tasks_processed'] == 1
+
+class TestOnDemandWeekEndpoints:
+    """Tests for read paths generating weeks past the horizon."""
+
+    @pytest.fixture(autouse=True)
+    def fresh_caches(self):
+        from api.recurrence import clear_recurrence_caches
+        clear_recurrence_caches()
+        yield
+        clear_recurrence_caches()
+
+    def test_weekly_matrix_materializes_far_week(self, client, db_session: Session, recurring_task: Task):
+        """Test that a week beyond the horizon is generated when viewed."""
+        year, week_num, _ = (date.today() + timedelta(weeks=8)).isocalendar()
+        start = date.fromisocalendar(year, week_num, 1)
+
+        response = client.get(f'/api/assignments/weekly-matrix?week={year}-W{week_num:02d}')
+        assert response.status_code == 200
+        stored = db_session.query(Assignment).filter(
+            Assignment.date.between(start, start + timedelta(days=6))
+        ).count()
+        assert stored == 3
+
+    def test_week_list_materializes_far_week(self, client, db_session: Session, recurring_task: Task):
+        """Test that the week list view returns the generated week."""
+        year, week_num, _ = (date.today() + timedelta(weeks=8)).isocalendar()
+        response = client.get(f'/api/assignments?week={year}-W{week_num:02d}')
+        assert response.status_code == 200
+        assert response.get_json()['total'] == 3
+
+class TestPreviewOccurrencesEndpoint:
+    """Tests for the recurrence preview endpoint."""
+
+    def _preview(self, client, **overrides):
+        payload = {
+            'recurrence_rule': 'FREQ=WEEKLY;BYDAY=MO,WE',
+            'start_time': '09:00',
+            'end_time': '10:00',
+            'start_date': '2030-01-07',
+            **overrides
+        }
+        return client.post('/api/tasks/preview-occurrences', json=payload)
+
+    def test_preview_streams_ndjson_without_writing(self, client, db_session: Session):
+        """Test that occurrences are streamed and nothing is stored."""
+        response = self._preview(client, count=4)
+        assert response.status_code == 200
+        assert response.mimetype == 'application/x-ndjson'
+
+        lines = [json.loads(line) for line in response.get_data(as_text=True).splitlines()]
+        assert [line['date'] for line in lines] == ['2030-01-07', '2030-01-09', '2030-01-14', '2030-01-16']
+        assert db_session.query(Task).count() == 0
+        assert db_session.query(Assignment).count() == 0
+
+    def test_preview_stops_at_until_and_expiry(self, client, db_session: Session):
+        """Test that the expansion stops at the earlier of until and expires_on."""
+        response = self._preview(client, until='2031-01-01', expires_on='2030-01-13')
+        dates = [json.loads(line)['date'] for line in response.get_data(as_text=True).splitlines()]
+        assert dates == ['2030-01-07', '2030-01-09']
+
+    def test_preview_counts_free_aides(self, client, db_session: Session):
+        """Test that busy and absent aides are not counted as free."""
+        aides = [TeacherAide(name=f"Preview Aide {i}", colour_hex="#123456") for i in range(3)]
+        db_session.add_all(aides)
+        db_session.flush()
+        other = Task(
+            title="Other", category="CLASS_SUPPORT",
+            start_time=datetime.strptime("09:30", "%H:%M").time(),
+            end_time=datetime.strptime("10:30", "%H:%M").time(),
+            status=Status.UNASSIGNED
+        )
+        db_session.add(other)
+        db_session.flush()
+        db_session.add(Assignment(
+            task_id=other.id, aide_id=aides[0].id, date=date(2030, 1, 7),
+            start_time=other.start_time, end_time=other.end_time, status=Status.ASSIGNED.value
+        ))
+        db_session.add(Absence(aide_id=aides[1].id, start_date=date(2030, 1, 7), end_date=date(2030, 1, 9)))
+        db_session.flush()
+
+        response = self._preview(client, count=3)
+        free = [json.loads(line)['free_aides'] for line in response.get_data(as_text=True).splitlines()]
+        assert free == [1, 2, 3]
+
+    def test_preview_rejects_invalid_input(self, client):
+        """Test validation of the rule, times and count."""
+        assert self._preview(client, recurrence_rule='FREQ=NEVER').status_code == 422
+        assert self._preview(client, start_time='10:00', end_time='09:00').status_code == 422
+        assert self._preview(client, count=0).status_code == 422
+
+class TestAssignmentBatchEndpoint:
+    """Tests for preloaded, set-based batch validation."""
+
+    MONDAY = date(2030, 3, 4)
+
+    @pytest.fixture
+    def aide(self, db_session: Session) -> TeacherAide:
+        aide = TeacherAide(name="Batch Aide", colour_hex="#123456")
+        db_session.add(aide)
+        db_session.commit()
+        return aide
+
+    def _item(self, task, aide, day, start='09:00', end='10:00'):
+        return {
+            'task_id': task.id, 'aide_id': aide.id if aide else None,
+            'date': day.isoformat(), 'start_time': start, 'end_time': end
+        }
+
+    def test_items_are_checked_against_each_other(self, client, db_session: Session,
+                                                  recurring_task: Task, aide: TeacherAide):
+        """Test that duplicates and overlaps inside one batch are rejected."""
+        other = Task(title="Other", category="CLASS_SUPPORT", start_time=recurring_task.start_time,
+                     end_time=recurring_task.end_time, status=Status.UNASSIGNED)
+        db_session.add(other)
+        db_session.commit()
+        tuesday = self.MONDAY + timedelta(days=1)
+
+        response = client.post('/api/assignments/batch', json={'assignments': [
+            self._item(recurring_task, aide, self.MONDAY),
+            self._item(recurring_task, None, self.MONDAY),
+            self._item(other, aide, self.MONDAY, '09:30', '10:30'),
+            self._item(other, aide, self.MONDAY, '10:00', '11:00'),
+            self._item(recurring_task, aide, tuesday),
+        ]})
+        assert response.status_code == 201
+        data = response.get_json()
+        assert len(data['created']) == 3
+        assert data['errors'] == [
+            {'index': 1, 'error': 'Assignment already exists for this task and date'},
+            {'index': 2, 'error': 'Teacher aide has a scheduling conflict'},
+        ]
+
+        # The conflict index sees the bulk-inserted rows
+        from api.conflict_index import find_conflict
+        assert find_conflict(db_session, aide.id, tuesday,
+                             datetime.strptime("09:30", "%H:%M").time(),
+                             datetime.strptime("10:30", "%H:%M").time()) is not None
+
+    def test_absence_is_rejected(self, client, db_session: Session, recurring_task: Task, aide: TeacherAide):
+        """Test that items on an aide's absence are rejected."""
+        db_session.add(Absence(aide_id=aide.id, start_date=self.MONDAY, end_date=self.MONDAY))
+        db_session.commit()
+        response = client.post('/api/assignments/batch', json={
+            'assignments': [self._item(recurring_task, aide, self.MONDAY)]
+        })
+        assert response.status_code == 422
+        assert response.get_json()['errors'][0]['error'] == 'Aide is absent on the selected date'
+
+    def test_ids_are_coerced_or_rejected(self, client, db_session: Session,
+                                         recurring_task: Task, aide: TeacherAide):
+        """Test that numeric string ids are accepted and other id types are per-item errors."""
+        numeric = self._item(recurring_task, aide, self.MONDAY)
+        numeric['task_id'], numeric['aide_id'] = str(recurring_task.id), str(aide.id)
+        listed = self._item(recurring_task, aide, self.MONDAY + timedelta(days=1))
+        listed['task_id'] = [recurring_task.id]
+        mapped = self._item(recurring_task, aide, self.MONDAY + timedelta(days=2))
+        mapped['aide_id'] = {'id': aide.id}
+
+        response = client.post('/api/assignments/batch', json={'assignments': [numeric, listed, mapped]})
+        assert response.status_code == 201
+        data = response.get_json()
+        assert len(data['created']) == 1
+        assert data['errors'] == [
+            {'index': 1, 'error': 'task_id must be an integer'},
+            {'index': 2, 'error': 'aide_id must be an integer'},
+        ]
+
+    def test_query_count_is_constant(self, client, db_session: Session, recurring_task: Task,
+                                     aide: TeacherAide, engine):
+        """Test that a large batch uses a fixed number of statements."""
+        from sqlalchemy import event
+        statements = []
+        record = lambda *args: statements.append(args[2])
+        event.listen(engine, 'before_cursor_execute', record)
+        try:
+            days = [self.MONDAY + timedelta(days=i) for i in range(2000)]
+            response = client.post('/api/assignments/batch', json={
+                'task_id': recurring_task.id, 'aide_id': aide.id,
+                'dates': [d.isoformat() for d in days],
+                'start_time': '09:00', 'end_time': '10:00'
+            })
+        finally:
+            event.remove(engine, 'before_cursor_execute', record)
+        assert response.status_code == 201
+        assert len(response.get_json()['assignments']) == 2000
+        assert len(statements) < 15
+
+class TestVirtualOccurrences:
+    """Tests for computing unassigned occurrences on read."""
+
+    @pytest.fixture(autouse=True)
+    def virtual_mode(self):
+        from api.occurrences import set_virtual_occurrences
+        set_virtual_occurrences(True)
+        yield
+        set_virtual_occurrences(False)
+
+    def test_virtual_assignments_skip_stored_rows(self, db_session: Session, recurring_task: Task):
+        """Test that occurrences with a stored row are not duplicated."""
+        from api.occurrences import virtual_assignments
+        start = date.today()
+        end = start + timedelta(weeks=2)
+        computed = virtual_assignments(db_session, start, end)
+        assert computed
+        assert all(a.id is None and a.status == Status.UNASSIGNED.value for a, _ in computed)
+
+        stored_date = computed[0][0].date
+        db_session.add(Assignment(
+            task_id=recurring_task.id, date=stored_date,
+            start_time=recurring_task.start_time, end_time=recurring_task.end_time,
+            status=Status.UNASSIGNED.value
+        ))
+        db_session.flush()
+
+        remaining = virtual_assignments(db_session, start, end)
+        assert len(remaining) == len(computed) - 1
+        assert stored_date not in {a.date for a, _ in remaining}
+
+    def test_materialize_occurrence(self, db_session: Session, recurring_task: Task):
+        """Test that only dates produced by the rule can be materialized."""
+        from api.occurrences import materialize_occurrence
+        monday = date.today() + timedelta(days=7 - date.today().weekday())
+        assignment = materialize_occurrence(db_session, recurring_task, monday)
+        assert assignment.id is not None
+        assert materialize_occurrence(db_session, recurring_task, monday).id == assignment.id
+
+        with pytest.raises(ValueError):
+            materialize_occurrence(db_session, recurring_task, monday + timedelta(days=1))
+
+    def test_list_includes_virtual_rows(self, client, db_session: Session, recurring_task: Task):
+        """Test that the assignment list merges computed occurrences."""
+        start = date.today()
+        end = start + timedelta(weeks=1)
+        response = client.get(
+            f'/api/assignments?start_date={start.isoformat()}&end_date={end.isoformat()}&per_page=100'
+        )
+        assert response.status_code == 200
+        data = response.get_json()
+        assert db_session.query(Assignment).count() == 0
+        assert data['items']
+        assert data['total'] == len(data['items'])
+        assert all(a['virtual'] for a in data['items'])
+
+    def test_put_occurrence_materializes(self, client, db_session: Session, recurring_task: Task):
+        """Test that updating a virtual occurrence stores it."""
+        monday = date.today() + timedelta(days=7 - date.today().weekday())
+        response = client.put(
+            f'/api/assignments/occurrences/{recurring_task.id}/{monday.isoformat()}',
+            json={'notes': 'Covered'}
+        )
+        assert response.status_code == 200
+        assert db_session.query(Assignment).filter_by(task_id=recurring_task.id, date=monday).count() == 1
+
+        response = client.put(
+            f'/api/assignments/occurrences/{recurring_task.id}/{(monday + timedelta(days=1)).isoformat()}',
+            json={}
+        )
+        assert response.status_code == 404
+
+    def test_moved_and_deleted_occurrences_stay_hidden(self, client, db_session: Session, recurring_task: Task):
+        """Test that an occurrence moved or deleted through the API is not expanded again."""
+        from api.occurrences import virtual_assignments
+        monday = date.today() + timedelta(days=7 - date.today().weekday())
+        window = (monday, monday + timedelta(days=6))
+        moved = client.put(
+            f'/api/assignments/occurrences/{recurring_task.id}/{monday.isoformat()}', json={}
+        ).get_json()
+        wednesday = client.put(
+            f'/api/assignments/occurrences/{recurring_task.id}/{(monday + timedelta(days=2)).isoformat()}', json={}
+        ).get_json()
+
+        tuesday = monday + timedelta(days=1)
+        assert client.put(f"/api/assignments/{moved['id']}", json={'date': tuesday.isoformat()}).status_code == 200
+        assert client.delete(f"/api/assignments/{wednesday['id']}").status_code == 204
+
+        db_session.expire_all()
+        virtual_dates = [a.date for a, _ in virtual_assignments(db_session, *window)]
+        assert virtual_dates == [monday + timedelta(days=4)]
+
+    def test_diff_uses_virtual_anchor_for_interval_rules(self, db_session: Session):
+        """Test that a task edit keeps stored rows of an INTERVAL=2 rule anchored at creation."""
+        from api.occurrences import virtual_assignments
+        from api.recurrence import diff_future_assignments
+        task = Task(
+            title="Fortnightly Task", category="CLASS_SUPPORT",
+            start_time=datetime.strptime("09:00", "%H:%M").time(),
+            end_time=datetime.strptime("10:00", "%H:%M").time(),
+            recurrence_rule="FREQ=WEEKLY;INTERVAL=2;BYDAY=MO", status=Status.UNASSIGNED,
+            created_at=datetime.now() - timedelta(weeks=1)
+        )
+        db_session.add(task)
+        db_session.flush()
+        occurrence, _ = virtual_assignments(db_session, date.today(), date.today() + timedelta(weeks=4))[0]
+        db_session.add(Assignment(
+            task_id=task.id, date=occurrence.date, start_time=task.start_time,
+            end_time=task.end_time, status=Status.UNASSIGNED.value
+        ))
+        db_session.flush()
+
+        task.start_time = datetime.strptime("09:30", "%H:%M").time()
+        counts = diff_future_assignments(task, db_session, insert_new=False)
+        assert counts['deleted'] == 0
+        assert counts['updated'] == 1
+
+class TestConflictReportEndpoint:
+    """Tests for the term-wide conflict sweep report."""
+
+    MONDAY = date(2030, 3, 4)
+
+    def test_report_groups_violations_by_aide_and_day(self, client, db_session: Session, recurring_task: Task):
+        """Test that each kind of violation is reported once per aide and day."""
+        aides = [TeacherAide(name=f"Report Aide {i}", colour_hex="#123456") for i in range(2)]
+        db_session.add_all(aides)
+        db_session.flush()
+        tuesday = self.MONDAY + timedelta(days=1)
+        db_session.add(Absence(aide_id=aides[1].id, start_date=tuesday, end_date=tuesday))
+        db_session.add(Availability(aide_id=aides[1].id, weekday='MO',
+                                    start_time=datetime.strptime("08:00", "%H:%M").time(),
+                                    end_time=datetime.strptime("12:00", "%H:%M").time()))
+
+        def add(aide, day, start, end):
+            assignment = Assignment(
+                task_id=recurring_task.id, aide_id=aide.id, date=day,
+                start_time=datetime.strptime(start, "%H:%M").time(),
+                end_time=datetime.strptime(end, "%H:%M").time(), status='ASSIGNED'
+            )
+            db_session.add(assignment)
+            db_session.flush()
+            return assignment
+
+        first = add(aides[0], self.MONDAY, "09:00", "10:00")
+        # assignment_slots rejects double bookings through the ORM; insert one as legacy data
+        second = db_session.scalars(insert(Assignment).returning(Assignment), [{
+            'task_id': recurring_task.id, 'aide_id': aides[0].id, 'date': self.MONDAY,
+            'start_time': datetime.strptime("09:30", "%H:%M").time(),
+            'end_time': datetime.strptime("11:00", "%H:%M").time(), 'status': 'ASSIGNED'
+        }]).one()
+        add(aides[0], self.MONDAY, "11:00", "12:00")
+        late = add(aides[1], self.MONDAY, "13:00", "14:00")
+        absent = add(aides[1], tuesday, "09:00", "10:00")
+        db_session.commit()
+        # The streamed response closes the request session when it finishes
+        busy_id, part_time_id = aides[0].id, aides[1].id
+        first_id, second_id, late_id, absent_id = first.id, second.id, late.id, absent.id
+        absence_id = db_session.query(Absence.id).scalar()
+
+        response = client.get(
+            f'/api/reports/conflicts?start_date={self.MONDAY.isoformat()}&end_date={tuesday.isoformat()}'
+        )
+        assert response.status_code == 200
+        assert response.mimetype == 'application/x-ndjson'
+        groups = [json.loads(line) for line in response.get_data(as_text=True).splitlines()]
+        assert groups == [
+            {'aide_id': busy_id, 'date': self.MONDAY.isoformat(), 'violations': [
+                {'type': 'DOUBLE_BOOKING', 'assignment_ids': [first_id, second_id]}
+            ]},
+            {'aide_id': part_time_id, 'date': self.MONDAY.isoformat(), 'violations': [
+                {'type': 'OUTSIDE_AVAILABILITY', 'assignment_id': late_id}
+            ]},
+            {'aide_id': part_time_id, 'date': tuesday.isoformat(), 'violations': [
+                {'type': 'ON_ABSENCE', 'assignment_id': absent_id, 'absence_id': absence_id}
+            ]},
+        ]
+
+    def test_report_requires_valid_range(self, client):
+        """Test validation of the date range."""
+        assert client.get('/api/reports/conflicts').status_code == 422
+        assert client.get('/api/reports/conflicts?start_date=2030-01-02&end_date=2030-01-01').status_code == 422
+        assert client.get('/api/reports/conflicts?start_date=bad&end_date=2030-01-01').status_code == 422
+
+class TestFreeAidesEndpoint:
+    """Tests for the range-wide free aide search."""
+
+    MONDAY = date(2030, 3, 4)
+
+    def test_free_pairs_ranked_by_weekly_load(self, client, db_session: Session, recurring_task: Task):
+        """Test that busy, absent and unavailable aides are excluded and the rest ranked by load."""
+        aides = [TeacherAide(name=f"Free Aide {i}", colour_hex="#123456") for i in range(3)]
+        db_session.add_all(aides)
+        db_session.flush()
+        tuesday = self.MONDAY + timedelta(days=1)
+        # Aide 0 works an hour on Monday morning and is booked in the slot on Tuesday
+        for day, start, end in [(self.MONDAY, "08:00", "09:00"), (tuesday, "10:00", "11:00")]:
+            db_session.add(Assignment(
+                task_id=recurring_task.id, aide_id=aides[0].id, date=day,
+                start_time=datetime.strptime(start, "%H:%M").time(),
+                end_time=datetime.strptime(end, "%H:%M").time(), status='ASSIGNED'
+            ))
+        # Aide 1 is absent on Monday; aide 2 only works Tuesday mornings
+        db_session.add(Absence(aide_id=aides[1].id, start_date=self.MONDAY, end_date=self.MONDAY))
+        db_session.add(Availability(aide_id=aides[2].id, weekday='TU',
+                                    start_time=datetime.strptime("08:00", "%H:%M").time(),
+                                    end_time=datetime.strptime("09:00", "%H:%M").time()))
+        db_session.commit()
+        ids = [aide.id for aide in aides]
+
+        # Saturday and Sunday are not school days
+        response = client.get(
+            f'/api/aides/free?start_date={self.MONDAY.isoformat()}&end_date=2030-03-10'
+            '&start_time=10:00&end_time=11:00'
+        )
+        assert response.status_code == 200
+        pairs = [(item['aide_id'], item['date'], item['weekly_load_minutes']) for item in response.json['items']]
+        monday, wednesday = self.MONDAY.isoformat(), (self.MONDAY + timedelta(days=2)).isoformat()
+        thursday, friday = (self.MONDAY + timedelta(days=3)).isoformat(), (self.MONDAY + timedelta(days=4)).isoformat()
+        expected_idle = [
+            (aide_id, day, 0)
+            for day in [monday, tuesday.isoformat(), wednesday, thursday, friday]
+            for aide_id in ids[1:]
+            if not (aide_id == ids[1] and day == monday) and not (aide_id == ids[2] and day == tuesday.isoformat())
+        ]
+        assert pairs == expected_idle + [(ids[0], day, 120) for day in [monday, wednesday, thursday, friday]]
+        assert response.json['count'] == len(pairs)
+
+    def test_assignment_of_missing_aide_is_skipped(self, client, db_session: Session, recurring_task: Task):
+        """Test that an assignment pointing at a deleted aide does not fail the search."""
+        aide = TeacherAide(name="Free Aide", colour_hex="#123456")
+        db_session.add(aide)
+        db_session.commit()
+        aide_id = aide.id
+        # Core insert, as left behind by a deletion without the aide_id being cleared
+        db_session.execute(insert(Assignment.__table__).values(
+            task_id=recurring_task.id, aide_id=aide_id + 1000, date=self.MONDAY,
+            start_time=datetime.strptime("10:00", "%H:%M").time(),
+            end_time=datetime.strptime("11:00", "%H:%M").time(), status='ASSIGNED'
+        ))
+        db_session.commit()
+
+        response = client.get(
+            f'/api/aides/free?start_date={self.MONDAY.isoformat()}&end_date={self.MONDAY.isoformat()}'
+            '&start_time=10:00&end_time=11:00'
+        )
+        assert response.status_code == 200
+        assert [item['aide_id'] for item in response.json['items']] == [aide_id]
+
+    def test_free_aides_validation(self, client):
+        """Test validation of the range and slot."""
+        base = '/api/aides/free?start_date=2030-03-04&end_date=2030-03-08'
+        assert client.get(base).status_code == 422
+        assert client.get(base + '&start_time=11:00&end_time=10:00').status_code == 422
+        assert client.get(base + '&start_time=07:00&end_time=09:00').status_code == 422
+        assert client.get(base + '&start_time=bad&end_time=09:00').status_code == 422
+        assert client.get(
+            '/api/aides/free?start_date=2030-01-01&end_date=2031-06-01&start_time=09:00&end_time=10:00'
+        ).status_code == 422
+
+class TestWeeklyMatrixAbsences:
+    """Tests for absences in the weekly matrix."""
+
+    def test_absences_cover_school_days_only(self, client, db_session: Session):
+        """Test that an absence spanning the weekend marks only the weekdays of the week."""
+        aide = TeacherAide(name="Matrix Aide", colour_hex="#123456")
+        db_session.add(aide)
+        db_session.flush()
+        absence = Absence(aide_id=aide.id, start_date=date(2030, 3, 7), end_date=date(2030, 3, 12), reason="Leave")
+        db_session.add(absence)
+        db_session.commit()
+        aide_id, absence_id = aide.id, absence.id
+
+        response = client.get('/api/assignments/weekly-matrix?week=2030-W10')
+        assert response.status_code == 200
+        absences = response.json['absences']
+        assert sorted(absences) == [f'{aide_id}_Friday', f'{aide_id}_Thursday']
+        assert absences[f'{aide_id}_Thursday'] == {
+            'absence_id': absence_id, 'reason': 'Leave', 'start_date': '2030-03-07', 'end_date': '2030-03-12'
+        }
+
+class TestWeeklyMatrixAssignments:
+    """Tests for assignment cells in the weekly matrix."""
+
+    def test_cells_and_statement_count(self, client, db_session: Session, engine):
+        """Test slot coverage, task details and that statements do not grow with assignments."""
+        from sqlalchemy import event
+        from api.models import Classroom, SchoolClass
+        aides = [TeacherAide(name=f"Matrix Aide {i}", colour_hex="#123456") for i in range(3)]
+        classroom = Classroom(name="Room 7")
+        school_class = SchoolClass(class_code="3B", grade="3", teacher="Ms Hill")
+        db_session.add_all(aides + [classroom, school_class])
+        db_session.flush()
+        tasks = [
+            Task(title=f"Matrix Task {i}", category="CLASS_SUPPORT",
+                 start_time=datetime.strptime("09:00", "%H:%M").time(),
+                 end_time=datetime.strptime("10:30", "%H:%M").time(),
+                 classroom_id=classroom.id, school_class_id=school_class.id, status=Status.ASSIGNED)
+            for i in range(3)
+        ]
+        db_session.add_all(tasks)
+        db_session.flush()
+        db_session.add_all([
+            Assignment(task_id=task.id, aide_id=aide.id, date=date(2030, 3, 5),
+                       start_time=task.start_time, end_time=task.end_time, status='ASSIGNED')
+            for task, aide in zip(tasks, aides)
+        ])
+        db_session.commit()
+        aide_id = aides[0].id
+
+        statements = []
+        record = lambda *args: statements.append(args[2])
+        event.listen(engine, 'before_cursor_execute', record)
+        try:
+            response = client.get('/api/assignments/weekly-matrix?week=2030-W10')
+        finally:
+            event.remove(engine, 'before_cursor_execute', record)
+        assert response.status_code == 200
+        cells = response.json['assignments']
+        assert len(cells) == 9
+        assert sorted(key for key in cells if key.startswith(f'{aide_id}_')) == [
+            f'{aide_id}_Tuesday_09:00', f'{aide_id}_Tuesday_09:30', f'{aide_id}_Tuesday_10:00'
+        ]
+        cell = cells[f'{aide_id}_Tuesday_09:30']
+        assert cell['start_time'] == '09:00' and cell['end_time'] == '10:30'
+        assert cell['classroom'] == 'Room 7'
+        assert cell['school_class'] == '3B'
+        # One statement each for aides, assignments with task, classroom and class
+        assert len([sql for sql in statements if 'classrooms' in sql or 'school_classes' in sql]) == 1
+
+    def test_columnar_format_matches_cells(self, client, db_session: Session, recurring_task: Task):
+        """Test that expanding the columnar arrays gives back the per-slot cells."""
+        aides = [TeacherAide(name=f"Columnar Aide {i}", colour_hex="#123456") for i in range(2)]
+        db_session.add_all(aides)
+        db_session.flush()
+        db_session.add_all([
+            Assignment(task_id=recurring_task.id, aide_id=aides[0].id, date=date(2030, 3, 4),
+                       start_time=datetime.strptime("08:00", "%H:%M").time(),
+                       end_time=datetime.strptime("11:00", "%H:%M").time(), status='ASSIGNED'),
+            Assignment(task_id=recurring_task.id, aide_id=aides[1].id, date=date(2030, 3, 8),
+                       start_time=datetime.strptime("14:30", "%H:%M").time(),
+                       end_time=datetime.strptime("15:00", "%H:%M").time(), status='IN_PROGRESS'),
+        ])
+        db_session.commit()
+
+        cells = client.get('/api/assignments/weekly-matrix?week=2030-W10').json
+        columnar = client.get('/api/assignments/weekly-matrix?week=2030-W10&format=columnar').json
+        assert columnar['format'] == 'columnar'
+        assert columnar['aides'] == cells['aides']
+        columns = columnar['assignments']
+        assert columns['slot_span'] == [6, 1]
+        expanded = {}
+        for i, assignment_id in enumerate(columns['id']):
+            task = columnar['tasks'][columns['task_index'][i]]
+            for slot in range(columns['start_slot'][i], columns['start_slot'][i] + columns['slot_span'][i]):
+                key = '_'.join((
+                    str(columnar['aides'][columns['aide_index'][i]]['id']),
+                    columnar['days'][columns['day_index'][i]],
+                    columnar['time_slots'][slot]
+                ))
+                expanded[key] = (assignment_id, task['title'], columnar['statuses'][columns['status_code'][i]])
+        assert expanded == {
+            key: (cell['assignment_id'], cell['task_title'], cell['status'])
+            for key, cell in cells['assignments'].items()
+        }
+
+    def test_assignment_of_missing_aide_is_skipped(self, client, db_session: Session, recurring_task: Task):
+        """Test that both formats leave out a row pointing at a deleted aide."""
+        db_session.execute(insert(Assignment.__table__).values(
+            task_id=recurring_task.id, aide_id=9999, date=date(2030, 3, 4),
+            start_time=datetime.strptime("09:00", "%H:%M").time(),
+            end_time=datetime.strptime("10:00", "%H:%M").time(), status='ASSIGNED'
+        ))
+        db_session.commit()
+
+        cells = client.get('/api/assignments/weekly-matrix?week=2030-W10')
+        columnar = client.get('/api/assignments/weekly-matrix?week=2030-W10&format=columnar')
+        assert cells.status_code == 200 and columnar.status_code == 200
+        assert cells.json['assignments'] == {}
+        assert columnar.json['assignments']['id'] == []
+
+    def test_unknown_format_rejected(self, client, db_session: Session):
+        """Test that an unknown format is a validation error."""
+        response = client.get('/api/assignments/weekly-matrix?week=2030-W10&format=xml')
+        assert response.status_code == 422
+
+class TestMatrixRangeEndpoint:
+    """Tests for the streamed multi-week matrix."""
+
+    def test_streams_each_week_like_weekly_matrix(self, client, db_session: Session, engine):
+        """Test that every week is one NDJSON line equal to that week's matrix, from one assignment scan."""
+        from sqlalchemy import event
+        aide = TeacherAide(name="Range Aide", colour_hex="#123456")
+        task = Task(title="Range Task", category="CLASS_SUPPORT",
+                    start_time=datetime.strptime("09:00", "%H:%M").time(),
+                    end_time=datetime.strptime("10:00", "%H:%M").time(), status=Status.ASSIGNED)
+        db_session.add_all([aide, task])
+        db_session.flush()
+        db_session.add_all([
+            Assignment(task_id=task.id, aide_id=aide.id, date=day, start_time=task.start_time,
+                       end_time=task.end_time, status='ASSIGNED')
+            for day in (date(2030, 3, 4), date(2030, 3, 22))
+        ])
+        db_session.add(Absence(aide_id=aide.id, start_date=date(2030, 3, 12), end_date=date(2030, 3, 12)))
+        db_session.commit()
+
+        statements = []
+        record = lambda *args: statements.append(args[2])
+        event.listen(engine, 'before_cursor_execute', record)
+        try:
+            response = client.get('/api/assignments/matrix?start_week=2030-W10&end_week=2030-W13')
+            lines = [json.loads(line) for line in response.data.decode().splitlines()]
+        finally:
+            event.remove(engine, 'before_cursor_execute', record)
+        assert response.status_code == 200
+        assert response.mimetype == 'application/x-ndjson'
+        assert [week['week'] for week in lines] == ['2030-W10', '2030-W11', '2030-W12', '2030-W13']
+        assert len([sql for sql in statements if sql.lstrip().startswith('SELECT') and 'FROM assignments' in sql]) == 1
+
+        for week in lines:
+            expected = client.get(f"/api/assignments/weekly-matrix?week={week['week']}").json
+            assert week == expected
+        assert len(lines[0]['assignments']) == 2
+        assert len(lines[1]['absences']) == 1
+        assert len(lines[2]['assignments']) == 2
+        assert lines[3]['assignments'] == {}
+
+    def test_columnar_range(self, client, db_session: Session):
+        """Test that the columnar format is available per week."""
+        response = client.get('/api/assignments/matrix?start_week=2030-W52&end_week=2031-W01&format=columnar')
+        lines = [json.loads(line) for line in response.data.decode().splitlines()]
+        assert [week['week'] for week in lines] == ['2030-W52', '2031-W01']
+        assert all(week['format'] == 'columnar' for week in lines)
+
+    def test_range_validation(self, client, db_session: Session):
+        """Test missing, malformed, reversed and oversized ranges."""
+        assert client.get('/api/assignments/matrix?start_week=2030-W10').status_code == 422
+        assert client.get('/api/assignments/matrix?start_week=2030-10&end_week=2030-W12').status_code == 422
+        assert client.get('/api/assignments/matrix?start_week=2030-W12&end_week=2030-W10').status_code == 422
+        assert client.get('/api/assignments/matrix?start_week=2030-W01&end_week=2031-W10').status_code == 422
+        assert client.get('/api/assignments/matrix?start_week=2030-W10&end_week=2030-W10&format=xml').status_code == 422
+
+class TestConditionalGet:
+    """Tests for ETag revalidation of the weekly matrix and timetable."""
+
+    def test_weekly_matrix_not_modified(self, client, db_session: Session, engine):
+        """Test that an unchanged week answers 304 after one statement and a write changes the ETag."""
+        from sqlalchemy import event
+        url = '/api/assignments/weekly-matrix?week=2030-W10'
+        first = client.get(url)
+        assert first.status_code == 200
+        etag = first.headers['ETag']
+
+        statements = []
+        record = lambda *args: statements.append(args[2])
+        event.listen(engine, 'before_cursor_execute', record)
+        try:
+            cached = client.get(url, headers={'If-None-Match': etag})
+        finally:
+            event.remove(engine, 'before_cursor_execute', record)
+        assert cached.status_code == 304
+        assert cached.data == b''
+        assert cached.headers['ETag'] == etag
+        assert len(statements) == 1
+
+        db_session.add(TeacherAide(name="New Aide", colour_hex="#123456"))
+        db_session.commit()
+        changed = client.get(url, headers={'If-None-Match': etag})
+        assert changed.status_code == 200
+        assert changed.headers['ETag'] != etag
+
+    def test_weeks_have_distinct_etags(self, client, db_session: Session):
+        """Test that one week's ETag does not revalidate another week."""
+        etag = client.get('/api/assignments/weekly-matrix?week=2030-W10').headers['ETag']
+        response = client.get('/api/assignments/weekly-matrix?week=2030-W11', headers={'If-None-Match': etag})
+        assert response.status_code == 200
+
+    def test_timetable_not_modified(self, client, db_session: Session):
+        """Test that the timetable answers 304 until an absence is recorded."""
+        aide = TeacherAide(name="Timetable Aide", colour_hex="#123456")
+        db_session.add(aide)
+        db_session.commit()
+        aide_id = aide.id
+        etag = client.get('/api/timetable').headers['ETag']
+        assert client.get('/api/timetable', headers={'If-None-Match': etag}).status_code == 304
+
+        db_session.add(Absence(aide_id=aide_id, start_date=date(2030, 3, 4), end_date=date(2030, 3, 4)))
+        db_session.commit()
+        assert client.get('/api/timetable', headers={'If-None-Match': etag}).status_code == 200
+
+class TestBulkCheckEndpoint:
+    """Tests for the multi-aide, multi-slot availability check."""
+
+    MONDAY = date(2030, 3, 4)
+
+    def test_status_matrix(self, client, db_session: Session, recurring_task: Task, engine):
+        """Test each status code and that the whole matrix costs a fixed number of statements."""
+        from sqlalchemy import event
+        aides = [TeacherAide(name=f"Bulk Aide {i}", colour_hex="#123456") for i in range(4)]
+        db_session.add_all(aides)
+        db_session.flush()
+        booked = Assignment(
+            task_id=recurring_task.id, aide_id=aides[1].id, date=self.MONDAY,
+            start_time=datetime.strptime("09:30", "%H:%M").time(),
+            end_time=datetime.strptime("10:30", "%H:%M").time(), status='ASSIGNED'
+        )
+        db_session.add(booked)
+        db_session.add(Absence(aide_id=aides[2].id, start_date=self.MONDAY, end_date=self.MONDAY))
+        db_session.add(Availability(aide_id=aides[3].id, weekday='MO',
+                                    start_time=datetime.strptime("11:00", "%H:%M").time(),
+                                    end_time=datetime.strptime("12:00", "%H:%M").time()))
+        db_session.commit()
+        ids, booked_id = [aide.id for aide in aides], booked.id
+        tuesday = (self.MONDAY + timedelta(days=1)).isoformat()
+
+        statements = []
+        record = lambda *args: statements.append(args[2])
+        event.listen(engine, 'before_cursor_execute', record)
+        try:
+            response = client.post('/api/assignments/check/bulk', json={
+                'aide_ids': ids,
+                'slots': [
+                    {'date': self.MONDAY.isoformat(), 'start_time': '09:00', 'end_time': '10:00'},
+                    {'date': self.MONDAY.isoformat(), 'start_time': '11:00', 'end_time': '12:00'},
+                    {'date': tuesday, 'start_time': '09:00', 'end_time': '10:00'},
+                ]
+            })
+        finally:
+            event.remove(engine, 'before_cursor_execute', record)
+        assert response.status_code == 200
+        data = response.get_json()
+        assert data['status_codes'] == ['FREE', 'CONFLICT', 'ABSENT', 'OUTSIDE_AVAILABILITY']
+        assert data['statuses'] == [
+            [0, 0, 0],
+            [1, 0, 0],
+            [2, 2, 0],
+            [3, 0, 0],
+        ]
+        assert data['conflicts'][1] == [booked_id, None, None]
+        assert len(statements) <= 5
+
+    def test_bulk_check_validation(self, client, db_session: Session):
+        """Test validation of aide ids and slots."""
+        aide = TeacherAide(name="Bulk Aide", colour_hex="#123456")
+        db_session.add(aide)
+        db_session.commit()
+        aide_id = aide.id
+        slot = {'date': '2030-03-04', 'start_time': '09:00', 'end_time': '10:00'}
+        assert client.post('/api/assignments/check/bulk', json={'slots': [slot]}).status_code == 422
+        assert client.post('/api/assignments/check/bulk', json={'aide_ids': [], 'slots': [slot]}).status_code == 422
+        assert client.post('/api/assignments/check/bulk', json={
+            'aide_ids': [aide_id], 'slots': [{'date': '2030-03-04'}]
+        }).status_code == 422
+        assert client.post('/api/assignments/check/bulk', json={
+            'aide_ids': [aide_id], 'slots': [dict(slot, end_time='08:00')]
+        }).status_code == 422
+        assert client.post('/api/assignments/check/bulk', json={
+            'aide_ids': [aide_id + 1], 'slots': [slot]
+        }).status_code == 404
@@ -0,0 +1,69 @@
+"""Tests for slot-occupancy bitmaps."""
+
+import pytest
+from datetime import date, time
+from sqlalchemy.orm import Session
+
+from api.models import Task, Assignment, TeacherAide, Absence, Availability
+from api.slots import SlotBitmaps, slot_mask, FULL_DAY
+from api.constants import Status
+
+MONDAY = date(2030, 3, 4)
+TUESDAY = date(2030, 3, 5)
+
+class TestSlotMask:
+    """Tests for converting times to slot bitmaps."""
+
+    def test_grid_aligned_slots(self):
+        assert slot_mask(time(8, 0), time(8, 30)) == 0b1
+        assert slot_mask(time(9, 0), time(10, 0)) == 0b1100
+        assert slot_mask(time(8, 0), time(16, 0)) == FULL_DAY
+
+    def test_off_grid_and_out_of_hours_times(self):
+        """Off-grid times widen to the slots they touch; out-of-hours parts are clipped."""
+        assert slot_mask(time(9, 10), time(9, 40)) == 0b1100
+        assert slot_mask(time(7, 0), time(8, 30)) == 0b1
+        assert slot_mask(time(16, 0), time(17, 0)) == 0
+
+    def test_touching_slots_do_not_overlap(self):
+        assert not slot_mask(time(9, 0), time(10, 0)) & slot_mask(time(10, 0), time(11, 0))
+
+class TestSlotBitmaps:
+    """Tests for loading and querying aide bitmaps."""
+
+    @pytest.fixture
+    def aides(self, db_session: Session):
+        aides = [TeacherAide(name=f"Bitmap Aide {i}", colour_hex="#123456") for i in range(3)]
+        db_session.add_all(aides)
+        task = Task(title="Bitmap Task", category="CLASS_SUPPORT",
+                    start_time=time(9, 0), end_time=time(10, 0), status=Status.UNASSIGNED)
+        db_session.add(task)
+        db_session.flush()
+        db_session.add(Assignment(task_id=task.id, aide_id=aides[0].id, date=MONDAY,
+                                  start_time=time(9, 0), end_time=time(10, 0), status='ASSIGNED'))
+        db_session.add(Absence(aide_id=aides[1].id, start_date=TUESDAY, end_date=TUESDAY))
+        db_session.add(Availability(aide_id=aides[2].id, weekday='MO',
+                                    start_time=time(8, 0), end_time=time(12, 0)))
+        db_session.commit()
+        return aides
+
+    def test_load_and_check(self, db_session: Session, aides):
+        bitmaps = SlotBitmaps.load(db_session, MONDAY, TUESDAY)
+        busy, absent, part_time = (aide.id for aide in aides)
+        nine = slot_mask(time(9, 0), time(10, 0))
+        afternoon = slot_mask(time(13, 0), time(14, 0))
+
+        assert bitmaps.has_conflict(busy, MONDAY, slot_mask(time(9, 30), time(10, 30)))
+        assert not bitmaps.has_conflict(busy, MONDAY, slot_mask(time(10, 0), time(11, 0)))
+        assert sorted(bitmaps.free_aides(MONDAY, nine)) == sorted([absent, part_time])
+        assert bitmaps.free_aides(MONDAY, afternoon) == [busy, absent]
+        assert sorted(bitmaps.free_aides(TUESDAY, nine)) == sorted([busy, part_time])
+
+    def test_size(self, db_session: Session, aides):
+        bitmaps = SlotBitmaps.load(db_session, MONDAY, TUESDAY)
+        assert bitmaps.nbytes == 3 * 2 * 2 * 2
+
+    def test_dates_outside_window_raise(self, db_session: Session, aides):
+        bitmaps = SlotBitmaps.load(db_session, MONDAY, TUESDAY)
+        with pytest.raises(ValueError):
+            bitmaps.is_free(aides[0].id, date(2030, 3, 6), FULL_DAY)